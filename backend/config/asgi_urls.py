@@ -0,0 +1,33 @@
+"""
+URL configuration used when serving over ASGI (see config/asgi.py).
+
+The same routes as config.urls, except that the read and streaming
+endpoints are answered by the async views in core.async_views, and the
+uploads and PDF report run on the sync view pool (off_sync_thread). Those
+are listed first, so they take precedence over the plain DRF views.
+"""
+from django.conf import settings
+from django.urls import path
+
+from core import async_views
+from core.async_views import off_sync_thread
+from core.views import (
+    CSVUploadView, MultiCSVUploadView, UploadChunkView, UploadSessionCompleteView, PDFReportView
+)
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path('api/dashboard/', async_views.dashboard, name='dashboard-stats'),
+    path('api/equipment/', async_views.equipment_list, name='equipment-list'),
+    path('api/history/', async_views.history, name='history'),
+    path('api/upload/', off_sync_thread(CSVUploadView.as_view()), name='csv-upload'),
+    path('api/upload/multi/', off_sync_thread(MultiCSVUploadView.as_view()), name='csv-upload-multi'),
+    path('api/upload/sessions/<uuid:session_id>/chunks/<int:index>/',
+         off_sync_thread(UploadChunkView.as_view()), name='upload-chunk'),
+    path('api/upload/sessions/<uuid:session_id>/complete/',
+         off_sync_thread(UploadSessionCompleteView.as_view()), name='upload-session-complete'),
+    path('api/report/pdf/', off_sync_thread(PDFReportView.as_view()), name='pdf-report'),
+]
+if settings.EVENT_STREAM_ENABLED:
+    urlpatterns.append(path('api/events/', async_views.event_stream, name='event-stream'))
+urlpatterns += sync_urlpatterns
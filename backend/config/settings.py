@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 
 import os
 from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -51,18 +52,27 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestTimingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',  # Add WhiteNoise here
+    'core.middleware.WhiteNoiseMiddleware',  # WhiteNoise, async-capable for ASGI
+    'core.middleware.GZipMiddleware',  # Compresses JSON for clients sending Accept-Encoding
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',  # ETag / 304 for client revalidation
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ProfilingMiddleware',
 ]
 
-ROOT_URLCONF = 'config.urls'
+# config/asgi.py sets DJANGO_ASGI=1, routing the read and streaming endpoints to async views
+ASGI_MODE = os.getenv('DJANGO_ASGI') == '1'
+
+ROOT_URLCONF = 'config.asgi_urls' if ASGI_MODE else 'config.urls'
+# Under ASGI, threads per process for the upload and PDF views (core.async_views.off_sync_thread)
+ASGI_SYNC_VIEW_THREADS = int(os.getenv('ASGI_SYNC_VIEW_THREADS', '8'))
 
 TEMPLATES = [
     {
@@ -80,17 +90,108 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
+# Performance profile, chosen with DATABASE_PROFILE:
+#   'sqlite'      Django's defaults: rollback journal, a new connection per request
+#   'sqlite-wal'  WAL journal and the SQLITE_PRAGMAS below, persistent connections;
+#                 readers no longer wait for writers
+#   'postgresql'  PostgreSQL from the POSTGRES_* variables, persistent connections
+DATABASE_PROFILE = os.getenv('DATABASE_PROFILE', 'sqlite')
+
+# Seconds a connection is reused across requests in the tuned profiles (checked
+# before reuse). Connections belong to a thread, and under ASGI Django runs each
+# request's sync code and async ORM queries on a thread created for that request,
+# so a persistent connection would be left behind with it. ASGI therefore uses a
+# pool (PostgreSQL) or none instead.
+DB_CONN_MAX_AGE = 0 if ASGI_MODE else int(os.getenv('DB_CONN_MAX_AGE', '600'))
+
+# Set on every new SQLite connection by core/db.py (only in the 'sqlite-wal' profile)
+SQLITE_PRAGMAS = {}
+
+if DATABASE_PROFILE == 'sqlite':
+    DATABASE_TEMPLATE = {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
     }
-}
+elif DATABASE_PROFILE == 'sqlite-wal':
+    DATABASE_TEMPLATE = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Take the write lock when a write transaction starts, so concurrent
+            # writers queue for it instead of failing with "database is locked"
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', '20')),
+        },
+    }
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        # With WAL, NORMAL only syncs at checkpoints; a power cut can lose the
+        # last commits but never corrupts the database
+        'synchronous': 'NORMAL',
+        # Negative sizes are KiB: a 64 MB page cache per connection
+        'cache_size': -int(os.getenv('SQLITE_CACHE_KB', '65536')),
+        'mmap_size': int(os.getenv('SQLITE_MMAP_BYTES', str(256 * 1024 ** 2))),
+        'temp_store': 'MEMORY',
+    }
+elif DATABASE_PROFILE == 'postgresql':
+    DATABASE_TEMPLATE = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'USER': os.getenv('POSTGRES_USER', 'postgres'),
+        'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+        'PORT': os.getenv('POSTGRES_PORT', '5432'),
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        # The pool needs psycopg[pool]
+        'OPTIONS': {'pool': True} if ASGI_MODE else {},
+    }
+else:
+    raise ImproperlyConfigured(f"Unknown DATABASE_PROFILE {DATABASE_PROFILE!r}; "
+                               "use 'sqlite', 'sqlite-wal' or 'postgresql'")
+
+if DATABASE_PROFILE == 'postgresql':
+    DATABASES = {
+        'default': {
+            **DATABASE_TEMPLATE,
+            'NAME': os.getenv('POSTGRES_DB', 'chemequip'),
+            'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
+        }
+    }
+    # Read replicas (see below): hot standbys with the primary's name and credentials
+    replica_settings = [
+        {'NAME': DATABASES['default']['NAME'], 'HOST': host}
+        for host in os.getenv('POSTGRES_REPLICA_HOSTS', '').split(',') if host
+    ]
+else:
+    DATABASES = {
+        'default': {
+            **DATABASE_TEMPLATE,
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+    # Read replicas (see below): SQLite files, e.g. copies kept current with `manage.py sync_replicas`
+    replica_settings = [
+        {'NAME': name}
+        for name in os.getenv('DATABASE_REPLICAS', '').split(',') if name
+    ]
+
+# Read replicas for the read-only views (see core/routers.py). Every alias
+# besides 'default' is a replica, so others can be added to DATABASES directly.
+for index, replica in enumerate(replica_settings, start=1):
+    DATABASES[f'replica{index}'] = {
+        **DATABASE_TEMPLATE,
+        **replica,
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+# Seconds a user's reads stay on the primary after they upload, so they see their own data
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', '30'))
 
 
 # Password validation
@@ -147,7 +248,114 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # Per-user request rates for views that set a throttle_scope
+    'DEFAULT_THROTTLE_RATES': {
+        'upload': os.getenv('THROTTLE_UPLOAD_RATE', '20/min'),
+        'pdf-report': os.getenv('THROTTLE_PDF_RATE', '10/min'),
+        'upload-chunk': os.getenv('THROTTLE_UPLOAD_CHUNK_RATE', '600/min'),
+    },
+}
+
+
+# Local state shared by all worker processes on this host
+LOCAL_STATE_DIR = Path(os.getenv('LOCAL_STATE_DIR', BASE_DIR / 'var'))
+
+# File-based so throttle history is shared across gunicorn workers
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': LOCAL_STATE_DIR / 'cache',
+    }
+}
+
+
+# Throttling for expensive endpoints
+# Maximum in-flight requests per user, keyed by the view's throttle_scope
+THROTTLE_CONCURRENCY = {
+    'upload': int(os.getenv('THROTTLE_UPLOAD_CONCURRENCY', '2')),
+    'pdf-report': int(os.getenv('THROTTLE_PDF_CONCURRENCY', '1')),
+    'upload-chunk': int(os.getenv('THROTTLE_UPLOAD_CHUNK_CONCURRENCY', '4')),
 }
+# Seconds before an in-flight slot is reclaimed if its worker died
+THROTTLE_SLOT_TIMEOUT = int(os.getenv('THROTTLE_SLOT_TIMEOUT', '300'))
+# Retry-After hint (seconds) sent when the concurrency limit is hit
+THROTTLE_CONCURRENCY_RETRY_AFTER = int(os.getenv('THROTTLE_CONCURRENCY_RETRY_AFTER', '5'))
+
+
+# How ingest inserts rows (core/bulkload.py): 'auto' (COPY on PostgreSQL,
+# executemany elsewhere), 'copy', 'executemany', 'orm' (bulk_create), or the
+# dotted path of a BulkLoader subclass
+INGEST_BULK_LOADER = os.getenv('INGEST_BULK_LOADER', 'auto')
+
+
+# Largest size a gzip-compressed CSV may decompress to, for every upload path
+UPLOAD_DECOMPRESSED_MAX_BYTES = int(os.getenv('UPLOAD_DECOMPRESSED_MAX_BYTES', str(2 * 1024 ** 3)))
+
+
+# Multi-file uploads (/api/upload/multi/)
+# Most CSVs accepted in one request, counting the members of .zip archives
+UPLOAD_MAX_FILES = int(os.getenv('UPLOAD_MAX_FILES', '50'))
+# Largest total uncompressed size of the CSVs inside an uploaded archive
+UPLOAD_ARCHIVE_MAX_BYTES = int(os.getenv('UPLOAD_ARCHIVE_MAX_BYTES', str(2 * 1024 ** 3)))
+# Threads per worker process used to parse the files of a request in parallel
+UPLOAD_PARSE_WORKERS = int(os.getenv('UPLOAD_PARSE_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+
+# Resumable chunked uploads (/api/upload/sessions/)
+# Where chunks are kept until the upload is completed or abandoned
+UPLOAD_SESSION_DIR = Path(os.getenv('UPLOAD_SESSION_DIR', LOCAL_STATE_DIR / 'uploads'))
+# Default chunk size, and the range clients may ask for
+UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', str(8 * 1024 ** 2)))
+UPLOAD_CHUNK_MIN_BYTES = int(os.getenv('UPLOAD_CHUNK_MIN_BYTES', str(256 * 1024)))
+UPLOAD_CHUNK_MAX_BYTES = int(os.getenv('UPLOAD_CHUNK_MAX_BYTES', str(64 * 1024 ** 2)))
+# Largest file accepted through an upload session
+UPLOAD_SESSION_MAX_BYTES = int(os.getenv('UPLOAD_SESSION_MAX_BYTES', str(8 * 1024 ** 3)))
+# Per-user quota over unfinished (open or processing) sessions: how many, and
+# their declared sizes together, which bounds the user's chunks on disk
+UPLOAD_SESSION_USER_MAX_OPEN = int(os.getenv('UPLOAD_SESSION_USER_MAX_OPEN', '3'))
+UPLOAD_SESSION_USER_MAX_BYTES = int(os.getenv('UPLOAD_SESSION_USER_MAX_BYTES', str(8 * 1024 ** 3)))
+# Seconds without a chunk or completion attempt before a session and its chunks
+# are discarded (sessions being processed are kept until their claim is stale)
+UPLOAD_SESSION_TTL = int(os.getenv('UPLOAD_SESSION_TTL', str(24 * 3600)))
+# Seconds a completion may run before its claim counts as abandoned (its worker
+# was killed) and the session can be completed again or deleted. Keep it above
+# the gunicorn worker timeout.
+UPLOAD_PROCESSING_TIMEOUT = int(os.getenv('UPLOAD_PROCESSING_TIMEOUT', '900'))
+
+
+# Server-Sent Events (/api/events/)
+# Every open stream holds a sync worker under WSGI, and both clients open one
+# automatically, so the stream is only offered under ASGI unless enabled here.
+# Without it, clients refresh after their own uploads as before.
+EVENT_STREAM_ENABLED = os.getenv('EVENT_STREAM_ENABLED', '1' if ASGI_MODE else '0') == '1'
+# Seconds events are kept for clients resuming with Last-Event-ID
+EVENT_RETENTION = int(os.getenv('EVENT_RETENTION', '600'))
+# How often a stream checks for new events, and sends a keep-alive when idle
+EVENT_POLL_INTERVAL = float(os.getenv('EVENT_POLL_INTERVAL', '0.5'))
+EVENT_HEARTBEAT = int(os.getenv('EVENT_HEARTBEAT', '15'))
+# Streams end after this long (under WSGI each one occupies a worker thread);
+# clients reconnect after EVENT_RETRY_MS and resume from their last event
+EVENT_STREAM_MAX_SECONDS = int(os.getenv('EVENT_STREAM_MAX_SECONDS', '300'))
+EVENT_RETRY_MS = int(os.getenv('EVENT_RETRY_MS', '2000'))
+
+
+# Request instrumentation
+# Samples kept per endpoint for the staff timing endpoint
+REQUEST_TIMING_WINDOW = int(os.getenv('REQUEST_TIMING_WINDOW', '1000'))
+# Bearer token Prometheus sends to /metrics. Without it only staff sessions can read metrics.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+
+# Request profiling (off unless PROFILING_ENABLED=True)
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED') == 'True'
+# 'cprofile', or 'pyinstrument' for a sampling profiler (must be installed)
+PROFILER = os.getenv('PROFILER', 'cprofile')
+# Staff users send this header to profile a single request
+PROFILE_HEADER = os.getenv('PROFILE_HEADER', 'X-Profile')
+# Fraction of all requests profiled at random (0 disables sampling)
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_DIR = Path(os.getenv('PROFILE_DIR', LOCAL_STATE_DIR / 'profiles'))
+PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', '200'))
 
 
 # CORS settings
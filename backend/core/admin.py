@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import EquipmentBatch, EquipmentData
+from .models import EquipmentBatch, EquipmentData, UploadSession
 
 
 class EquipmentDataInline(admin.TabularInline):
@@ -25,3 +25,10 @@ class EquipmentDataAdmin(admin.ModelAdmin):
     list_display = ['equipment_name', 'type', 'flowrate', 'pressure', 'temperature', 'batch']
     list_filter = ['type', 'batch']
     search_fields = ['equipment_name', 'type']
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ['id', 'filename', 'size', 'status', 'user', 'created_at', 'batch']
+    list_filter = ['status', 'created_at']
+    readonly_fields = ['created_at']
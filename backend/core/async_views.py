@@ -0,0 +1,253 @@
+"""
+Async versions of the read and streaming endpoints, routed by
+config/asgi_urls.py when the app is served over ASGI.
+
+They wait on the database (through Django's async ORM) and on the event
+store without holding a thread, so one worker process can keep many slow
+clients and open event streams going at once. The ORM itself still runs
+each query on a thread, the request's thread-sensitive one. off_sync_thread
+moves the heavy sync views (uploads, PDF reports) onto a bounded pool of
+their own instead.
+
+Responses are the same as those of the DRF views in views.py, including
+reading from a replica when the user is not pinned to the primary
+(core/routers.py). Authentication mirrors the API's token and session
+authentication; HTTP Basic is not supported here.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.db.models import Avg, Count
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated
+from rest_framework.renderers import JSONRenderer
+
+from . import events
+from .models import EquipmentBatch, EquipmentData
+from .routers import aread_alias
+from .serializers import BatchHistorySerializer
+
+
+# Rows fetched per query, and rendered per write, while streaming equipment data
+EQUIPMENT_CHUNK_ROWS = 2000
+
+# Same fields, in the same order, as EquipmentDataSerializer
+EQUIPMENT_FIELDS = ('id', 'equipment_name', 'type', 'flowrate', 'pressure', 'temperature')
+
+
+def render_json(data):
+    return JSONRenderer().render(data)
+
+
+def json_response(data, status=200):
+    response = HttpResponse(render_json(data), content_type='application/json', status=status)
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+async def authenticate(request, query_token=False):
+    """
+    The user from an ``Authorization: Token`` header (or ``?token=`` when
+    ``query_token`` is set), else from the session; None if anonymous.
+    Raises AuthenticationFailed for a bad token.
+    """
+    key = None
+    header = request.headers.get('Authorization', '').split()
+    if header and header[0].lower() == 'token':
+        if len(header) != 2:
+            raise AuthenticationFailed('Invalid token header.')
+        key = header[1]
+    elif query_token:
+        key = request.GET.get('token')
+
+    if key:
+        try:
+            token = await Token.objects.select_related('user').aget(key=key)
+        except Token.DoesNotExist:
+            raise AuthenticationFailed('Invalid token.')
+        if not token.user.is_active:
+            raise AuthenticationFailed('User inactive or deleted.')
+        return token.user
+
+    user = await request.auser()
+    return user if user.is_authenticated else None
+
+
+def api_view(query_token=False):
+    """Restrict an async view to authenticated GET requests, answering like DRF otherwise."""
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                response = json_response({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+                response['Allow'] = 'GET, HEAD'
+                return response
+            try:
+                user = await authenticate(request, query_token)
+            except AuthenticationFailed as e:
+                user, detail = None, e.detail
+            else:
+                detail = NotAuthenticated.default_detail
+            if user is None:
+                response = json_response({'detail': detail}, status=401)
+                response['WWW-Authenticate'] = 'Token'
+                return response
+            request.user = user
+            return await view(request, *args, **kwargs)
+        # Token clients send no CSRF token; sessions only get GET through, like DRF
+        return csrf_exempt(wrapper)
+    return decorator
+
+
+_sync_view_pool = None
+
+
+def sync_view_pool():
+    """Threads shared by every off_sync_thread view in this process."""
+    global _sync_view_pool
+    if _sync_view_pool is None:
+        _sync_view_pool = ThreadPoolExecutor(
+            max_workers=settings.ASGI_SYNC_VIEW_THREADS, thread_name_prefix='sync-view'
+        )
+    return _sync_view_pool
+
+
+def off_sync_thread(view):
+    """
+    Serve a sync view from sync_view_pool(), which caps how many of them run
+    at once in this process, instead of on a new thread-sensitive thread per
+    request. Django only closes connections on that thread at the end of a
+    request, so the view's own are closed here.
+    """
+    def run(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            close_old_connections()
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        return await sync_to_async(run, thread_sensitive=False, executor=sync_view_pool())(
+            request, *args, **kwargs
+        )
+    return wrapper
+
+
+@api_view()
+async def dashboard(request):
+    db = await aread_alias(request.user)
+    latest_batch = await EquipmentBatch.objects.using(db).filter(user=request.user).afirst()
+
+    if not latest_batch:
+        return json_response({
+            'total_count': 0,
+            'average_values': {
+                'flowrate': 0,
+                'pressure': 0,
+                'temperature': 0
+            },
+            'type_distribution': {},
+            'latest_batch': None,
+            'equipment_data': []
+        })
+
+    equipment_data = EquipmentData.objects.using(db).filter(batch=latest_batch)
+    total_count = await equipment_data.acount()
+    averages = await equipment_data.aaggregate(
+        avg_flowrate=Avg('flowrate'),
+        avg_pressure=Avg('pressure'),
+        avg_temperature=Avg('temperature')
+    )
+    type_counts = equipment_data.values('type').annotate(count=Count('id'))
+    type_distribution = {item['type']: item['count'] async for item in type_counts}
+    rows = [row async for row in equipment_data.values(*EQUIPMENT_FIELDS)]
+
+    data = {
+        'total_count': total_count,
+        'average_values': {
+            'flowrate': round(averages['avg_flowrate'] or 0, 2),
+            'pressure': round(averages['avg_pressure'] or 0, 2),
+            'temperature': round(averages['avg_temperature'] or 0, 2)
+        },
+        'type_distribution': type_distribution,
+        'latest_batch': {
+            'id': latest_batch.id,
+            'uploaded_at': latest_batch.uploaded_at,
+            'filename': latest_batch.filename
+        },
+        'equipment_data': rows
+    }
+    # Large batches take a while to encode; keep the event loop free meanwhile
+    content = await sync_to_async(render_json, thread_sensitive=False)(data)
+    response = HttpResponse(content, content_type='application/json')
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+@api_view()
+async def equipment_list(request):
+    """The latest batch's rows, streamed in chunks so memory stays flat for large batches."""
+    db = await aread_alias(request.user)
+    latest_batch = await EquipmentBatch.objects.using(db).filter(user=request.user).afirst()
+
+    if not latest_batch:
+        return json_response({'equipment_data': []})
+
+    rows = EquipmentData.objects.using(db).filter(batch=latest_batch).values(*EQUIPMENT_FIELDS)
+
+    async def body():
+        yield f'{{"batch_id":{latest_batch.id},"equipment_data":['.encode()
+        chunk = []
+        separator = b''
+        async for row in rows.aiterator(chunk_size=EQUIPMENT_CHUNK_ROWS):
+            chunk.append(row)
+            if len(chunk) == EQUIPMENT_CHUNK_ROWS:
+                yield separator + render_json(chunk)[1:-1]
+                chunk, separator = [], b','
+        if chunk:
+            yield separator + render_json(chunk)[1:-1]
+        yield b']}'
+
+    response = StreamingHttpResponse(body(), content_type='application/json')
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+@api_view()
+async def history(request):
+    db = await aread_alias(request.user)
+    batches = EquipmentBatch.objects.using(db).filter(user=request.user).annotate(
+        total_records=Count('equipment_data'),
+        avg_flowrate=Avg('equipment_data__flowrate'),
+        avg_pressure=Avg('equipment_data__pressure'),
+        avg_temperature=Avg('equipment_data__temperature')
+    ).order_by('-uploaded_at')
+
+    serializer = BatchHistorySerializer([batch async for batch in batches], many=True)
+    return json_response(serializer.data)
+
+
+@api_view(query_token=True)
+async def event_stream(request):
+    """
+    Server-Sent Events stream, as EventStreamView. The stream waits on the
+    process's EventHub, so an idle stream costs no thread and no polling.
+    """
+    last_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        last_id = int(last_id) if last_id else None
+    except ValueError:
+        last_id = None
+    # Authentication was the only database access; don't keep its connection open for the stream
+    await sync_to_async(connections.close_all)()
+    response = StreamingHttpResponse(events.astream(request.user.pk, last_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,18 @@
+"""
+Authentication for endpoints that browsers open without custom headers.
+"""
+from rest_framework.authentication import TokenAuthentication
+
+
+class QueryTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication from a ``?token=`` query parameter, for EventSource
+    connections. Only enable it on views that need it: query strings end up
+    in access logs.
+    """
+
+    def authenticate(self, request):
+        key = request.query_params.get('token')
+        if not key:
+            return None
+        return self.authenticate_credentials(key)
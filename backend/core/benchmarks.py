@@ -0,0 +1,316 @@
+"""
+End-to-end API benchmarks, driven through the Django test client against a
+throwaway test database. Used by the run_benchmarks management command.
+"""
+import io
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.test import Client
+from django.test.utils import (
+    setup_databases, setup_test_environment, teardown_databases, teardown_test_environment,
+)
+from rest_framework.views import APIView
+
+from . import bulkload
+from .ingest import create_batch, read_equipment_csv
+from .instrumentation import percentile
+from .models import apply_retention, defer_retention
+from .synthetic import write_csv
+
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+# Read endpoints benchmarked after each upload: (scenario name, URL)
+READ_SCENARIOS = [
+    ('dashboard', '/api/dashboard/'),
+    ('equipment', '/api/equipment/'),
+    ('history', '/api/history/'),
+    ('pdf', '/api/report/pdf/'),
+]
+
+# Endpoints the readers of the mixed read/write benchmark take turns requesting.
+# History is a small aggregate query, so read latency reflects waiting on the
+# writers rather than encoding a whole batch as the dashboard does.
+MIXED_READ_URLS = ['/api/history/']
+
+# Relative change in these metrics beyond the tolerance counts as a regression
+# (True means higher is better)
+COMPARED_METRICS = {
+    'rows_per_sec': True,
+    'p50_ms': False,
+    'p99_ms': False,
+    'peak_memory_mb': False,
+}
+
+
+class BenchmarkError(Exception):
+    """Raised when an endpoint under benchmark returns an unexpected status."""
+
+
+@contextmanager
+def benchmark_environment():
+    """
+    Run the block against fresh test databases with throttling disabled.
+    SQLite test databases go to a file under LOCAL_STATE_DIR instead of
+    memory, so timings include real disk I/O.
+    """
+    for alias in connections:
+        settings_dict = connections[alias].settings_dict
+        if 'sqlite3' in settings_dict['ENGINE'] and not settings_dict['TEST'].get('NAME'):
+            Path(settings.LOCAL_STATE_DIR).mkdir(parents=True, exist_ok=True)
+            settings_dict['TEST']['NAME'] = str(Path(settings.LOCAL_STATE_DIR) / f'benchmark_{alias}.sqlite3')
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        with mock.patch.object(APIView, 'check_throttles', lambda self, request: None):
+            yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+def authenticated_client():
+    """Test client authenticated as a dedicated benchmark user via a token."""
+    from django.contrib.auth.models import User
+    from rest_framework.authtoken.models import Token
+
+    user = User.objects.create_user(username='benchmark', password='benchmark-pass-1!')
+    token = Token.objects.create(user=user)
+    return Client(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+
+def synthetic_csv_bytes(rows, seed=0):
+    buffer = io.StringIO()
+    write_csv(buffer, rows, seed=seed)
+    return buffer.getvalue().encode()
+
+
+def measure(call, iterations, rows, expected_status):
+    """
+    Time ``iterations`` calls, then make one more call under tracemalloc to
+    find peak Python memory. Returns a summary dict.
+    """
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = call()
+        durations.append(time.perf_counter() - start)
+        if response.status_code != expected_status:
+            raise BenchmarkError(f'Expected {expected_status}, got {response.status_code}: {response.content[:200]!r}')
+
+    tracemalloc.start()
+    try:
+        call()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    ordered = sorted(durations)
+    total = sum(durations)
+    return {
+        'rows': rows,
+        'iterations': iterations,
+        'mean_ms': round(total / iterations * 1000, 3),
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 3),
+        'requests_per_sec': round(iterations / total, 3),
+        'rows_per_sec': round(rows * iterations / total, 1),
+        'peak_memory_mb': round(peak / 1024 / 1024, 2),
+    }
+
+
+def run_api_benchmarks(sizes=DEFAULT_SIZES, iterations=20, upload_iterations=3,
+                       pdf_max_rows=10_000, progress=None):
+    """
+    Upload a synthetic CSV of each size, then benchmark the read endpoints
+    against it. Must run inside benchmark_environment(). Returns results
+    keyed by ``<scenario>@<rows>``.
+    """
+    client = authenticated_client()
+    results = {}
+
+    for rows in sizes:
+        payload = synthetic_csv_bytes(rows)
+
+        def upload():
+            data = io.BytesIO(payload)
+            data.name = f'synthetic_{rows}.csv'
+            return client.post('/api/upload/', {'file': data})
+
+        results[f'upload@{rows}'] = measure(upload, upload_iterations, rows, 201)
+        if progress:
+            progress(f'upload@{rows}', results[f'upload@{rows}'])
+
+        for name, url in READ_SCENARIOS:
+            if name == 'pdf' and rows > pdf_max_rows:
+                continue
+            key = f'{name}@{rows}'
+            results[key] = measure(lambda: client.get(url), iterations, rows, 200)
+            if progress:
+                progress(key, results[key])
+
+    return results
+
+
+def summarize(durations, rows, elapsed, errors):
+    """Summary dict, as measure() returns, for requests made concurrently over ``elapsed`` seconds."""
+    ordered = sorted(durations)
+    count = len(durations)
+    return {
+        'rows': rows,
+        'iterations': count,
+        'errors': errors,
+        'mean_ms': round(sum(durations) / count * 1000, 3) if count else 0,
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 3),
+        'requests_per_sec': round(count / elapsed, 3),
+        'rows_per_sec': round(rows * count / elapsed, 1),
+        'peak_memory_mb': 0,
+    }
+
+
+def run_mixed_benchmarks(sizes=DEFAULT_SIZES, readers=4, writers=2, duration=10.0, progress=None):
+    """
+    For each size, ``readers`` threads request MIXED_READ_URLS (history)
+    while ``writers`` threads upload CSVs of that many rows, for
+    ``duration`` seconds. Every thread ends each request the way the
+    request handler does, so CONN_MAX_AGE and the profile's connection
+    setup count. Must run inside benchmark_environment(). Returns results
+    keyed by ``mixed-read@<rows>`` and ``mixed-write@<rows>``; failed
+    requests (such as "database is locked") are counted as errors.
+    """
+    client = authenticated_client()
+    results = {}
+
+    for rows in sizes:
+        payload = synthetic_csv_bytes(rows)
+
+        def upload(thread_client):
+            data = io.BytesIO(payload)
+            data.name = f'synthetic_{rows}.csv'
+            return thread_client.post('/api/upload/', {'file': data})
+
+        def read(thread_client, turn):
+            return thread_client.get(MIXED_READ_URLS[turn % len(MIXED_READ_URLS)])
+
+        # Readers need a batch to read from the start
+        if upload(client).status_code != 201:
+            raise BenchmarkError('Seeding upload for the mixed benchmark failed')
+        close_old_connections()
+
+        samples = {'read': [], 'write': []}
+        errors = {'read': 0, 'write': 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + duration
+
+        def worker(kind, expected_status):
+            thread_client = Client(raise_request_exception=False, **client.defaults)
+            turn = 0
+            try:
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    response = upload(thread_client) if kind == 'write' else read(thread_client, turn)
+                    elapsed = time.perf_counter() - start
+                    close_old_connections()
+                    turn += 1
+                    with lock:
+                        if response.status_code == expected_status:
+                            samples[kind].append(elapsed)
+                        else:
+                            errors[kind] += 1
+            finally:
+                connections.close_all()
+
+        threads = (
+            [threading.Thread(target=worker, args=('read', 200)) for _ in range(readers)]
+            + [threading.Thread(target=worker, args=('write', 201)) for _ in range(writers)]
+        )
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        for kind in ('read', 'write'):
+            key = f'mixed-{kind}@{rows}'
+            results[key] = summarize(samples[kind], rows, elapsed, errors[kind])
+            if progress:
+                progress(key, results[key])
+
+    return results
+
+
+def run_ingest_benchmarks(sizes=DEFAULT_SIZES, iterations=3, progress=None):
+    """
+    Time storing a parsed CSV of each size as a batch (ingest.create_batch)
+    with every bulk loader the database supports. Retention runs outside
+    the timing. Must run inside benchmark_environment(). Returns results
+    keyed by ``ingest-<loader>@<rows>``.
+    """
+    from django.contrib.auth.models import User
+
+    user = User.objects.create_user(username='benchmark-ingest', password='benchmark-pass-1!')
+    results = {}
+
+    for rows in sizes:
+        columns = read_equipment_csv(io.BytesIO(synthetic_csv_bytes(rows)))
+        for name, loader_class in bulkload.LOADERS.items():
+            loader = loader_class(connections['default'])
+            if not loader.supports(loader.connection):
+                continue
+            durations = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                with defer_retention():
+                    create_batch(user, f'synthetic_{rows}.csv', columns, loader=loader)
+                durations.append(time.perf_counter() - start)
+                apply_retention(user)
+
+            key = f'ingest-{name}@{rows}'
+            results[key] = summarize(durations, rows, sum(durations), 0)
+            if progress:
+                progress(key, results[key])
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results with a baseline. Returns rows of (key, metric, baseline,
+    current, relative change, regressed).
+    """
+    rows = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            regressed = change < -tolerance if higher_is_better else change > tolerance
+            rows.append((key, metric, old, new, change, regressed))
+    return rows
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def save_results(path, results, metadata=None):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'metadata': metadata or {}, 'results': results}, f, indent=2)
@@ -0,0 +1,139 @@
+"""
+Bulk loaders that insert a batch's EquipmentData rows, used by
+ingest.create_batch.
+
+INGEST_BULK_LOADER picks one by name, or by dotted path to a BulkLoader
+subclass. The default, 'auto', uses COPY on PostgreSQL and executemany
+everywhere else. Loaders run inside the caller's transaction, so a failed
+ingest still leaves no rows behind.
+"""
+import abc
+import csv
+import inspect
+import io
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, router
+from django.utils.module_loading import import_string
+
+from .models import EquipmentData
+
+
+# Row tuples handed to a loader, in this order, followed by the batch id
+ROW_FIELDS = ('equipment_name', 'type', 'flowrate', 'pressure', 'temperature')
+# PostgreSQL types of ROW_FIELDS + batch_id, for binary COPY
+COPY_TYPES = ('text', 'text', 'float8', 'float8', 'float8', 'int8')
+# Rows per executemany call
+EXECUTEMANY_ROWS = 2000
+
+
+class BulkLoader(abc.ABC):
+    """
+    Inserts rows of a batch. ``vendors`` limits the databases it can be used
+    with. Subclasses must implement insert().
+    """
+    vendors = None
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    @classmethod
+    def supports(cls, connection):
+        return cls.vendors is None or connection.vendor in cls.vendors
+
+    @abc.abstractmethod
+    def insert(self, batch, rows):
+        """Insert ``rows``, tuples of ROW_FIELDS values, into ``batch``."""
+
+
+class OrmLoader(BulkLoader):
+    """Model instances through bulk_create: multi-row INSERTs, sized by the backend's parameter limit."""
+
+    def insert(self, batch, rows):
+        EquipmentData.objects.using(self.connection.alias).bulk_create(
+            [EquipmentData(batch=batch, **dict(zip(ROW_FIELDS, row))) for row in rows],
+            batch_size=EXECUTEMANY_ROWS,
+        )
+
+
+def _insert_target():
+    """Quoted table name and column list for EquipmentData rows."""
+    meta = EquipmentData._meta
+    columns = [meta.get_field(name).column for name in ROW_FIELDS] + [meta.get_field('batch').column]
+    return meta.db_table, columns
+
+
+class ExecuteManyLoader(BulkLoader):
+    """One prepared single-row INSERT run over chunks of rows, skipping model instances."""
+
+    def insert(self, batch, rows):
+        quote = self.connection.ops.quote_name
+        table, columns = _insert_target()
+        sql = (f'INSERT INTO {quote(table)} ({", ".join(quote(column) for column in columns)}) '
+               f'VALUES ({", ".join(["%s"] * len(columns))})')
+        with self.connection.cursor() as cursor:
+            for start in range(0, len(rows), EXECUTEMANY_ROWS):
+                cursor.executemany(sql, [(*row, batch.id) for row in rows[start:start + EXECUTEMANY_ROWS]])
+
+
+class CopyLoader(BulkLoader):
+    """
+    PostgreSQL COPY FROM STDIN: binary format with psycopg 3, CSV with
+    psycopg2. Rows stream to the server in one statement instead of being
+    parsed and planned as INSERTs.
+    """
+    vendors = ('postgresql',)
+
+    def insert(self, batch, rows):
+        quote = self.connection.ops.quote_name
+        table, columns = _insert_target()
+        target = f'{quote(table)} ({", ".join(quote(column) for column in columns)})'
+        with self.connection.cursor() as cursor:
+            # psycopg 3 cursors have copy(); psycopg2 ones copy_expert()
+            if hasattr(cursor.cursor, 'copy'):
+                with cursor.cursor.copy(f'COPY {target} FROM STDIN (FORMAT BINARY)') as copy:
+                    copy.set_types(COPY_TYPES)
+                    for row in rows:
+                        copy.write_row((*row, batch.id))
+            else:
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                for row in rows:
+                    writer.writerow((*row, batch.id))
+                buffer.seek(0)
+                cursor.cursor.copy_expert(f'COPY {target} FROM STDIN (FORMAT CSV)', buffer)
+
+
+LOADERS = {
+    'orm': OrmLoader,
+    'executemany': ExecuteManyLoader,
+    'copy': CopyLoader,
+}
+
+
+def get_loader(name=None, using=None):
+    """
+    Loader ``name`` (default: INGEST_BULK_LOADER) for the database EquipmentData
+    is written to. Raises ImproperlyConfigured if it is unknown, is not a
+    complete BulkLoader subclass, or does not support that database.
+    """
+    name = name or settings.INGEST_BULK_LOADER
+    connection = connections[using or router.db_for_write(EquipmentData)]
+    if name == 'auto':
+        name = 'copy' if CopyLoader.supports(connection) else 'executemany'
+    if '.' in name:
+        loader_class = import_string(name)
+    elif name in LOADERS:
+        loader_class = LOADERS[name]
+    else:
+        raise ImproperlyConfigured(f"Unknown bulk loader {name!r}; use 'auto', {', '.join(map(repr, LOADERS))} "
+                                   "or the dotted path of a BulkLoader subclass")
+    if not (isinstance(loader_class, type) and issubclass(loader_class, BulkLoader)):
+        raise ImproperlyConfigured(f'{name} is not a BulkLoader subclass')
+    if inspect.isabstract(loader_class):
+        missing = ', '.join(sorted(loader_class.__abstractmethods__))
+        raise ImproperlyConfigured(f'The {name} bulk loader does not implement {missing}')
+    if not loader_class.supports(connection):
+        raise ImproperlyConfigured(f'The {name} bulk loader does not support {connection.vendor}')
+    return loader_class(connection)
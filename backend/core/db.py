@@ -0,0 +1,16 @@
+"""
+Database connection tuning for the performance profiles in settings.
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Set SQLITE_PRAGMAS on each new SQLite connection (journal mode, cache and mmap sizes)."""
+    if connection.vendor != 'sqlite' or not settings.SQLITE_PRAGMAS:
+        return
+    # On the raw connection, so the pragmas stay out of query counts and timings
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,196 @@
+"""
+Per-user event feed for the /api/events/ Server-Sent Events stream.
+
+Events are rows in a SQLite store under LOCAL_STATE_DIR, so whichever
+worker process ingests a file, every worker streaming to that user sees the
+event. Ids increase monotonically, which lets a reconnecting client resume
+with Last-Event-ID. Events are only kept for EVENT_RETENTION seconds.
+
+Under ASGI, EventHub replaces the per-stream polling: one task per process
+reads new events and hands them to every open stream in that process.
+"""
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+
+from .localstate import connect
+
+
+EVENTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    data TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_user ON events (user_id, id);
+"""
+
+# Event types
+INGEST_PROGRESS = 'ingest_progress'
+# Ingest of a file that had ingest_progress events stopped without storing it
+INGEST_FAILED = 'ingest_failed'
+BATCH_CREATED = 'batch_created'
+RETENTION = 'retention'
+# Sent first on every stream, carrying the id to resume from
+READY = 'ready'
+
+
+def publish(user_id, event_type, data):
+    """
+    Append an event for ``user_id`` and drop expired ones. Returns the event
+    id, or None when EVENT_STREAM_ENABLED is off and nobody could read it.
+    """
+    if not settings.EVENT_STREAM_ENABLED:
+        return None
+    conn = connect('events', EVENTS_SCHEMA)
+    now = time.time()
+    cursor = conn.execute(
+        'INSERT INTO events (user_id, type, data, created_at) VALUES (?, ?, ?, ?)',
+        (user_id, event_type, json.dumps(data), now)
+    )
+    conn.execute('DELETE FROM events WHERE created_at < ?', (now - settings.EVENT_RETENTION,))
+    return cursor.lastrowid
+
+
+def publish_on_commit(user_id, event_type, data):
+    """Publish once the surrounding transaction commits, so clients never see rolled-back data."""
+    transaction.on_commit(lambda: publish(user_id, event_type, data))
+
+
+def latest_id():
+    conn = connect('events', EVENTS_SCHEMA)
+    return conn.execute('SELECT COALESCE(MAX(id), 0) FROM events').fetchone()[0]
+
+
+def events_since(user_id, last_id, limit=100):
+    """(id, type, data) for the user's events after ``last_id``, oldest first."""
+    conn = connect('events', EVENTS_SCHEMA)
+    rows = conn.execute(
+        'SELECT id, type, data FROM events WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?',
+        (user_id, last_id, limit)
+    ).fetchall()
+    return [(event_id, event_type, json.loads(data)) for event_id, event_type, data in rows]
+
+
+def events_after(last_id, limit=500):
+    """(id, user_id, type, data) for every user's events after ``last_id``, oldest first."""
+    conn = connect('events', EVENTS_SCHEMA)
+    rows = conn.execute(
+        'SELECT id, user_id, type, data FROM events WHERE id > ? ORDER BY id LIMIT ?',
+        (last_id, limit)
+    ).fetchall()
+    return [(event_id, user_id, event_type, json.loads(data)) for event_id, user_id, event_type, data in rows]
+
+
+def format_event(event_id, event_type, data):
+    return f'id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data)}\n\n'.encode()
+
+
+def stream(user_id, last_id=None):
+    """
+    Generator of SSE frames for ``user_id``, starting with a ``ready`` event
+    so the client holds an id to resume from. Without ``last_id`` only new
+    events are sent. Sends a comment as keep-alive every EVENT_HEARTBEAT
+    seconds and ends after EVENT_STREAM_MAX_SECONDS; EventSource reconnects
+    on its own with Last-Event-ID, which frees the worker in between.
+    """
+    if last_id is None:
+        last_id = latest_id()
+    yield f'retry: {settings.EVENT_RETRY_MS}\n\n'.encode()
+    yield format_event(last_id, READY, {})
+
+    started = last_sent = time.monotonic()
+    while time.monotonic() - started < settings.EVENT_STREAM_MAX_SECONDS:
+        events = events_since(user_id, last_id)
+        for event_id, event_type, data in events:
+            last_id = event_id
+            yield format_event(event_id, event_type, data)
+        now = time.monotonic()
+        if events:
+            last_sent = now
+        elif now - last_sent >= settings.EVENT_HEARTBEAT:
+            yield b': keep-alive\n\n'
+            last_sent = now
+        time.sleep(settings.EVENT_POLL_INTERVAL)
+
+
+class EventHub:
+    """
+    Fans events out to the async streams of this process. A single task
+    polls the store while anyone is subscribed, so the cost of polling does
+    not grow with the number of open streams.
+    """
+
+    def __init__(self):
+        self.subscribers = {}
+        self.last_id = None
+        self.task = None
+
+    async def subscribe(self, user_id):
+        """A queue receiving (id, type, data) for the user's events from now on."""
+        queue = asyncio.Queue()
+        self.subscribers.setdefault(user_id, set()).add(queue)
+        if self.task is None or self.task.done():
+            self.last_id = await sync_to_async(latest_id, thread_sensitive=False)()
+            self.task = asyncio.create_task(self.run())
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        queues = self.subscribers.get(user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self.subscribers[user_id]
+
+    async def run(self):
+        read = sync_to_async(events_after, thread_sensitive=False)
+        while self.subscribers:
+            for event_id, user_id, event_type, data in await read(self.last_id):
+                self.last_id = event_id
+                for queue in self.subscribers.get(user_id, ()):
+                    queue.put_nowait((event_id, event_type, data))
+            await asyncio.sleep(settings.EVENT_POLL_INTERVAL)
+
+
+hub = EventHub()
+
+
+async def astream(user_id, last_id=None):
+    """
+    Async equivalent of stream(), fed by the process's EventHub. Events
+    missed before subscribing (when resuming from ``last_id``) are read from
+    the store first; the hub's copies of those are skipped by id.
+    """
+    queue = await hub.subscribe(user_id)
+    try:
+        if last_id is None:
+            last_id = await sync_to_async(latest_id, thread_sensitive=False)()
+        yield f'retry: {settings.EVENT_RETRY_MS}\n\n'.encode()
+        yield format_event(last_id, READY, {})
+        read = sync_to_async(events_since, thread_sensitive=False)
+        while missed := await read(user_id, last_id):
+            for event_id, event_type, data in missed:
+                last_id = event_id
+                yield format_event(event_id, event_type, data)
+
+        deadline = time.monotonic() + settings.EVENT_STREAM_MAX_SECONDS
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                event_id, event_type, data = await asyncio.wait_for(
+                    queue.get(), timeout=min(settings.EVENT_HEARTBEAT, remaining)
+                )
+            except TimeoutError:
+                if deadline - time.monotonic() > 0:
+                    yield b': keep-alive\n\n'
+                continue
+            if event_id > last_id:
+                last_id = event_id
+                yield format_event(event_id, event_type, data)
+    finally:
+        hub.unsubscribe(user_id, queue)
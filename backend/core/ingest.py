@@ -0,0 +1,235 @@
+"""
+CSV ingestion shared by the upload endpoints and the bulk_ingest command:
+parse and validate equipment CSVs with pandas, then store each one as a
+batch in a single transaction.
+"""
+import gzip
+import io
+import os
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+
+from . import bulkload, events
+from .models import EquipmentBatch, apply_retention, defer_retention
+
+
+REQUIRED_COLUMNS = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+
+# CSV column -> EquipmentData field
+FIELDS = {
+    'Equipment Name': 'equipment_name',
+    'Type': 'type',
+    'Flowrate': 'flowrate',
+    'Pressure': 'pressure',
+    'Temperature': 'temperature',
+}
+
+# Rows inserted between ingest_progress events
+PROGRESS_ROWS = 50_000
+
+
+class IngestError(ValueError):
+    """The CSV is missing required columns, or an upload holds no usable CSVs."""
+
+
+class LimitedReader(io.RawIOBase):
+    """
+    Read-only stream over ``stream`` that raises IngestError once more than
+    ``limit`` bytes have come out of it, so a small gzip file cannot expand
+    into gigabytes in memory.
+    """
+
+    def __init__(self, stream, limit):
+        self.stream = stream
+        self.limit = limit
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        count = self.stream.readinto(buffer)
+        self.bytes_read += count
+        if self.bytes_read > self.limit:
+            raise IngestError(f'The file decompresses to more than {self.limit:,} bytes')
+        return count
+
+
+def read_equipment_csv(source, compressed=False):
+    """
+    Parse a CSV (path or file object, optionally gzip-compressed) into
+    column arrays keyed by EquipmentData field. Raises IngestError for
+    missing columns or a file decompressing past UPLOAD_DECOMPRESSED_MAX_BYTES,
+    and ValueError for non-numeric values.
+    """
+    if compressed:
+        source = io.BufferedReader(LimitedReader(gzip.open(source), settings.UPLOAD_DECOMPRESSED_MAX_BYTES))
+    df = pd.read_csv(source)
+
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        raise IngestError(f'Missing required columns: {", ".join(missing_columns)}')
+
+    columns = {}
+    for column, field in FIELDS.items():
+        if field in ('equipment_name', 'type'):
+            columns[field] = df[column].astype(str).to_numpy()
+        else:
+            columns[field] = df[column].astype(float).to_numpy()
+    return columns
+
+
+def upload_sources(files):
+    """
+    (filename, source, compressed) for every CSV in the uploaded files,
+    expanding .zip archives into their .csv and .csv.gz members. Raises
+    IngestError for bad archives or more than UPLOAD_MAX_FILES CSVs.
+    """
+    sources = []
+    for upload in files:
+        if not upload.name.endswith('.zip'):
+            sources.append((upload.name, upload, upload.name.endswith('.gz')))
+            continue
+        try:
+            archive = zipfile.ZipFile(upload)
+        except zipfile.BadZipFile:
+            raise IngestError(f'{upload.name} is not a valid zip archive')
+        members = [
+            info for info in archive.infolist()
+            if not info.is_dir() and info.filename.endswith(('.csv', '.csv.gz'))
+            and not os.path.basename(info.filename).startswith('.')
+            and not info.filename.startswith('__MACOSX/')
+        ]
+        unpacked = sum(info.file_size for info in members)
+        if unpacked > settings.UPLOAD_ARCHIVE_MAX_BYTES:
+            raise IngestError(
+                f'{upload.name} unpacks to {unpacked:,} bytes '
+                f'(limit {settings.UPLOAD_ARCHIVE_MAX_BYTES:,})'
+            )
+        for info in sorted(members, key=lambda info: info.filename):
+            sources.append((info.filename, archive.open(info), info.filename.endswith('.gz')))
+
+    if not sources:
+        raise IngestError('No CSV files found in the upload')
+    if len(sources) > settings.UPLOAD_MAX_FILES:
+        raise IngestError(f'Too many CSV files ({len(sources)}); the limit is {settings.UPLOAD_MAX_FILES}')
+    return sources
+
+
+_parse_pool = None
+
+
+def parse_pool():
+    """Threads shared by all requests in this process; pandas parses with the GIL released."""
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ThreadPoolExecutor(
+            max_workers=settings.UPLOAD_PARSE_WORKERS, thread_name_prefix='csv-parse'
+        )
+    return _parse_pool
+
+
+def _timed_parse(source, compressed):
+    started = time.perf_counter()
+    columns = read_equipment_csv(source, compressed=compressed)
+    return columns, time.perf_counter() - started
+
+
+def parse_many(sources):
+    """
+    Parse (filename, source, compressed) sources on the shared pool. Returns
+    (filename, columns, seconds, error) in input order; columns is None
+    and error a message for files that could not be parsed.
+    """
+    futures = [
+        (filename, parse_pool().submit(_timed_parse, source, compressed))
+        for filename, source, compressed in sources
+    ]
+    results = []
+    for filename, future in futures:
+        try:
+            columns, seconds = future.result()
+        except IngestError as e:
+            results.append((filename, None, 0.0, str(e)))
+        except Exception as e:
+            results.append((filename, None, 0.0, f'Error processing CSV: {e}'))
+        else:
+            results.append((filename, columns, seconds, None))
+    return results
+
+
+def create_batches(user, parsed):
+    """
+    Store several parsed files, given as (filename, columns) pairs, as
+    separate batches in one transaction, applying retention once at the end.
+    Returns ([(batch, row count), ...], ids of batches removed by retention).
+    """
+    with transaction.atomic():
+        with defer_retention():
+            created = [create_batch(user, filename, columns) for filename, columns in parsed]
+        removed = apply_retention(user)
+    return created, removed
+
+
+def publish_progress(user, filename, stage, rows_parsed=0, rows_inserted=0):
+    """Tell the user's event stream how far ingest of ``filename`` has got."""
+    events.publish(user.pk, events.INGEST_PROGRESS, {
+        'filename': filename,
+        'stage': stage,
+        'rows_parsed': rows_parsed,
+        'rows_inserted': rows_inserted,
+    })
+
+
+def error_message(error):
+    """What to tell the user about an exception raised while ingesting a file."""
+    return str(error) if isinstance(error, IngestError) else f'Error processing CSV: {error}'
+
+
+def publish_failure(user, filename, error):
+    """Tell the user's event stream that ingest of ``filename`` stopped, so its progress display can end."""
+    events.publish(user.pk, events.INGEST_FAILED, {'filename': filename, 'error': error})
+
+
+def ingest_file(user, filename, source, compressed=False):
+    """
+    Parse one CSV and store it as a batch named ``filename``, publishing
+    progress events along the way (ingest_failed if it raises). Returns
+    (batch, row count).
+    """
+    publish_progress(user, filename, 'parsing')
+    try:
+        columns = read_equipment_csv(source, compressed=compressed)
+        return create_batch(user, filename, columns)
+    except Exception as e:
+        publish_failure(user, filename, error_message(e))
+        raise
+
+
+def create_batch(user, filename, columns, loader=None):
+    """
+    Store the rows as a new batch in one transaction. Returns (batch, row count).
+    Rows go through ``loader`` (default: bulkload.get_loader(), which is COPY
+    on PostgreSQL). Inserts are reported as ingest_progress events;
+    batch_created follows the commit.
+    """
+    loader = loader or bulkload.get_loader()
+    with transaction.atomic():
+        batch = EquipmentBatch.objects.create(user=user, filename=filename)
+        rows = list(zip(*(columns[field].tolist() for field in bulkload.ROW_FIELDS)))
+        publish_progress(user, filename, 'inserting', rows_parsed=len(rows))
+        for start in range(0, len(rows), PROGRESS_ROWS):
+            loader.insert(batch, rows[start:start + PROGRESS_ROWS])
+            publish_progress(user, filename, 'inserting', rows_parsed=len(rows),
+                             rows_inserted=min(start + PROGRESS_ROWS, len(rows)))
+        events.publish_on_commit(user.pk, events.BATCH_CREATED, {
+            'batch_id': batch.id,
+            'filename': filename,
+            'rows': len(rows),
+        })
+    return batch, len(rows)
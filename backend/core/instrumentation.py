@@ -0,0 +1,108 @@
+"""
+In-memory request timing statistics, recorded by RequestTimingMiddleware.
+
+Samples are kept per endpoint in a rolling window, so the numbers describe
+recent traffic handled by this worker process only.
+"""
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+
+# Upper bounds (milliseconds) of the wall-time histogram buckets
+TIMING_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+TIMING_METRICS = ('wall_ms', 'db_ms', 'render_ms', 'queries', 'response_bytes')
+
+
+class QueryTimer:
+    """Database execute wrapper that counts queries and accumulates their time."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return 0
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class TimingRegistry:
+    """Rolling window of timing samples for each endpoint."""
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint, view, sample):
+        with self._lock:
+            entry = self._endpoints.get(endpoint)
+            if entry is None:
+                entry = self._endpoints[endpoint] = {
+                    'view': view,
+                    'total_requests': 0,
+                    'samples': {metric: deque(maxlen=self.window) for metric in TIMING_METRICS},
+                }
+            entry['total_requests'] += 1
+            for metric in TIMING_METRICS:
+                value = sample.get(metric)
+                if value is not None:
+                    entry['samples'][metric].append(value)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def snapshot(self):
+        """Summaries per endpoint, slowest (by p95 wall time) first."""
+        with self._lock:
+            endpoints = {
+                name: (entry['view'], entry['total_requests'],
+                       {metric: sorted(values) for metric, values in entry['samples'].items()})
+                for name, entry in self._endpoints.items()
+            }
+
+        result = []
+        for name, (view, total, samples) in endpoints.items():
+            metrics = {}
+            for metric, ordered in samples.items():
+                metrics[metric] = {
+                    'count': len(ordered),
+                    'mean': round(sum(ordered) / len(ordered), 3) if ordered else 0,
+                    'p50': round(percentile(ordered, 0.50), 3),
+                    'p95': round(percentile(ordered, 0.95), 3),
+                    'p99': round(percentile(ordered, 0.99), 3),
+                    'max': round(ordered[-1], 3) if ordered else 0,
+                }
+            wall = samples['wall_ms']
+            buckets = {}
+            for bound in TIMING_BUCKETS_MS:
+                buckets[f'le_{bound}'] = sum(1 for value in wall if value <= bound)
+            buckets['le_inf'] = len(wall)
+            metrics['wall_ms']['histogram'] = buckets
+            result.append({
+                'endpoint': name,
+                'view': view,
+                'total_requests': total,
+                'metrics': metrics,
+            })
+
+        result.sort(key=lambda item: item['metrics']['wall_ms']['p95'], reverse=True)
+        return result
+
+
+timings = TimingRegistry(window=settings.REQUEST_TIMING_WINDOW)
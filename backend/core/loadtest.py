@@ -0,0 +1,132 @@
+"""
+Concurrency load test against a running server, used by the run_load_test
+command to compare deployments (gunicorn/WSGI against uvicorn/ASGI).
+
+Clients are plain asyncio HTTP/1.1 connections, so one process can hold
+hundreds of them open: ``streams`` long-lived /api/events/ connections
+stand in for slow clients, while timed requests measure how well the
+server keeps answering everyone else.
+"""
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from .instrumentation import percentile
+
+
+class LoadTestError(Exception):
+    """The target URL is unusable."""
+
+
+class Target:
+    def __init__(self, url, token):
+        parts = urlsplit(url)
+        if parts.scheme != 'http':
+            raise LoadTestError('Only plain http:// targets are supported')
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.token = token
+
+    async def send(self, path, extra_headers=''):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        writer.write(
+            f'GET {self.prefix}{path} HTTP/1.1\r\n'
+            f'Host: {self.host}:{self.port}\r\n'
+            f'Authorization: Token {self.token}\r\n'
+            f'Connection: close\r\n'
+            f'{extra_headers}\r\n'.encode()
+        )
+        await writer.drain()
+        status_line = await reader.readline()
+        try:
+            status = int(status_line.split()[1])
+        except (IndexError, ValueError):
+            status = 0
+        return reader, writer, status
+
+
+async def hold_stream(target, ready):
+    """Open an event stream, set ``ready`` once the server sends its ready event, then read until cancelled."""
+    writer = None
+    try:
+        reader, writer, status = await target.send('/api/events/', 'Accept: text/event-stream\r\n')
+        if status != 200:
+            return
+        while line := await reader.readline():
+            if line.startswith(b'event: ready'):
+                ready.set()
+    except OSError:
+        pass
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+async def fetch(target, path):
+    reader, writer, status = await target.send(path)
+    try:
+        await reader.read()
+    finally:
+        writer.close()
+    return status
+
+
+async def timed_request(target, path, timeout):
+    """(seconds, status) for one complete GET; status 0 when it failed or timed out."""
+    started = time.perf_counter()
+    try:
+        status = await asyncio.wait_for(fetch(target, path), timeout)
+    except (OSError, TimeoutError):
+        status = 0
+    return time.perf_counter() - started, status
+
+
+async def run_load_test(url, token, streams=100, requests=200, concurrency=10,
+                        path='/api/history/', connect_timeout=10.0, request_timeout=30.0, progress=None):
+    """
+    Open ``streams`` event streams, then send ``requests`` GETs to ``path``
+    with ``concurrency`` in flight while the streams stay open. Requests
+    taking longer than ``request_timeout`` count as failed. Returns a dict
+    of connection and latency figures.
+    """
+    target = Target(url, token)
+    readies = [asyncio.Event() for _ in range(streams)]
+    stream_tasks = [asyncio.create_task(hold_stream(target, ready)) for ready in readies]
+    try:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.gather(*(ready.wait() for ready in readies)), connect_timeout)
+        except TimeoutError:
+            pass
+        connected = sum(ready.is_set() for ready in readies)
+        connect_seconds = time.perf_counter() - started
+        if progress:
+            progress(f'{connected}/{streams} streams open after {connect_seconds:.2f}s')
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def limited():
+            async with semaphore:
+                return await timed_request(target, path, request_timeout)
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(limited() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+    finally:
+        for task in stream_tasks:
+            task.cancel()
+        await asyncio.gather(*stream_tasks, return_exceptions=True)
+
+    latencies = sorted(seconds * 1000 for seconds, status in results if status == 200)
+    return {
+        'streams': streams,
+        'streams_connected': connected,
+        'stream_connect_seconds': connect_seconds,
+        'requests': requests,
+        'requests_ok': len(latencies),
+        'requests_per_sec': len(latencies) / elapsed if elapsed else 0,
+        'p50_ms': percentile(latencies, 0.50),
+        'p99_ms': percentile(latencies, 0.99),
+        'max_ms': latencies[-1] if latencies else 0,
+    }
@@ -0,0 +1,35 @@
+"""
+Small SQLite stores under LOCAL_STATE_DIR for state that every worker
+process on this host must share (throttle slots and the like).
+"""
+import sqlite3
+import threading
+from pathlib import Path
+
+from django.conf import settings
+
+
+_local = threading.local()
+
+
+def connect(name, schema=''):
+    """
+    Return this thread's connection to the ``name`` store, creating the file
+    and running ``schema`` the first time it is opened.
+    """
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get(name)
+    if conn is None:
+        directory = Path(settings.LOCAL_STATE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode: callers open explicit transactions when they need one
+        conn = sqlite3.connect(directory / f'{name}.sqlite3', timeout=10, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        if schema:
+            conn.executescript(schema)
+        connections[name] = conn
+    return conn
@@ -0,0 +1,160 @@
+"""
+Management command to load an archive of historical equipment CSVs for a user.
+Run with: python manage.py bulk_ingest alice archive/ "exports/2024-*.csv" --workers 4
+
+Files are parsed in a process pool while this process writes each one as a
+batch in its own transaction, so SQLite only ever sees a single writer.
+Completed files are recorded in a manifest; re-running the command skips
+them, so an interrupted load picks up where it stopped.
+
+Only the newest BATCH_RETENTION batches are kept per user, so only the last
+files (in name order) are loaded; parsing and inserting the earlier ones
+would be thrown away as the later ones arrived.
+"""
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core.ingest import create_batch, read_equipment_csv
+from core.models import BATCH_RETENTION
+
+
+def parse_file(path):
+    """Runs in a worker process. Returns (columns, seconds spent parsing)."""
+    started = time.perf_counter()
+    columns = read_equipment_csv(path, compressed=path.endswith('.gz'))
+    return columns, time.perf_counter() - started
+
+
+def file_key(path):
+    """Manifest key: a file counts as done only while its size and mtime are unchanged."""
+    stat = os.stat(path)
+    return f'{path}|{stat.st_size}|{int(stat.st_mtime)}'
+
+
+class Command(BaseCommand):
+    help = ('Bulk-loads CSV files (or .csv.gz) as batches for one user, oldest file name first. '
+            f'Only the newest {BATCH_RETENTION} batches are kept per user, so only the last '
+            f'{BATCH_RETENTION} files to load are ingested.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='User the batches belong to')
+        parser.add_argument('paths', nargs='+', help='CSV files, directories or glob patterns')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Parser processes (default: one per CPU)')
+        parser.add_argument('--manifest',
+                            help='Manifest of completed files (default: LOCAL_STATE_DIR/bulk_ingest_<username>.jsonl)')
+        parser.add_argument('--stop-on-error', action='store_true',
+                            help='Stop at the first file that fails instead of skipping it')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'User "{options["username"]}" does not exist')
+        if options['workers'] < 1:
+            raise CommandError('--workers must be at least 1')
+
+        manifest_path = Path(options['manifest'] or Path(settings.LOCAL_STATE_DIR) / f'bulk_ingest_{user.username}.jsonl')
+        done = self.read_manifest(manifest_path)
+        files = self.collect_files(options['paths'])
+        if not files:
+            raise CommandError('No CSV files found')
+        pending = [path for path in files if file_key(path) not in done]
+        # Retention would delete the batches of all but the last files again before the command finished
+        superseded = pending[:-BATCH_RETENTION]
+        pending = pending[-BATCH_RETENTION:]
+        self.stdout.write(f'{len(files)} file(s), {len(files) - len(pending) - len(superseded)} already done, '
+                          f'{len(pending)} to go with {options["workers"]} worker(s)')
+        if not pending:
+            return
+
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        if superseded:
+            names = [os.path.basename(path) for path in superseded]
+            self.stderr.write(self.style.WARNING(
+                f'Only the newest {BATCH_RETENTION} batches are kept per user, so the {len(superseded)} '
+                f'oldest file(s) are skipped: {", ".join(names[:3])}{", ..." if len(names) > 3 else ""}'
+            ))
+            # Recorded so a re-run does not load them over the newer batches
+            with open(manifest_path, 'a') as manifest:
+                for path in superseded:
+                    manifest.write(json.dumps({'key': file_key(path), 'superseded': True}) + '\n')
+        started = time.perf_counter()
+        total_rows = ingested = failures = 0
+        write_seconds = 0.0
+
+        # Workers set up Django themselves in case processes are spawned (Windows, macOS)
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup) as pool, \
+                open(manifest_path, 'a') as manifest:
+            # Keep a bounded window of parses in flight and write in file order,
+            # so memory stays flat and batch ids follow the file names
+            window = options['workers'] * 2
+            futures = {}
+            for index, path in enumerate(pending):
+                for ahead in range(index, min(index + window, len(pending))):
+                    if ahead not in futures:
+                        futures[ahead] = pool.submit(parse_file, pending[ahead])
+
+                name = os.path.basename(path)
+                prefix = f'[{index + 1}/{len(pending)}] {name}'
+                try:
+                    columns, parse_seconds = futures.pop(index).result()
+                    write_started = time.perf_counter()
+                    batch, rows = create_batch(user, name.removesuffix('.gz'), columns)
+                    seconds = time.perf_counter() - write_started
+                except Exception as e:
+                    failures += 1
+                    self.stderr.write(self.style.ERROR(f'{prefix}: FAILED - {e}'))
+                    if options['stop_on_error']:
+                        for future in futures.values():
+                            future.cancel()
+                        break
+                    continue
+
+                manifest.write(json.dumps({'key': file_key(path), 'batch_id': batch.id, 'rows': rows}) + '\n')
+                manifest.flush()
+                ingested += 1
+                total_rows += rows
+                write_seconds += seconds
+                self.stdout.write(f'{prefix}: batch {batch.id}, {rows:,} rows '
+                                  f'(parse {parse_seconds:.2f}s, write {seconds:.2f}s)')
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write('')
+        summary = (f'Ingested {total_rows:,} rows from {ingested}/{len(pending)} file(s) '
+                   f'in {elapsed:.2f}s: {total_rows / elapsed:,.0f} rows/s overall, '
+                   f'{total_rows / write_seconds if write_seconds else 0:,.0f} rows/s written')
+        if failures:
+            raise CommandError(f'{summary}; {failures} file(s) failed, re-run to retry them')
+        self.stdout.write(self.style.SUCCESS(summary))
+
+    def read_manifest(self, path):
+        try:
+            with open(path) as f:
+                return {json.loads(line)['key'] for line in f if line.strip()}
+        except FileNotFoundError:
+            return set()
+
+    def collect_files(self, paths):
+        """CSV files from files, directories (non-recursive) and glob patterns, sorted and de-duplicated."""
+        files = []
+        for path in paths:
+            if os.path.isdir(path):
+                files.extend(glob.glob(os.path.join(path, '*.csv')) + glob.glob(os.path.join(path, '*.csv.gz')))
+            elif os.path.isfile(path):
+                files.append(path)
+            else:
+                matches = glob.glob(path)
+                if not matches:
+                    raise CommandError(f'No such file or directory: {path}')
+                files.extend(matches)
+        return sorted(set(os.path.abspath(path) for path in files))
@@ -0,0 +1,41 @@
+"""
+Management command to generate synthetic equipment CSV files.
+Run with: python manage.py generate_equipment_csv 100000 --output equipment_100k.csv
+"""
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.synthetic import write_csv
+
+
+class Command(BaseCommand):
+    help = 'Generates a synthetic equipment CSV with the same columns as sample_equipment_data.csv'
+
+    def add_arguments(self, parser):
+        parser.add_argument('rows', type=int, help='Number of equipment rows to generate')
+        parser.add_argument('--output', '-o', default='-',
+                            help='File to write (default: standard output)')
+        parser.add_argument('--seed', type=int, default=None,
+                            help='Random seed for reproducible files')
+        parser.add_argument('--chunk-size', type=int, default=100_000,
+                            help='Rows generated per chunk (bounds memory use)')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        if rows < 0:
+            raise CommandError('rows must be zero or more')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        started = time.perf_counter()
+        if options['output'] == '-':
+            write_csv(sys.stdout, rows, seed=options['seed'], chunk_size=options['chunk_size'])
+            return
+
+        write_csv(options['output'], rows, seed=options['seed'], chunk_size=options['chunk_size'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {rows:,} rows to {options["output"]} in {elapsed:.2f}s'
+        ))
@@ -0,0 +1,137 @@
+"""
+Management command to benchmark the API end to end on synthetic data.
+Run with: python manage.py run_benchmarks --sizes 1000,10000,100000
+
+--suite mixed instead runs concurrent readers and uploaders, to compare
+database profiles (DATABASE_PROFILE) under mixed load; --suite ingest
+compares the bulk loaders used to insert rows.
+
+Results are compared with benchmarks/baseline.json when it exists; pass
+--save-baseline to store the current run as the new baseline.
+"""
+import platform
+import sys
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks upload, dashboard, equipment, history and PDF endpoints on synthetic data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--suite', choices=['api', 'mixed', 'ingest'], default='api',
+                            help='api: each endpoint on its own; mixed: concurrent reads and uploads; '
+                                 'ingest: row inserts with each bulk loader')
+        parser.add_argument('--sizes', default=','.join(str(size) for size in benchmarks.DEFAULT_SIZES),
+                            help='Comma-separated batch sizes in rows (e.g. 1000,10000,1000000)')
+        parser.add_argument('--iterations', type=int, default=20,
+                            help='Timed requests per read endpoint and size')
+        parser.add_argument('--upload-iterations', type=int, default=3,
+                            help='Timed uploads (or ingests, in the ingest suite) per size')
+        parser.add_argument('--pdf-max-rows', type=int, default=10_000,
+                            help='Skip the PDF benchmark for batches larger than this')
+        parser.add_argument('--readers', type=int, default=4,
+                            help='Reading threads in the mixed suite')
+        parser.add_argument('--writers', type=int, default=2,
+                            help='Uploading threads in the mixed suite')
+        parser.add_argument('--duration', type=float, default=10.0,
+                            help='Seconds each size runs in the mixed suite')
+        parser.add_argument('--baseline', default=str(settings.BASE_DIR / 'benchmarks' / 'baseline.json'),
+                            help='Baseline results file to compare against')
+        parser.add_argument('--save-baseline', action='store_true',
+                            help='Store this run as the new baseline')
+        parser.add_argument('--output', help='Also write this run\'s results to a JSON file')
+        parser.add_argument('--tolerance', type=float, default=0.10,
+                            help='Relative change counted as a regression (default 0.10)')
+        parser.add_argument('--fail-on-regression', action='store_true',
+                            help='Exit with status 1 when any metric regressed')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        except ValueError:
+            raise CommandError('--sizes must be a comma-separated list of integers')
+
+        self.stdout.write(
+            f"{'scenario':<22}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}{'rows/s':>14}{'peak MB':>10}"
+        )
+
+        def progress(key, result):
+            line = (
+                f"{key:<22}{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}"
+                f"{result['requests_per_sec']:>10.1f}{result['rows_per_sec']:>14,.0f}"
+                f"{result['peak_memory_mb']:>10.1f}"
+            )
+            if result.get('errors'):
+                line += f"  {result['errors']} failed"
+            self.stdout.write(line)
+
+        with benchmarks.benchmark_environment():
+            if options['suite'] == 'mixed':
+                results = benchmarks.run_mixed_benchmarks(
+                    sizes=sizes,
+                    readers=options['readers'],
+                    writers=options['writers'],
+                    duration=options['duration'],
+                    progress=progress,
+                )
+            elif options['suite'] == 'ingest':
+                results = benchmarks.run_ingest_benchmarks(
+                    sizes=sizes,
+                    iterations=options['upload_iterations'],
+                    progress=progress,
+                )
+            else:
+                results = benchmarks.run_api_benchmarks(
+                    sizes=sizes,
+                    iterations=options['iterations'],
+                    upload_iterations=options['upload_iterations'],
+                    pdf_max_rows=options['pdf_max_rows'],
+                    progress=progress,
+                )
+
+        metadata = {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': settings.DATABASES['default']['ENGINE'],
+            'database_profile': settings.DATABASE_PROFILE,
+            'machine': platform.platform(),
+        }
+        if options['output']:
+            benchmarks.save_results(options['output'], results, metadata)
+
+        regressions = self.compare_with_baseline(results, options)
+
+        if options['save_baseline']:
+            benchmarks.save_results(options['baseline'], results, metadata)
+            self.stdout.write(self.style.SUCCESS(f"Saved baseline to {options['baseline']}"))
+
+        if regressions and options['fail_on_regression']:
+            sys.exit(1)
+
+    def compare_with_baseline(self, results, options):
+        try:
+            baseline = benchmarks.load_results(options['baseline'])
+        except FileNotFoundError:
+            self.stdout.write(self.style.WARNING(
+                f"No baseline at {options['baseline']}; run with --save-baseline to create one."
+            ))
+            return 0
+
+        self.stdout.write('')
+        self.stdout.write(f"Compared with {options['baseline']}:")
+        regressions = 0
+        for key, metric, old, new, change, regressed in benchmarks.compare(results, baseline, options['tolerance']):
+            line = f'  {key:<22}{metric:<16}{old:>14,.1f} -> {new:>14,.1f} ({change:+.1%})'
+            if regressed:
+                regressions += 1
+                self.stdout.write(self.style.ERROR(line + '  REGRESSION'))
+            else:
+                self.stdout.write(line)
+        return regressions
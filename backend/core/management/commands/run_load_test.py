@@ -0,0 +1,68 @@
+"""
+Management command to load-test a running server with many concurrent connections.
+Run with: python manage.py run_load_test http://127.0.0.1:8000 --user alice --streams 200
+
+Holds --streams event streams open (slow clients) while timing --requests
+GETs, to compare worker configurations; see DEPLOYMENT.md. The token is
+read from this project's database unless --token is given, so run it with
+the same settings as the server.
+"""
+import asyncio
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+
+from core.loadtest import LoadTestError, run_load_test
+
+
+class Command(BaseCommand):
+    help = 'Times API requests against a running server while many event streams are held open'
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='Server base URL, e.g. http://127.0.0.1:8000')
+        parser.add_argument('--user', help='User whose API token to use')
+        parser.add_argument('--token', help='API token (instead of --user)')
+        parser.add_argument('--streams', type=int, default=100,
+                            help='Event streams held open during the test')
+        parser.add_argument('--requests', type=int, default=200, help='Timed requests')
+        parser.add_argument('--concurrency', type=int, default=10, help='Timed requests in flight at once')
+        parser.add_argument('--path', default='/api/history/', help='Endpoint the timed requests hit')
+        parser.add_argument('--connect-timeout', type=float, default=10.0,
+                            help='Seconds to wait for the streams to open')
+        parser.add_argument('--request-timeout', type=float, default=30.0,
+                            help='Seconds before a timed request counts as failed')
+
+    def handle(self, *args, **options):
+        token = options['token']
+        if not token:
+            if not options['user']:
+                raise CommandError('Give --user or --token')
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f'User "{options["user"]}" does not exist')
+            token = Token.objects.get_or_create(user=user)[0].key
+
+        try:
+            result = asyncio.run(run_load_test(
+                options['url'], token,
+                streams=options['streams'],
+                requests=options['requests'],
+                concurrency=options['concurrency'],
+                path=options['path'],
+                connect_timeout=options['connect_timeout'],
+                request_timeout=options['request_timeout'],
+                progress=self.stdout.write,
+            ))
+        except LoadTestError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            f"{result['requests_ok']}/{result['requests']} requests to {options['path']} succeeded: "
+            f"{result['requests_per_sec']:.1f} req/s, p50 {result['p50_ms']:.1f} ms, "
+            f"p99 {result['p99_ms']:.1f} ms, max {result['max_ms']:.1f} ms "
+            f"with {result['streams_connected']}/{result['streams']} streams open"
+        )
+        if result['requests_ok'] < result['requests'] or result['streams_connected'] < result['streams']:
+            raise CommandError('Some streams or requests failed')
@@ -0,0 +1,55 @@
+"""
+Management command to refresh SQLite read replicas from the primary database.
+Run with: python manage.py sync_replicas --interval 5
+
+Stands in for replication when trying DATABASE_REPLICAS locally: every
+SQLite replica is overwritten with a consistent snapshot of the primary
+(SQLite's online backup), so readers never see a half-copied file. With
+--interval the copy repeats, which gives the replicas a realistic lag.
+"""
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+SQLITE_ENGINE = 'django.db.backends.sqlite3'
+
+
+class Command(BaseCommand):
+    help = 'Copies the primary SQLite database over every SQLite read replica'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0,
+                            help='Repeat every this many seconds (default: copy once)')
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES['default']
+        if primary['ENGINE'] != SQLITE_ENGINE:
+            raise CommandError('sync_replicas only copies SQLite databases; '
+                               'other databases replicate on the server')
+        replicas = [
+            alias for alias in settings.DATABASE_REPLICAS
+            if settings.DATABASES[alias]['ENGINE'] == SQLITE_ENGINE
+        ]
+        if not replicas:
+            raise CommandError('No SQLite replicas configured (set DATABASE_REPLICAS)')
+
+        while True:
+            started = time.perf_counter()
+            source = sqlite3.connect(primary['NAME'])
+            try:
+                for alias in replicas:
+                    target = sqlite3.connect(settings.DATABASES[alias]['NAME'])
+                    try:
+                        source.backup(target)
+                    finally:
+                        target.close()
+            finally:
+                source.close()
+            self.stdout.write(f'Copied the primary to {", ".join(replicas)} '
+                              f'in {time.perf_counter() - started:.2f}s')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,81 @@
+"""
+Prometheus metrics for the backend.
+
+Under gunicorn, PROMETHEUS_MULTIPROC_DIR is set by gunicorn.conf.py. Each
+worker then writes its samples to files in that directory, and /metrics
+adds them up across all live and dead workers.
+"""
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, REGISTRY,
+    generate_latest, multiprocess,
+)
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+ROW_BUCKETS = (10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+THROUGHPUT_BUCKETS = (100, 1_000, 10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Request latency by route name.',
+    ['route', 'method', 'status'],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_QUERIES = Histogram(
+    'http_request_db_queries',
+    'Database queries issued per request by route name.',
+    ['route'],
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250),
+)
+
+INGEST_ROWS = Counter(
+    'ingest_rows_total',
+    'Equipment rows inserted from uploaded CSV files.',
+)
+INGEST_BATCH_ROWS = Histogram(
+    'ingest_batch_rows',
+    'Rows per ingested batch.',
+    buckets=ROW_BUCKETS,
+)
+INGEST_DURATION = Histogram(
+    'ingest_duration_seconds',
+    'Time to parse and insert one batch.',
+    buckets=LATENCY_BUCKETS,
+)
+INGEST_THROUGHPUT = Histogram(
+    'ingest_rows_per_second',
+    'Parse and insert throughput of one batch.',
+    buckets=THROUGHPUT_BUCKETS,
+)
+
+RETENTION_DELETIONS = Counter(
+    'retention_batches_deleted_total',
+    'Batches removed by the per-user retention limit.',
+)
+
+PDF_RENDER_DURATION = Histogram(
+    'pdf_render_seconds',
+    'Time to build a PDF report.',
+    buckets=LATENCY_BUCKETS,
+)
+
+
+def observe_ingest(rows, seconds):
+    """Record one ingested batch of ``rows`` rows that took ``seconds``."""
+    INGEST_ROWS.inc(rows)
+    INGEST_BATCH_ROWS.observe(rows)
+    INGEST_DURATION.observe(seconds)
+    if seconds > 0:
+        INGEST_THROUGHPUT.observe(rows / seconds)
+
+
+def render_latest():
+    """Return (body, content type) in Prometheus text exposition format."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,232 @@
+import cProfile
+import marshal
+import random
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.db import connections
+from django.middleware.gzip import GZipMiddleware as DjangoGZipMiddleware
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+
+from . import metrics
+from .instrumentation import QueryTimer, timings
+from .profiling import SQLCapture, save_profile
+
+
+class GZipMiddleware(DjangoGZipMiddleware):
+    """
+    Django's GZipMiddleware, except for Server-Sent Events: gzip would hold
+    events back in its buffer instead of sending each one as it happens.
+    """
+
+    def process_response(self, request, response):
+        if response.get('Content-Type', '').startswith('text/event-stream'):
+            return response
+        return super().process_response(request, response)
+
+
+class WhiteNoiseMiddleware(BaseWhiteNoiseMiddleware):
+    """
+    WhiteNoise that can also run in an async middleware chain. WhiteNoise
+    itself is sync-only, and one sync middleware makes Django run every view
+    below it, async views included, on a thread for the whole request.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, **kwargs):
+        super().__init__(get_response, **kwargs)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file, thread_sensitive=False)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
+        return await self.get_response(request)
+
+
+class RequestTimingMiddleware:
+    """
+    Measure wall time, database time, query count, render (serialization)
+    time and response size for every request. The numbers are added to the
+    response as a Server-Timing header and recorded per endpoint.
+
+    Under ASGI only wall time and response size are measured: async views
+    query from sync_to_async threads, out of reach of the execute wrappers.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        query_timer = QueryTimer()
+        request._render_ms = None
+
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(query_timer))
+            response = self.get_response(request)
+        wall_ms = (time.perf_counter() - start) * 1000
+
+        self.record(request, response, wall_ms, query_timer)
+        return response
+
+    async def __acall__(self, request):
+        request._render_ms = None
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self.record(request, response, (time.perf_counter() - start) * 1000)
+        return response
+
+    def record(self, request, response, wall_ms, query_timer=None):
+        render_ms = request._render_ms
+        if response.streaming:
+            response_bytes = None
+        else:
+            response_bytes = len(response.content)
+
+        server_timing = [f'app;dur={wall_ms:.1f}']
+        if query_timer is not None:
+            db_ms = query_timer.duration * 1000
+            queries = query_timer.count
+            server_timing.append(f'db;dur={db_ms:.1f};desc="{queries} queries"')
+        else:
+            db_ms = queries = None
+        if render_ms is not None:
+            server_timing.append(f'render;dur={render_ms:.1f}')
+        response['Server-Timing'] = ', '.join(server_timing)
+
+        match = request.resolver_match
+        if match is not None:
+            route = match.view_name or match._func_path
+            metrics.REQUEST_LATENCY.labels(route, request.method, response.status_code).observe(wall_ms / 1000)
+            if queries is not None:
+                metrics.REQUEST_QUERIES.labels(route).observe(queries)
+            timings.record(route, match._func_path, {
+                'wall_ms': wall_ms,
+                'db_ms': db_ms,
+                'render_ms': render_ms,
+                'queries': queries,
+                'response_bytes': response_bytes,
+            })
+
+    def process_template_response(self, request, response):
+        # DRF responses render (serialize) right after this hook returns
+        render_start = time.perf_counter()
+
+        def finished(rendered):
+            request._render_ms = (time.perf_counter() - render_start) * 1000
+
+        response.add_post_render_callback(finished)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profile selected requests and store the profile with the SQL they ran.
+
+    A request is profiled when a staff user sends the PROFILE_HEADER header,
+    or at random with probability PROFILE_SAMPLE_RATE. With PROFILING_ENABLED
+    off the middleware removes itself from the chain at startup.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        if settings.PROFILER not in ('cprofile', 'pyinstrument'):
+            raise ImproperlyConfigured("PROFILER must be 'cprofile' or 'pyinstrument'.")
+        if settings.PROFILER == 'pyinstrument':
+            try:
+                import pyinstrument  # noqa: F401
+            except ImportError:
+                raise ImproperlyConfigured("PROFILER = 'pyinstrument' requires the pyinstrument package.")
+        self.get_response = get_response
+        self.header = 'HTTP_' + settings.PROFILE_HEADER.upper().replace('-', '_')
+
+    def __call__(self, request):
+        user = self.requested_by_staff(request)
+        if user is None and random.random() >= settings.PROFILE_SAMPLE_RATE:
+            return self.get_response(request)
+        if user is None:
+            user = request.user if request.user.is_authenticated else None
+
+        sql_capture = SQLCapture()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(sql_capture))
+            response, data, extension = self.run_profiled(request)
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        match = request.resolver_match
+        profile_id = save_profile(
+            route=match.view_name if match else None,
+            user=user.get_username() if user else None,
+            method=request.method,
+            path=request.path,
+            duration_ms=duration_ms,
+            queries=sql_capture.queries,
+            data=data,
+            extension=extension,
+        )
+        response['X-Profile-Id'] = profile_id
+        return response
+
+    def requested_by_staff(self, request):
+        """Return the staff user asking for a profile via the header, if any."""
+        if not request.META.get(self.header):
+            return None
+        if request.user.is_authenticated:
+            user = request.user
+        else:
+            # API clients authenticate with a token, which DRF only checks inside the view
+            try:
+                result = TokenAuthentication().authenticate(request)
+            except AuthenticationFailed:
+                return None
+            user = result[0] if result else None
+        return user if user is not None and user.is_staff else None
+
+    def run_profiled(self, request):
+        if settings.PROFILER == 'pyinstrument':
+            from pyinstrument import Profiler
+            profiler = Profiler()
+            profiler.start()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.stop()
+            return response, profiler.output_html().encode(), 'html'
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        profiler.create_stats()
+        return response, marshal.dumps(profiler.stats), 'prof'
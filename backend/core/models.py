@@ -1,7 +1,17 @@
+import math
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from django.utils import timezone
+
+from . import events
+from .metrics import RETENTION_DELETIONS
+from .routers import pin_to_primary
 
 
 class EquipmentBatch(models.Model):
@@ -38,13 +48,90 @@ class EquipmentData(models.Model):
         return f"{self.equipment_name} ({self.type})"
 
 
+class UploadSession(models.Model):
+    """A resumable upload: numbered chunks are stored on disk, then ingested on completion."""
+    STATUS_OPEN = 'open'
+    STATUS_PROCESSING = 'processing'
+    STATUS_COMPLETE = 'complete'
+    STATUS_CHOICES = [
+        (STATUS_OPEN, 'Open'),
+        (STATUS_PROCESSING, 'Processing'),
+        (STATUS_COMPLETE, 'Complete'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_OPEN)
+    # Why the last completion attempt failed, if it did
+    error = models.TextField(blank=True, default='')
+    batch = models.ForeignKey(EquipmentBatch, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # When a completion request claimed the session; a claim older than
+    # UPLOAD_PROCESSING_TIMEOUT is left by a killed worker and may be taken over
+    processing_started_at = models.DateTimeField(null=True, blank=True)
+    # Last chunk received or completion attempt; a session idle for
+    # UPLOAD_SESSION_TTL after it is discarded
+    last_activity_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"Upload {self.id} - {self.filename} ({self.status})"
+    
+    @property
+    def chunk_count(self):
+        return math.ceil(self.size / self.chunk_size)
+    
+    def chunk_length(self, index):
+        """Expected byte length of chunk ``index``; only the last one may be short."""
+        return min(self.chunk_size, self.size - index * self.chunk_size)
+
+
+# Number of batches kept per user
+BATCH_RETENTION = 5
+
+# Set while several batches are written together; retention then runs once at the end
+_retention_deferred = ContextVar('retention_deferred', default=False)
+
+
+@contextmanager
+def defer_retention():
+    """Skip per-batch retention in the block; call apply_retention() afterwards."""
+    token = _retention_deferred.set(True)
+    try:
+        yield
+    finally:
+        _retention_deferred.reset(token)
+
+
+def apply_retention(user):
+    """Delete the user's batches beyond the newest BATCH_RETENTION. Returns the deleted ids."""
+    ids = list(
+        EquipmentBatch.objects.filter(user=user)
+        .order_by('-uploaded_at', '-id')
+        .values_list('id', flat=True)[BATCH_RETENTION:]
+    )
+    if ids:
+        # Cascades to the related EquipmentData
+        EquipmentBatch.objects.filter(id__in=ids).delete()
+        RETENTION_DELETIONS.inc(len(ids))
+        events.publish_on_commit(user.pk, events.RETENTION, {'deleted_batch_ids': ids})
+    return ids
+
+
+@receiver(post_save, sender=EquipmentBatch)
+def pin_uploader_to_primary(sender, instance, created, **kwargs):
+    """Read-your-writes: the uploader's next reads must not hit a replica that lacks the batch."""
+    if created and instance.user_id:
+        pin_to_primary(instance.user_id)
+
+
 @receiver(post_save, sender=EquipmentBatch)
 def enforce_batch_limit(sender, instance, created, **kwargs):
     """Ensure only the last 5 batches are kept PER USER."""
-    if created and instance.user:
-        batches = EquipmentBatch.objects.filter(user=instance.user).order_by('-uploaded_at')
-        if batches.count() > 5:
-            # Get batches to delete (all beyond the 5 most recent)
-            batches_to_delete = batches[5:]
-            for batch in batches_to_delete:
-                batch.delete()  # This will cascade delete related EquipmentDat
+    if created and instance.user and not _retention_deferred.get():
+        apply_retention(instance.user)
@@ -0,0 +1,99 @@
+"""
+Storage for request profiles captured by ProfilingMiddleware.
+
+Each profile is a pair of files in PROFILE_DIR: ``<id>.json`` with the
+route, user, timings and captured SQL, and ``<id>.prof`` (cProfile stats,
+open with pstats or snakeviz) or ``<id>.html`` (pyinstrument).
+"""
+import json
+import re
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+
+
+PROFILE_ID_RE = re.compile(r'^[0-9]{8}T[0-9]{6}-[A-Za-z0-9_.-]+-[0-9a-f]{8}$')
+
+
+def profile_dir():
+    directory = Path(settings.PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+class SQLCapture:
+    """Database execute wrapper that keeps every statement and its duration."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'many': many,
+                'duration_ms': round((time.perf_counter() - start) * 1000, 3),
+            })
+
+
+def save_profile(route, user, method, path, duration_ms, queries, data, extension):
+    """Write one profile and its metadata, then prune the oldest beyond PROFILE_MAX_FILES."""
+    safe_route = re.sub(r'[^A-Za-z0-9_.-]', '_', route or 'unknown')
+    profile_id = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{safe_route}-{uuid.uuid4().hex[:8]}"
+    directory = profile_dir()
+
+    (directory / f'{profile_id}.{extension}').write_bytes(data)
+    metadata = {
+        'id': profile_id,
+        'route': route,
+        'user': user,
+        'method': method,
+        'path': path,
+        'created_at': time.time(),
+        'duration_ms': round(duration_ms, 3),
+        'query_count': len(queries),
+        'query_ms': round(sum(query['duration_ms'] for query in queries), 3),
+        'format': extension,
+        'queries': queries,
+    }
+    (directory / f'{profile_id}.json').write_text(json.dumps(metadata))
+
+    for stale in sorted(directory.glob('*.json'))[:-settings.PROFILE_MAX_FILES]:
+        for path in directory.glob(f'{stale.stem}.*'):
+            path.unlink(missing_ok=True)
+
+    return profile_id
+
+
+def load_metadata(profile_id):
+    """Metadata (including SQL) for a profile, or None if it does not exist."""
+    if not PROFILE_ID_RE.match(profile_id):
+        return None
+    path = profile_dir() / f'{profile_id}.json'
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def list_profiles():
+    """Metadata for every stored profile, newest first, without the SQL."""
+    profiles = []
+    for path in sorted(profile_dir().glob('*.json'), reverse=True):
+        metadata = json.loads(path.read_text())
+        metadata.pop('queries', None)
+        profiles.append(metadata)
+    return profiles
+
+
+def profile_file(profile_id):
+    """Path of the profile data file, or None if it does not exist."""
+    metadata = load_metadata(profile_id)
+    if metadata is None:
+        return None
+    path = profile_dir() / f"{profile_id}.{metadata['format']}"
+    return path if path.exists() else None
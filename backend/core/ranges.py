@@ -0,0 +1,65 @@
+"""
+Single byte-range responses (RFC 9110 section 14) for generated downloads,
+so clients can resume an interrupted transfer with Range and If-Range.
+"""
+import hashlib
+import re
+
+from django.http import HttpResponse
+
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single-range header, None to send the full
+    body (absent, malformed or multi-range), or False if unsatisfiable.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def ranged_response(request, content, content_type):
+    """
+    Response for ``content`` honouring Range and If-Range. The strong ETag
+    is a hash of the full body, so a resumed range only applies if the body
+    has not changed since the first part was fetched. Resuming clients should
+    send ``Accept-Encoding: identity`` so GZipMiddleware leaves the slice as is.
+    """
+    etag = f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+    size = len(content)
+
+    byte_range = parse_range(request.headers.get('Range'), size)
+    if_range = request.headers.get('If-Range')
+    if if_range is not None and if_range != etag:
+        byte_range = None
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+    elif byte_range is None:
+        response = HttpResponse(content, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = HttpResponse(content[start:end + 1], content_type=content_type, status=206)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+    response['ETag'] = etag
+    response['Accept-Ranges'] = 'bytes'
+    return response
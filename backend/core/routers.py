@@ -0,0 +1,93 @@
+"""
+Primary/replica database routing.
+
+Writes, and reads by default, go to the primary (``default``). Read-only
+views opt in to the replicas listed in settings.DATABASE_REPLICAS, either
+with ReplicaReadMixin or the use_replica() context manager, and the router
+sends their queries to a randomly chosen replica.
+
+Replicas lag behind the primary, so a user who has just uploaded would not
+see the new batch there. Creating a batch pins its user to the primary for
+REPLICA_STICKY_SECONDS. The pin lives in the shared cache, so it holds
+across worker processes.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+
+# Alias that reads in the current context are routed to; None means the primary
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def _pin_key(user_id):
+    return f'replica-pin:{user_id}'
+
+
+def pin_to_primary(user_id):
+    """Route the user's reads to the primary for the next REPLICA_STICKY_SECONDS."""
+    if settings.DATABASE_REPLICAS:
+        cache.set(_pin_key(user_id), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def read_alias(user):
+    """Database the user's read-only requests should use: a replica, or the primary while pinned."""
+    if not settings.DATABASE_REPLICAS or cache.get(_pin_key(user.pk)):
+        return DEFAULT_DB_ALIAS
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+async def aread_alias(user):
+    if not settings.DATABASE_REPLICAS or await cache.aget(_pin_key(user.pk)):
+        return DEFAULT_DB_ALIAS
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+@contextmanager
+def use_replica(user):
+    """Route reads in the block to a replica, unless ``user`` is pinned to the primary."""
+    token = _read_alias.set(read_alias(user))
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """Database router for a primary with read replicas (see module docstring)."""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaReadMixin:
+    """
+    For read-only DRF views: run the handler against a replica. The choice is
+    made after authentication, which itself reads from the primary.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._read_alias_token = _read_alias.set(read_alias(request.user))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_read_alias_token', None)
+        if token is not None:
+            _read_alias.reset(token)
+            self._read_alias_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
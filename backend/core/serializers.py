@@ -1,5 +1,8 @@
+import math
+
+from django.conf import settings
 from rest_framework import serializers
-from .models import EquipmentBatch, EquipmentData
+from .models import EquipmentBatch, EquipmentData, UploadSession
 
 
 class EquipmentDataSerializer(serializers.ModelSerializer):
@@ -36,11 +39,72 @@ class CSVUploadSerializer(serializers.Serializer):
     file = serializers.FileField()
     
     def validate_file(self, value):
-        if not value.name.endswith('.csv'):
-            raise serializers.ValidationError("Only CSV files are allowed.")
+        if not value.name.endswith(('.csv', '.csv.gz')):
+            raise serializers.ValidationError("Only CSV files (optionally gzip-compressed) are allowed.")
+        return value
+
+
+class MultiCSVUploadSerializer(serializers.Serializer):
+    """Serializer for uploading several CSV files, or zip archives of them, at once."""
+    files = serializers.ListField(child=serializers.FileField(), allow_empty=False)
+    
+    def validate_files(self, value):
+        for upload in value:
+            if not upload.name.endswith(('.csv', '.csv.gz', '.zip')):
+                raise serializers.ValidationError(
+                    f"{upload.name}: only CSV files (optionally gzip-compressed) or zip archives are allowed."
+                )
         return value
 
 
+class UploadSessionCreateSerializer(serializers.Serializer):
+    """Serializer for starting a resumable chunked upload."""
+    MAX_CHUNKS = 10_000
+    
+    filename = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=1)
+    chunk_size = serializers.IntegerField(required=False)
+    
+    def validate_filename(self, value):
+        if not value.endswith(('.csv', '.csv.gz')):
+            raise serializers.ValidationError("Only CSV files (optionally gzip-compressed) are allowed.")
+        return value
+    
+    def validate_size(self, value):
+        if value > settings.UPLOAD_SESSION_MAX_BYTES:
+            raise serializers.ValidationError(
+                f"Files larger than {settings.UPLOAD_SESSION_MAX_BYTES} bytes are not accepted."
+            )
+        return value
+    
+    def validate_chunk_size(self, value):
+        if not settings.UPLOAD_CHUNK_MIN_BYTES <= value <= settings.UPLOAD_CHUNK_MAX_BYTES:
+            raise serializers.ValidationError(
+                f"Chunk size must be between {settings.UPLOAD_CHUNK_MIN_BYTES} "
+                f"and {settings.UPLOAD_CHUNK_MAX_BYTES} bytes."
+            )
+        return value
+    
+    def validate(self, data):
+        chunk_size = data.setdefault('chunk_size', settings.UPLOAD_CHUNK_SIZE)
+        if math.ceil(data['size'] / chunk_size) > self.MAX_CHUNKS:
+            raise serializers.ValidationError(
+                f"More than {self.MAX_CHUNKS} chunks; use a larger chunk_size."
+            )
+        return data
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Serializer for the state of a resumable upload."""
+    chunk_count = serializers.IntegerField(read_only=True)
+    batch_id = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'filename', 'size', 'chunk_size', 'chunk_count', 'status', 'error', 'batch_id', 'created_at',
+                  'processing_started_at', 'last_activity_at']
+
+
 class DashboardStatsSerializer(serializers.Serializer):
     """Serializer for dashboard statistics."""
     total_count = serializers.IntegerField()
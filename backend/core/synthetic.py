@@ -0,0 +1,65 @@
+"""
+Synthetic equipment data with the same columns as sample_equipment_data.csv,
+used by the generate_equipment_csv command and the benchmarks.
+"""
+import numpy as np
+import pandas as pd
+
+
+CSV_COLUMNS = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+
+# Type -> (name prefix, share of rows, (mean, std) for flowrate, pressure, temperature)
+EQUIPMENT_PROFILES = {
+    'Reactor': ('Reactor', 0.16, (160.0, 15.0), (45.0, 4.0), (280.0, 15.0)),
+    'Pump': ('Pump', 0.20, (90.0, 8.0), (13.5, 1.5), (27.0, 3.0)),
+    'Heat Exchanger': ('Heat Exchanger', 0.14, (190.0, 12.0), (34.0, 3.0), (170.0, 12.0)),
+    'Valve': ('Valve', 0.18, (55.0, 8.0), (9.0, 1.0), (23.0, 2.0)),
+    'Tank': ('Tank', 0.08, (5.0, 5.0), (2.5, 0.5), (25.0, 3.0)),
+    'Compressor': ('Compressor', 0.10, (120.0, 20.0), (60.0, 8.0), (85.0, 10.0)),
+    'Distillation Column': ('Column', 0.06, (140.0, 18.0), (18.0, 3.0), (150.0, 20.0)),
+    'Mixer': ('Mixer', 0.08, (70.0, 10.0), (6.0, 1.0), (40.0, 6.0)),
+}
+
+
+def generate_frame(rows, seed=None, start=0):
+    """Return a DataFrame of ``rows`` synthetic equipment records."""
+    rng = np.random.default_rng(seed)
+    types = list(EQUIPMENT_PROFILES)
+    shares = np.array([EQUIPMENT_PROFILES[name][1] for name in types])
+    choice = rng.choice(len(types), size=rows, p=shares / shares.sum())
+
+    columns = {}
+    for offset, column in enumerate(['Flowrate', 'Pressure', 'Temperature']):
+        means = np.array([EQUIPMENT_PROFILES[name][2 + offset][0] for name in types])
+        stds = np.array([EQUIPMENT_PROFILES[name][2 + offset][1] for name in types])
+        values = rng.normal(means[choice], stds[choice])
+        columns[column] = np.round(np.clip(values, 0, None), 1)
+
+    prefixes = np.array([EQUIPMENT_PROFILES[name][0] for name in types], dtype=object)
+    numbers = pd.Series(np.arange(start + 1, start + rows + 1)).astype(str).str.zfill(6)
+    names = pd.Series(prefixes[choice]) + '-' + numbers
+
+    return pd.DataFrame({
+        'Equipment Name': names.to_numpy(),
+        'Type': np.array(types, dtype=object)[choice],
+        **columns,
+    }, columns=CSV_COLUMNS)
+
+
+def write_csv(target, rows, seed=None, chunk_size=100_000):
+    """
+    Write ``rows`` synthetic records as CSV to a path or text file object,
+    generating ``chunk_size`` rows at a time so memory stays bounded.
+    """
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least 1')
+    rng = np.random.default_rng(seed)
+    written = 0
+    first = True
+    while first or written < rows:
+        count = min(chunk_size, rows - written)
+        frame = generate_frame(count, seed=rng.integers(2 ** 32), start=written)
+        frame.to_csv(target, index=False, header=first, mode='w' if first else 'a')
+        first = False
+        written += count
+    return written
@@ -0,0 +1,68 @@
+import json
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.test import AsyncRequestFactory, override_settings
+from rest_framework.authtoken.models import Token
+
+from . import async_views
+from .tests import APITestCase, equipment_csv
+
+
+@override_settings(THROTTLE_CONCURRENCY={})
+class AsyncViewTests(APITestCase):
+    """The async views served under ASGI answer exactly like the DRF views."""
+
+    def setUp(self):
+        super().setUp()
+        self.factory = AsyncRequestFactory()
+        self.token = Token.objects.create(user=self.user)
+
+    def call(self, view, path, token=None):
+        headers = {'Authorization': f'Token {token or self.token.key}'}
+        return async_to_sync(view)(self.factory.get(path, headers=headers))
+
+    def content(self, response):
+        if not response.streaming:
+            return json.loads(response.content)
+
+        async def read():
+            return b''.join([part async for part in response.streaming_content])
+        return json.loads(async_to_sync(read)())
+
+    def assert_same(self, view, path):
+        expected = self.client.get(path)
+        response = self.call(view, path)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response['Content-Type'], expected['Content-Type'])
+        self.assertEqual(self.content(response), json.loads(expected.content))
+
+    def test_without_batches(self):
+        self.assert_same(async_views.dashboard, '/api/dashboard/')
+        self.assert_same(async_views.equipment_list, '/api/equipment/')
+        self.assert_same(async_views.history, '/api/history/')
+
+    def test_with_batches(self):
+        self.upload('first.csv', equipment_csv(rows=3))
+        self.upload('second.csv', equipment_csv(rows=5, offset=3))
+
+        self.assert_same(async_views.dashboard, '/api/dashboard/')
+        self.assert_same(async_views.history, '/api/history/')
+        # Rows split across several chunks still make one JSON document
+        with mock.patch.object(async_views, 'EQUIPMENT_CHUNK_ROWS', 2):
+            self.assert_same(async_views.equipment_list, '/api/equipment/')
+
+    def test_other_users_batches_are_not_shown(self):
+        self.upload()
+        other = User.objects.create_user('bob', password='Passw0rd!')
+        token = Token.objects.create(user=other)
+
+        response = self.call(async_views.history, '/api/history/', token=token.key)
+        self.assertEqual(self.content(response), [])
+
+    def test_authentication_is_required(self):
+        response = self.call(async_views.dashboard, '/api/dashboard/', token='wrong')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(self.content(response), {'detail': 'Invalid token.'})
+        self.assertEqual(response['WWW-Authenticate'], 'Token')
@@ -0,0 +1,60 @@
+import io
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from .models import BATCH_RETENTION, EquipmentBatch
+from .tests import equipment_csv
+
+
+class BulkIngestTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', password='Passw0rd!')
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.manifest = self.directory / 'manifest.jsonl'
+
+    def write_files(self, count):
+        for i in range(count):
+            (self.directory / f'2024-{i:02d}.csv').write_bytes(equipment_csv(offset=i))
+
+    def bulk_ingest(self):
+        call_command('bulk_ingest', 'alice', str(self.directory), '--workers', '1',
+                     '--manifest', str(self.manifest), stdout=io.StringIO(), stderr=io.StringIO())
+
+    def batch_names(self):
+        return list(EquipmentBatch.objects.filter(user=self.user).order_by('id').values_list('filename', flat=True))
+
+    def test_only_the_files_retention_keeps_are_loaded(self):
+        self.write_files(BATCH_RETENTION + 2)
+        self.bulk_ingest()
+
+        expected = [f'2024-{i:02d}.csv' for i in range(2, BATCH_RETENTION + 2)]
+        self.assertEqual(self.batch_names(), expected)
+        entries = [json.loads(line) for line in self.manifest.read_text().splitlines()]
+        self.assertEqual(sum(1 for entry in entries if entry.get('superseded')), 2)
+
+    def test_rerun_does_not_load_superseded_files(self):
+        self.write_files(BATCH_RETENTION + 2)
+        self.bulk_ingest()
+        before = self.batch_names()
+
+        self.bulk_ingest()
+        self.assertEqual(self.batch_names(), before)
+
+    def test_unknown_user_is_an_error(self):
+        with self.assertRaises(CommandError):
+            call_command('bulk_ingest', 'nobody', str(self.directory), stdout=io.StringIO())
+
+    def test_rerun_loads_only_new_files(self):
+        self.write_files(2)
+        self.bulk_ingest()
+        (self.directory / '2024-99.csv').write_bytes(equipment_csv(offset=99))
+
+        self.bulk_ingest()
+        self.assertEqual(self.batch_names(), ['2024-00.csv', '2024-01.csv', '2024-99.csv'])
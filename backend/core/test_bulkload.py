@@ -0,0 +1,98 @@
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from . import bulkload
+from .ingest import create_batch
+from .models import EquipmentBatch, EquipmentData
+
+
+class CountingLoader(bulkload.ExecuteManyLoader):
+    calls = 0
+
+    def insert(self, batch, rows):
+        CountingLoader.calls += 1
+        super().insert(batch, rows)
+
+
+class FailingLoader(bulkload.ExecuteManyLoader):
+    """Inserts the rows, then fails as a dropped connection would."""
+
+    def insert(self, batch, rows):
+        super().insert(batch, rows)
+        raise RuntimeError('connection lost')
+
+
+class IncompleteLoader(bulkload.BulkLoader):
+    """Forgets to implement insert()."""
+
+
+class BulkLoaderTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', password='Passw0rd!')
+        rows = bulkload.EXECUTEMANY_ROWS + 5
+        self.columns = {
+            'equipment_name': np.array([f'Pump-{i}' for i in range(rows)]),
+            'type': np.array(['Pump', 'Valve'] * (rows // 2) + ['Pump'] * (rows % 2)),
+            'flowrate': np.arange(rows, dtype=float) + 0.5,
+            'pressure': np.full(rows, 5.25),
+            'temperature': np.linspace(20, 80, rows),
+        }
+
+    def assert_loads(self, name):
+        batch, count = create_batch(self.user, 'load.csv', self.columns, loader=bulkload.get_loader(name))
+
+        self.assertEqual(count, len(self.columns['flowrate']))
+        stored = EquipmentData.objects.filter(batch=batch).order_by('id')
+        self.assertEqual(stored.count(), count)
+        last = stored.last()
+        self.assertEqual(last.equipment_name, f'Pump-{count - 1}')
+        self.assertEqual(last.type, self.columns['type'][-1])
+        self.assertAlmostEqual(last.flowrate, self.columns['flowrate'][-1])
+        self.assertAlmostEqual(last.pressure, 5.25)
+        self.assertAlmostEqual(last.temperature, 80.0)
+
+    def test_orm_loader(self):
+        self.assert_loads('orm')
+
+    def test_executemany_loader(self):
+        self.assert_loads('executemany')
+
+    def test_copy_loader(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest('COPY needs PostgreSQL')
+        self.assert_loads('copy')
+
+    def test_auto_picks_the_loader_for_the_database(self):
+        expected = bulkload.CopyLoader if connection.vendor == 'postgresql' else bulkload.ExecuteManyLoader
+        self.assertIsInstance(bulkload.get_loader('auto'), expected)
+
+    def test_dotted_path_loader(self):
+        CountingLoader.calls = 0
+        with override_settings(INGEST_BULK_LOADER='core.test_bulkload.CountingLoader'):
+            create_batch(self.user, 'load.csv', self.columns)
+        self.assertGreater(CountingLoader.calls, 0)
+
+    def test_unknown_or_unsupported_loader_is_refused(self):
+        with self.assertRaises(ImproperlyConfigured):
+            bulkload.get_loader('fastest')
+        if connection.vendor != 'postgresql':
+            with self.assertRaises(ImproperlyConfigured):
+                bulkload.get_loader('copy')
+
+    def test_failed_load_leaves_no_rows(self):
+        with self.assertRaises(RuntimeError):
+            create_batch(self.user, 'load.csv', self.columns, loader=FailingLoader(connection))
+        self.assertFalse(EquipmentBatch.objects.exists())
+        self.assertFalse(EquipmentData.objects.exists())
+
+    def test_loader_without_insert_is_refused(self):
+        with override_settings(INGEST_BULK_LOADER='core.test_bulkload.IncompleteLoader'):
+            with self.assertRaisesMessage(ImproperlyConfigured, 'does not implement insert'):
+                bulkload.get_loader()
+
+    def test_dotted_path_must_name_a_bulk_loader(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, 'is not a BulkLoader subclass'):
+            bulkload.get_loader('core.models.EquipmentData')
@@ -0,0 +1,101 @@
+import importlib
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
+from django.urls import clear_url_caches
+
+from . import events
+from .tests import APITestCase, equipment_csv
+
+
+@override_settings(THROTTLE_CONCURRENCY={}, EVENT_STREAM_ENABLED=True)
+class EventFeedTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        # The store outlives test databases, so only look at events from this test on
+        self.start = events.latest_id()
+
+    def received(self, user_id=None):
+        return [
+            (event_type, data)
+            for event_id, event_type, data in events.events_since(user_id or self.user.pk, self.start)
+        ]
+
+    def test_events_come_back_in_order_per_user(self):
+        first = events.publish(self.user.pk, events.INGEST_PROGRESS, {'n': 1})
+        events.publish(self.user.pk + 1000, events.INGEST_PROGRESS, {'n': 'other'})
+        second = events.publish(self.user.pk, events.BATCH_CREATED, {'n': 2})
+
+        self.assertLess(first, second)
+        self.assertEqual(self.received(), [(events.INGEST_PROGRESS, {'n': 1}), (events.BATCH_CREATED, {'n': 2})])
+        # Resuming from an id only returns what came after it
+        self.assertEqual([event_id for event_id, _, _ in events.events_since(self.user.pk, first)], [second])
+
+    def test_limit_returns_the_oldest_first(self):
+        for n in range(5):
+            events.publish(self.user.pk, events.INGEST_PROGRESS, {'n': n})
+        page = events.events_since(self.user.pk, self.start, limit=2)
+        self.assertEqual([data['n'] for _, _, data in page], [0, 1])
+
+    @override_settings(EVENT_RETENTION=-1)
+    def test_expired_events_are_dropped(self):
+        events.publish(self.user.pk, events.INGEST_PROGRESS, {'n': 1})
+        events.publish(self.user.pk, events.INGEST_PROGRESS, {'n': 2})
+        self.assertEqual(self.received(), [])
+
+    @override_settings(EVENT_STREAM_ENABLED=False)
+    def test_nothing_is_stored_without_the_stream(self):
+        self.assertIsNone(events.publish(self.user.pk, events.INGEST_PROGRESS, {}))
+        self.assertEqual(self.received(), [])
+
+    def test_batch_created_waits_for_the_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.upload()
+            self.assertNotIn(events.BATCH_CREATED, [event_type for event_type, _ in self.received()])
+        for callback in callbacks:
+            callback()
+
+        types = [event_type for event_type, _ in self.received()]
+        self.assertEqual(types[0], events.INGEST_PROGRESS)
+        self.assertEqual(types[-1], events.BATCH_CREATED)
+
+    def test_failed_upload_ends_with_ingest_failed(self):
+        self.assertEqual(self.upload('bad.csv', b'Name,Type\nx,y\n').status_code, 400)
+
+        received = self.received()
+        self.assertEqual([event_type for event_type, _ in received], [events.INGEST_PROGRESS, events.INGEST_FAILED])
+        self.assertEqual(received[-1][1]['filename'], 'bad.csv')
+        self.assertIn('Missing required columns', received[-1][1]['error'])
+
+    def test_failed_multi_upload_reports_every_file(self):
+        files = [
+            SimpleUploadedFile('good.csv', equipment_csv()),
+            SimpleUploadedFile('bad.csv', b'Name,Type\nx,y\n'),
+        ]
+        self.assertEqual(self.client.post('/api/upload/multi/', {'files': files}, format='multipart').status_code, 400)
+
+        failed = {data['filename']: data['error'] for event_type, data in self.received()
+                  if event_type == events.INGEST_FAILED}
+        self.assertEqual(set(failed), {'good.csv', 'bad.csv'})
+        self.assertIn('another file', failed['good.csv'])
+
+
+class EventStreamRouteTests(SimpleTestCase):
+    def route_names(self, urlconf):
+        module = importlib.import_module(urlconf)
+        self.addCleanup(clear_url_caches)
+        self.addCleanup(importlib.reload, module)
+        importlib.reload(module)
+        return {getattr(pattern, 'name', None) for pattern in module.urlpatterns}
+
+    def test_stream_is_only_routed_when_enabled(self):
+        for urlconf in ('core.urls', 'config.asgi_urls'):
+            with self.subTest(urlconf=urlconf):
+                with override_settings(EVENT_STREAM_ENABLED=False):
+                    self.assertNotIn('event-stream', self.route_names(urlconf))
+                with override_settings(EVENT_STREAM_ENABLED=True):
+                    self.assertIn('event-stream', self.route_names(urlconf))
+
+    def test_disabled_stream_is_not_found(self):
+        # The test run uses the WSGI urlconf with the stream off
+        self.assertEqual(self.client.get('/api/events/').status_code, 404)
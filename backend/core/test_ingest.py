@@ -0,0 +1,109 @@
+import gzip
+import io
+import zipfile
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+
+from .ingest import IngestError, create_batch, create_batches, read_equipment_csv
+from .models import BATCH_RETENTION, EquipmentBatch, EquipmentData
+from .tests import APITestCase, equipment_columns, equipment_csv
+
+
+@override_settings(THROTTLE_CONCURRENCY={}, UPLOAD_DECOMPRESSED_MAX_BYTES=100)
+class DecompressedLimitTests(APITestCase):
+    def test_parser_stops_past_the_limit(self):
+        with self.assertRaisesMessage(IngestError, 'decompresses to more than 100 bytes'):
+            read_equipment_csv(io.BytesIO(gzip.compress(equipment_csv(rows=50))), compressed=True)
+
+    def test_file_within_the_limit_is_parsed(self):
+        content = equipment_csv(rows=1)
+        self.assertLessEqual(len(content), 100)
+        columns = read_equipment_csv(io.BytesIO(gzip.compress(content)), compressed=True)
+        self.assertEqual(len(columns['flowrate']), 1)
+
+    def test_gzip_upload_past_the_limit_is_refused(self):
+        response = self.upload('big.csv.gz', gzip.compress(equipment_csv(rows=50)))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('decompresses to more than 100 bytes', response.data['error'])
+        self.assertFalse(EquipmentBatch.objects.exists())
+
+    def test_gzip_member_of_an_archive_past_the_limit_is_refused(self):
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as zf:
+            zf.writestr('big.csv.gz', gzip.compress(equipment_csv(rows=50)))
+        response = self.client.post('/api/upload/multi/', {
+            'files': [SimpleUploadedFile('archive.zip', archive.getvalue())]
+        }, format='multipart')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('decompresses to more than 100 bytes', response.data['files'][0]['error'])
+        self.assertFalse(EquipmentBatch.objects.exists())
+
+
+@override_settings(THROTTLE_CONCURRENCY={})
+class RetentionTests(APITestCase):
+    def test_single_uploads_keep_the_newest_batches(self):
+        batch_ids = [self.upload(f'file{i}.csv').data['batch_id'] for i in range(BATCH_RETENTION + 2)]
+
+        kept = list(EquipmentBatch.objects.filter(user=self.user).order_by('id').values_list('id', flat=True))
+        self.assertEqual(kept, batch_ids[-BATCH_RETENTION:])
+        self.assertFalse(EquipmentData.objects.filter(batch_id__in=batch_ids[:2]).exists())
+
+    def test_retention_is_per_user(self):
+        other = User.objects.create_user('bob', password='Passw0rd!')
+        create_batch(other, 'bob.csv', equipment_columns())
+        for i in range(BATCH_RETENTION + 1):
+            self.upload(f'file{i}.csv')
+
+        self.assertEqual(EquipmentBatch.objects.filter(user=self.user).count(), BATCH_RETENTION)
+        self.assertEqual(EquipmentBatch.objects.filter(user=other).count(), 1)
+
+    def test_create_batches_applies_retention_once(self):
+        create_batch(self.user, 'old.csv', equipment_columns())
+        parsed = [(f'file{i}.csv', equipment_columns()) for i in range(BATCH_RETENTION + 1)]
+
+        created, removed = create_batches(self.user, parsed)
+
+        self.assertEqual(len(created), BATCH_RETENTION + 1)
+        self.assertEqual(len(removed), 2)
+        self.assertFalse(EquipmentBatch.objects.filter(id__in=removed).exists())
+        kept = EquipmentBatch.objects.filter(user=self.user).order_by('id').values_list('filename', flat=True)
+        self.assertEqual(list(kept), [f'file{i}.csv' for i in range(1, BATCH_RETENTION + 1)])
+
+    def test_multi_upload_reports_which_files_were_retained(self):
+        files = [SimpleUploadedFile(f'file{i}.csv', equipment_csv(offset=i)) for i in range(BATCH_RETENTION + 1)]
+        response = self.client.post('/api/upload/multi/', {'files': files}, format='multipart')
+
+        self.assertEqual(response.status_code, 201)
+        retained = [entry['retained'] for entry in response.data['files']]
+        self.assertEqual(retained, [False] + [True] * BATCH_RETENTION)
+
+    def test_multi_upload_stores_nothing_if_a_file_fails(self):
+        files = [
+            SimpleUploadedFile('good.csv', equipment_csv()),
+            SimpleUploadedFile('bad.csv', b'Name,Type\nx,y\n'),
+        ]
+        response = self.client.post('/api/upload/multi/', {'files': files}, format='multipart')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([entry['filename'] for entry in response.data['files']], ['bad.csv'])
+        self.assertFalse(EquipmentBatch.objects.exists())
+
+    def test_archive_members_become_batches_in_name_order(self):
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as zf:
+            zf.writestr('b.csv', equipment_csv(offset=1))
+            zf.writestr('a.csv.gz', gzip.compress(equipment_csv()))
+            zf.writestr('__MACOSX/._a.csv', b'junk')
+            zf.writestr('notes.txt', b'ignored')
+        response = self.client.post('/api/upload/multi/', {
+            'files': [SimpleUploadedFile('archive.zip', archive.getvalue())]
+        }, format='multipart')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([entry['filename'] for entry in response.data['files']], ['a.csv.gz', 'b.csv'])
+        names = EquipmentBatch.objects.order_by('id').values_list('filename', flat=True)
+        self.assertEqual(list(names), ['a.csv', 'b.csv'])
@@ -0,0 +1,37 @@
+from django.contrib.auth.models import User
+from django.test import Client, TestCase, override_settings
+
+
+@override_settings(METRICS_TOKEN='s3cret')
+class MetricsViewTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+
+    def assert_refused(self, response):
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer')
+
+    def test_anonymous_is_refused(self):
+        self.assert_refused(self.client.get('/metrics'))
+
+    def test_wrong_token_is_refused(self):
+        self.assert_refused(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer guess'))
+
+    def test_token(self):
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'ingest_rows_total', response.content)
+
+    def test_staff_session(self):
+        self.client.force_login(User.objects.create_user('admin', password='Passw0rd!', is_staff=True))
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    def test_other_users_are_refused(self):
+        self.client.force_login(User.objects.create_user('alice', password='Passw0rd!'))
+        self.assert_refused(self.client.get('/metrics'))
+
+    @override_settings(METRICS_TOKEN='')
+    def test_no_token_configured_only_allows_staff(self):
+        self.assert_refused(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer '))
+        self.client.force_login(User.objects.create_user('admin', password='Passw0rd!', is_staff=True))
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
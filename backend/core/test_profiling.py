@@ -0,0 +1,66 @@
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from . import profiling
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir, ignore_errors=True)
+        settings_override = override_settings(PROFILING_ENABLED=True, PROFILER='cprofile',
+                                              PROFILE_SAMPLE_RATE=0, PROFILE_DIR=self.profile_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.staff = User.objects.create_user('admin', password='Passw0rd!', is_staff=True)
+        self.user = User.objects.create_user('alice', password='Passw0rd!')
+        self.client = APIClient()
+
+    def get(self, path, user, **extra):
+        token, _ = Token.objects.get_or_create(user=user)
+        return self.client.get(path, HTTP_AUTHORIZATION=f'Token {token.key}', **extra)
+
+    def test_staff_header_captures_a_profile(self):
+        response = self.get('/api/history/', self.staff, HTTP_X_PROFILE='1')
+        profile_id = response['X-Profile-Id']
+
+        detail = self.get(f'/api/ops/profiles/{profile_id}/', self.staff)
+        self.assertEqual(detail.status_code, 200)
+        self.assertEqual(detail.data['route'], 'history')
+        self.assertEqual(detail.data['user'], 'admin')
+        self.assertGreater(detail.data['query_count'], 0)
+
+        listed = self.get('/api/ops/profiles/', self.staff).data['profiles']
+        self.assertEqual([profile['id'] for profile in listed], [profile_id])
+        self.assertNotIn('queries', listed[0])
+
+        download = self.get(f'/api/ops/profiles/{profile_id}/download/', self.staff)
+        self.assertEqual(download.status_code, 200)
+        self.assertIn(f'{profile_id}.prof', download['Content-Disposition'])
+
+    def test_header_from_other_users_is_ignored(self):
+        response = self.get('/api/history/', self.user, HTTP_X_PROFILE='1')
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(profiling.list_profiles(), [])
+
+    def test_profile_endpoints_are_staff_only(self):
+        profile_id = self.get('/api/history/', self.staff, HTTP_X_PROFILE='1')['X-Profile-Id']
+        for path in ('/api/ops/profiles/', f'/api/ops/profiles/{profile_id}/',
+                     f'/api/ops/profiles/{profile_id}/download/'):
+            self.assertEqual(self.get(path, self.user).status_code, 403)
+            self.assertEqual(self.client.get(path).status_code, 401)
+
+    def test_profile_ids_cannot_leave_the_profile_directory(self):
+        for profile_id in ('../secrets', '..%2F..%2Fsettings', '20240101T000000-x-0000000g',
+                           '20240101T000000-../../etc-deadbeef'):
+            self.assertIsNone(profiling.PROFILE_ID_RE.match(profile_id))
+            self.assertIsNone(profiling.load_metadata(profile_id))
+            self.assertIsNone(profiling.profile_file(profile_id))
+        response = self.get('/api/ops/profiles/..%2F..%2Fsettings/', self.staff)
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,77 @@
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from .ranges import parse_range, ranged_response
+from .tests import APITestCase, equipment_csv
+
+
+class ByteRangeTests(SimpleTestCase):
+    content = bytes(range(100))
+
+    def get(self, **headers):
+        request = RequestFactory().get('/report.pdf', headers=headers)
+        return ranged_response(request, self.content, 'application/pdf')
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range('bytes=10-19', 100), (10, 19))
+        self.assertEqual(parse_range('bytes=90-', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=-5', 100), (95, 99))
+        self.assertEqual(parse_range('bytes=95-500', 100), (95, 99))
+        self.assertEqual(parse_range('bytes=-500', 100), (0, 99))
+        self.assertFalse(parse_range('bytes=100-', 100))
+        self.assertFalse(parse_range('bytes=20-10', 100))
+        self.assertFalse(parse_range('bytes=-0', 100))
+        self.assertIsNone(parse_range(None, 100))
+        self.assertIsNone(parse_range('bytes=0-1,5-6', 100))
+        self.assertIsNone(parse_range('items=0-1', 100))
+
+    def test_full_body_without_range(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, self.content)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertTrue(response['ETag'].startswith('"'))
+
+    def test_range(self):
+        response = self.get(Range='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, self.content[10:20])
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/100')
+
+    def test_unsatisfiable_range(self):
+        response = self.get(Range='bytes=200-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */100')
+
+    def test_if_range_with_current_etag_resumes(self):
+        etag = self.get()['ETag']
+        response = self.get(Range='bytes=50-', **{'If-Range': etag})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, self.content[50:])
+
+    def test_if_range_with_old_etag_sends_everything(self):
+        response = self.get(Range='bytes=50-', **{'If-Range': '"stale"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, self.content)
+
+
+@override_settings(THROTTLE_CONCURRENCY={})
+class PDFReportRangeTests(APITestCase):
+    def test_interrupted_download_resumes(self):
+        self.upload()
+        full = self.client.get('/api/report/pdf/', HTTP_ACCEPT_ENCODING='identity')
+        self.assertEqual(full.status_code, 200)
+
+        response = self.client.get('/api/report/pdf/', HTTP_ACCEPT_ENCODING='identity',
+                                   HTTP_RANGE='bytes=100-', HTTP_IF_RANGE=full['ETag'])
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, full.content[100:])
+
+    def test_new_batch_restarts_the_download(self):
+        self.upload()
+        etag = self.client.get('/api/report/pdf/', HTTP_ACCEPT_ENCODING='identity')['ETag']
+        self.upload('newer.csv', equipment_csv(offset=10))
+
+        response = self.client.get('/api/report/pdf/', HTTP_ACCEPT_ENCODING='identity',
+                                   HTTP_RANGE='bytes=100-', HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
@@ -0,0 +1,49 @@
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.test import TestCase, override_settings
+
+from . import routers
+from .models import EquipmentBatch
+from .tests import LOCMEM_CACHE
+
+
+@override_settings(CACHES=LOCMEM_CACHE, DATABASE_REPLICAS=['replica'], REPLICA_STICKY_SECONDS=30)
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('alice', password='Passw0rd!')
+
+    def test_reads_go_to_a_replica(self):
+        self.assertEqual(routers.read_alias(self.user), 'replica')
+        self.assertEqual(async_to_sync(routers.aread_alias)(self.user), 'replica')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_reads_go_to_the_primary_without_replicas(self):
+        self.assertEqual(routers.read_alias(self.user), DEFAULT_DB_ALIAS)
+
+    def test_new_batch_pins_its_user_to_the_primary(self):
+        other = User.objects.create_user('bob', password='Passw0rd!')
+        EquipmentBatch.objects.create(user=self.user, filename='new.csv')
+
+        self.assertEqual(routers.read_alias(self.user), DEFAULT_DB_ALIAS)
+        self.assertEqual(async_to_sync(routers.aread_alias)(self.user), DEFAULT_DB_ALIAS)
+        self.assertEqual(routers.read_alias(other), 'replica')
+
+    def test_use_replica_routes_reads_in_the_block(self):
+        router = routers.PrimaryReplicaRouter()
+        self.assertIsNone(router.db_for_read(EquipmentBatch))
+        with routers.use_replica(self.user):
+            self.assertEqual(router.db_for_read(EquipmentBatch), 'replica')
+            self.assertEqual(router.db_for_write(EquipmentBatch), DEFAULT_DB_ALIAS)
+        self.assertIsNone(router.db_for_read(EquipmentBatch))
+
+        routers.pin_to_primary(self.user.pk)
+        with routers.use_replica(self.user):
+            self.assertEqual(router.db_for_read(EquipmentBatch), DEFAULT_DB_ALIAS)
+
+    def test_replicas_are_not_migrated(self):
+        router = routers.PrimaryReplicaRouter()
+        self.assertFalse(router.allow_migrate('replica', 'core'))
+        self.assertTrue(router.allow_migrate(DEFAULT_DB_ALIAS, 'core'))
@@ -0,0 +1,59 @@
+import io
+import shutil
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+from .ingest import read_equipment_csv
+from .synthetic import CSV_COLUMNS, EQUIPMENT_PROFILES, write_csv
+
+
+class SyntheticCSVTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def test_rows_span_chunks_with_one_header(self):
+        buffer = io.StringIO()
+        self.assertEqual(write_csv(buffer, 25, seed=1, chunk_size=10), 25)
+
+        frame = pd.read_csv(io.StringIO(buffer.getvalue()))
+        self.assertEqual(list(frame.columns), CSV_COLUMNS)
+        self.assertEqual(len(frame), 25)
+        self.assertTrue(frame['Equipment Name'].is_unique)
+        self.assertTrue(set(frame['Type']) <= set(EQUIPMENT_PROFILES))
+        self.assertTrue((frame[['Flowrate', 'Pressure', 'Temperature']] >= 0).all().all())
+
+    def test_seed_makes_files_reproducible(self):
+        first, second, other = io.StringIO(), io.StringIO(), io.StringIO()
+        write_csv(first, 50, seed=7, chunk_size=20)
+        write_csv(second, 50, seed=7, chunk_size=20)
+        write_csv(other, 50, seed=8, chunk_size=20)
+        self.assertEqual(first.getvalue(), second.getvalue())
+        self.assertNotEqual(first.getvalue(), other.getvalue())
+
+    def test_zero_rows_writes_the_header(self):
+        buffer = io.StringIO()
+        write_csv(buffer, 0)
+        self.assertEqual(buffer.getvalue().strip(), ','.join(CSV_COLUMNS))
+
+    def test_chunk_size_below_one_is_refused(self):
+        with self.assertRaises(ValueError):
+            write_csv(io.StringIO(), 10, chunk_size=0)
+
+    def test_command_writes_a_file_the_upload_accepts(self):
+        path = self.directory / 'equipment.csv'
+        call_command('generate_equipment_csv', '30', '--output', str(path), '--seed', '3',
+                     '--chunk-size', '7', stdout=io.StringIO())
+
+        columns = read_equipment_csv(str(path))
+        self.assertEqual(len(columns['flowrate']), 30)
+
+    def test_command_refuses_bad_arguments(self):
+        with self.assertRaisesMessage(CommandError, '--chunk-size must be at least 1'):
+            call_command('generate_equipment_csv', '10', '--chunk-size', '0', stdout=io.StringIO())
+        with self.assertRaises(CommandError):
+            call_command('generate_equipment_csv', '-1', stdout=io.StringIO())
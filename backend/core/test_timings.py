@@ -0,0 +1,50 @@
+from django.contrib.auth.models import User
+from django.test import override_settings
+
+from .instrumentation import timings
+from .tests import APITestCase
+
+
+@override_settings(THROTTLE_CONCURRENCY={})
+class RequestTimingTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        timings.reset()
+        self.addCleanup(timings.reset)
+
+    def test_server_timing_header(self):
+        response = self.client.get('/api/history/')
+
+        parts = [part.split(';')[0] for part in response['Server-Timing'].split(', ')]
+        self.assertEqual(parts[:2], ['app', 'db'])
+        self.assertIn('render', parts)
+        self.assertRegex(response['Server-Timing'], r'db;dur=[0-9.]+;desc="[0-9]+ queries"')
+
+    def test_timings_are_recorded_per_endpoint(self):
+        self.client.get('/api/history/')
+        self.client.get('/api/history/')
+
+        staff = User.objects.create_user('admin', password='Passw0rd!', is_staff=True)
+        self.client.force_authenticate(staff)
+        endpoints = {entry['endpoint']: entry for entry in self.client.get('/api/ops/timings/').data['endpoints']}
+
+        history = endpoints['history']
+        self.assertEqual(history['total_requests'], 2)
+        self.assertEqual(history['metrics']['wall_ms']['count'], 2)
+        self.assertEqual(history['metrics']['wall_ms']['histogram']['le_inf'], 2)
+        self.assertGreater(history['metrics']['queries']['max'], 0)
+
+    def test_reset(self):
+        self.client.get('/api/history/')
+        staff = User.objects.create_user('admin', password='Passw0rd!', is_staff=True)
+        self.client.force_authenticate(staff)
+
+        self.assertEqual(self.client.delete('/api/ops/timings/').status_code, 204)
+        endpoints = [entry['endpoint'] for entry in self.client.get('/api/ops/timings/').data['endpoints']]
+        self.assertNotIn('history', endpoints)
+
+    def test_timings_are_staff_only(self):
+        self.assertEqual(self.client.get('/api/ops/timings/').status_code, 403)
+        self.assertEqual(self.client.delete('/api/ops/timings/').status_code, 403)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get('/api/ops/timings/').status_code, 401)
@@ -0,0 +1,199 @@
+import io
+from datetime import timedelta
+from pathlib import Path
+
+from django.test import override_settings
+from django.utils import timezone
+
+from . import uploads
+from .models import EquipmentBatch, UploadSession
+from .tests import APITestCase, equipment_csv
+
+
+@override_settings(THROTTLE_CONCURRENCY={}, UPLOAD_CHUNK_MIN_BYTES=16)
+class UploadSessionTests(APITestCase):
+    def start(self, content, chunk_size=64, filename='equipment.csv'):
+        response = self.client.post('/api/upload/sessions/', {
+            'filename': filename, 'size': len(content), 'chunk_size': chunk_size
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.data['id']
+
+    def put_chunk(self, session_id, index, data):
+        return self.client.put(f'/api/upload/sessions/{session_id}/chunks/{index}/', data,
+                               content_type='application/octet-stream')
+
+    def send_all(self, session_id, content, chunk_size=64, order=None):
+        chunks = [content[start:start + chunk_size] for start in range(0, len(content), chunk_size)]
+        for index in order or range(len(chunks)):
+            self.assertEqual(self.put_chunk(session_id, index, chunks[index]).status_code, 200)
+        return chunks
+
+    def complete(self, session_id):
+        return self.client.post(f'/api/upload/sessions/{session_id}/complete/')
+
+    def test_chunks_in_any_order_complete_into_a_batch(self):
+        content = equipment_csv(rows=10)
+        session_id = self.start(content)
+        count = -(-len(content) // 64)
+        self.send_all(session_id, content, order=reversed(range(count)))
+
+        response = self.complete(session_id)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['records_created'], 10)
+        session = UploadSession.objects.get(pk=session_id)
+        self.assertEqual(session.status, UploadSession.STATUS_COMPLETE)
+        self.assertEqual(session.batch_id, response.data['batch_id'])
+
+    def test_completion_lists_missing_chunks(self):
+        content = equipment_csv(rows=10)
+        session_id = self.start(content)
+        self.put_chunk(session_id, 0, content[:64])
+
+        response = self.complete(session_id)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['missing'][0], 1)
+        self.assertEqual(UploadSession.objects.get(pk=session_id).status, UploadSession.STATUS_OPEN)
+
+    def test_retried_completion_returns_the_same_batch(self):
+        content = equipment_csv()
+        session_id = self.start(content)
+        self.send_all(session_id, content)
+        batch_id = self.complete(session_id).data['batch_id']
+
+        response = self.complete(session_id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['batch_id'], batch_id)
+        self.assertEqual(EquipmentBatch.objects.count(), 1)
+        self.assertEqual(self.put_chunk(session_id, 0, content[:64]).status_code, 409)
+
+    def test_wrong_chunk_length_is_refused(self):
+        content = equipment_csv(rows=10)
+        session_id = self.start(content)
+        self.assertEqual(self.put_chunk(session_id, 0, content[:10]).status_code, 400)
+        self.assertEqual(self.put_chunk(session_id, 999, content[:64]).status_code, 400)
+
+    def test_failed_ingest_reopens_the_session(self):
+        content = b'Name,Type\n' + b'x,y\n' * 20
+        session_id = self.start(content)
+        self.send_all(session_id, content)
+
+        response = self.complete(session_id)
+        self.assertEqual(response.status_code, 400)
+        session = UploadSession.objects.get(pk=session_id)
+        self.assertEqual(session.status, UploadSession.STATUS_OPEN)
+        self.assertIn('Missing required columns', session.error)
+
+    def claim(self, session_id, started_at):
+        UploadSession.objects.filter(pk=session_id).update(
+            status=UploadSession.STATUS_PROCESSING, processing_started_at=started_at
+        )
+
+    def test_session_being_processed_cannot_be_completed_or_deleted(self):
+        content = equipment_csv()
+        session_id = self.start(content)
+        self.send_all(session_id, content)
+        self.claim(session_id, timezone.now())
+
+        self.assertEqual(self.complete(session_id).status_code, 409)
+        self.assertEqual(self.client.delete(f'/api/upload/sessions/{session_id}/').status_code, 409)
+        self.assertFalse(EquipmentBatch.objects.exists())
+
+    @override_settings(UPLOAD_PROCESSING_TIMEOUT=60)
+    def test_stale_processing_claim_can_be_completed(self):
+        content = equipment_csv()
+        session_id = self.start(content)
+        self.send_all(session_id, content)
+        # The worker that claimed it was killed mid-ingest
+        self.claim(session_id, timezone.now() - timedelta(seconds=61))
+
+        response = self.complete(session_id)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(UploadSession.objects.get(pk=session_id).status, UploadSession.STATUS_COMPLETE)
+
+    @override_settings(UPLOAD_PROCESSING_TIMEOUT=60)
+    def test_stale_processing_claim_can_be_deleted(self):
+        content = equipment_csv()
+        session_id = self.start(content)
+        self.send_all(session_id, content)
+        self.claim(session_id, timezone.now() - timedelta(seconds=61))
+
+        self.assertEqual(self.client.delete(f'/api/upload/sessions/{session_id}/').status_code, 204)
+        self.assertFalse(UploadSession.objects.filter(pk=session_id).exists())
+        self.assertFalse((Path(self.state_dir) / 'uploads' / str(session_id)).exists())
+
+    @override_settings(UPLOAD_SESSION_USER_MAX_OPEN=1)
+    def test_unfinished_sessions_are_limited_per_user(self):
+        self.start(equipment_csv())
+        response = self.client.post('/api/upload/sessions/', {
+            'filename': 'second.csv', 'size': 100, 'chunk_size': 64
+        }, format='json')
+        self.assertEqual(response.status_code, 409)
+
+    @override_settings(UPLOAD_SESSION_USER_MAX_BYTES=1000)
+    def test_unfinished_bytes_are_limited_per_user(self):
+        response = self.client.post('/api/upload/sessions/', {
+            'filename': 'big.csv', 'size': 1001, 'chunk_size': 64
+        }, format='json')
+        self.assertEqual(response.status_code, 409)
+
+
+@override_settings(UPLOAD_SESSION_TTL=3600, UPLOAD_PROCESSING_TIMEOUT=60, UPLOAD_CHUNK_MIN_BYTES=16)
+class UploadSessionPurgeTests(APITestCase):
+    def create(self, status=UploadSession.STATUS_OPEN, idle=7200, claimed=None):
+        now = timezone.now()
+        session = UploadSession.objects.create(
+            user=self.user, filename='equipment.csv', size=100, chunk_size=64, status=status,
+            processing_started_at=now - timedelta(seconds=claimed) if claimed is not None else None,
+        )
+        UploadSession.objects.filter(pk=session.pk).update(
+            created_at=now - timedelta(days=3), last_activity_at=now - timedelta(seconds=idle)
+        )
+        uploads.write_chunk(session, 0, io.BytesIO(b'x' * 64), 64)
+        return session
+
+    def assert_kept(self, session):
+        self.assertTrue(UploadSession.objects.filter(pk=session.pk).exists())
+        self.assertEqual(uploads.received_chunks(session), [0])
+
+    def assert_purged(self, session):
+        self.assertFalse(UploadSession.objects.filter(pk=session.pk).exists())
+        self.assertFalse(uploads.session_dir(session).exists())
+
+    def test_idle_session_is_purged_with_its_chunks(self):
+        session = self.create()
+        self.assertEqual(uploads.purge_expired_sessions(), 1)
+        self.assert_purged(session)
+
+    def test_ttl_runs_from_the_last_activity(self):
+        # Created days ago, but chunks are still arriving
+        session = self.create(idle=60)
+        self.assertEqual(uploads.purge_expired_sessions(), 0)
+        self.assert_kept(session)
+
+    def test_chunk_upload_counts_as_activity(self):
+        session = self.create()
+        response = self.client.put(f'/api/upload/sessions/{session.pk}/chunks/1/', b'y' * 36,
+                                   content_type='application/octet-stream')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(uploads.purge_expired_sessions(), 0)
+        self.assertTrue(UploadSession.objects.filter(pk=session.pk).exists())
+
+    def test_session_being_processed_survives_a_purge(self):
+        session = self.create(status=UploadSession.STATUS_PROCESSING, claimed=30)
+        self.assertEqual(uploads.purge_expired_sessions(), 0)
+        self.assert_kept(session)
+
+    def test_stale_processing_claim_is_purged(self):
+        session = self.create(status=UploadSession.STATUS_PROCESSING, claimed=120)
+        self.assertEqual(uploads.purge_expired_sessions(), 1)
+        self.assert_purged(session)
+
+    def test_starting_a_session_purges_idle_ones(self):
+        idle = self.create()
+        response = self.client.post('/api/upload/sessions/', {
+            'filename': 'new.csv', 'size': 100, 'chunk_size': 64
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assert_purged(idle)
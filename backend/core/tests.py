@@ -1,3 +1,115 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+import uuid
+from pathlib import Path
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from .ingest import read_equipment_csv
+from .models import EquipmentBatch
+from .throttles import acquire_slot, release_slot
+
+
+# Throttle history and replica pins go to a per-process cache, not the shared file cache
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+CSV_HEADER = 'Equipment Name,Type,Flowrate,Pressure,Temperature\n'
+
+
+def equipment_csv(rows=3, offset=0):
+    lines = [f'Pump-{offset + i},Pump,{100 + i}.5,{5 + i}.0,{80 + i}.0\n' for i in range(rows)]
+    return (CSV_HEADER + ''.join(lines)).encode()
+
+
+def equipment_columns(rows=3):
+    return read_equipment_csv(io.BytesIO(equipment_csv(rows)))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class APITestCase(TestCase):
+    """An authenticated API client, with throttling and uploads kept to this test."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('alice', password='Passw0rd!')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.state_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.state_dir, ignore_errors=True)
+        settings_override = override_settings(UPLOAD_SESSION_DIR=Path(self.state_dir) / 'uploads')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def upload(self, name='equipment.csv', content=None):
+        return self.client.post('/api/upload/', {
+            'file': SimpleUploadedFile(name, content or equipment_csv())
+        }, format='multipart')
+
+
+class ConcurrencySlotTests(SimpleTestCase):
+    def setUp(self):
+        self.key = f'test:{uuid.uuid4().hex}'
+
+    def test_slots_are_limited_and_released(self):
+        first = acquire_slot(self.key, 2, 60)
+        second = acquire_slot(self.key, 2, 60)
+        self.assertIsNotNone(first)
+        self.assertIsNotNone(second)
+        self.assertIsNone(acquire_slot(self.key, 2, 60))
+
+        release_slot(first)
+        third = acquire_slot(self.key, 2, 60)
+        self.assertIsNotNone(third)
+        release_slot(second)
+        release_slot(third)
+
+    def test_expired_slot_is_reclaimed(self):
+        # A lease from a killed worker: already past its timeout
+        self.assertIsNotNone(acquire_slot(self.key, 1, -1))
+        token = acquire_slot(self.key, 1, 60)
+        self.assertIsNotNone(token)
+        release_slot(token)
+
+    def test_keys_are_counted_separately(self):
+        token = acquire_slot(self.key, 1, 60)
+        other = acquire_slot(f'{self.key}-other', 1, 60)
+        self.assertIsNotNone(other)
+        release_slot(token)
+        release_slot(other)
+
+
+class ConcurrencyThrottleTests(APITestCase):
+    @override_settings(THROTTLE_CONCURRENCY={'upload': 1})
+    def test_slot_is_released_after_each_request(self):
+        for _ in range(3):
+            self.assertEqual(self.upload().status_code, 201)
+
+    @override_settings(THROTTLE_CONCURRENCY={'upload': 1}, THROTTLE_CONCURRENCY_RETRY_AFTER=7)
+    def test_request_over_the_limit_is_refused(self):
+        # Another request of this user still holds the only slot
+        token = acquire_slot(f'upload:{self.user.pk}', 1, 60)
+        self.addCleanup(release_slot, token)
+
+        response = self.upload()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '7')
+        self.assertFalse(EquipmentBatch.objects.exists())
+
+    @override_settings(THROTTLE_CONCURRENCY={'upload': 1})
+    def test_failed_request_releases_its_slot(self):
+        self.assertEqual(self.upload(content=b'Name,Type\nx,y\n').status_code, 400)
+        self.assertEqual(self.upload().status_code, 201)
+
+    @override_settings(THROTTLE_CONCURRENCY={'upload': 1})
+    def test_limit_is_per_user(self):
+        token = acquire_slot(f'upload:{self.user.pk}', 1, 60)
+        self.addCleanup(release_slot, token)
+
+        other = User.objects.create_user('bob', password='Passw0rd!')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.upload().status_code, 201)
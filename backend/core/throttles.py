@@ -0,0 +1,97 @@
+"""
+Throttles for the expensive endpoints (CSV uploads and their chunks, PDF report).
+
+Request rates use DRF's ScopedRateThrottle on the shared cache. In-flight
+limits are leases in a SQLite table under LOCAL_STATE_DIR, so every gunicorn
+worker on the host counts the same uploads and renders.
+"""
+import time
+import uuid
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+from .localstate import connect
+
+
+SLOTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS slots (
+    token TEXT PRIMARY KEY,
+    key TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS slots_key ON slots (key);
+"""
+
+
+def acquire_slot(key, limit, timeout):
+    """
+    Take one of ``limit`` slots for ``key``. Returns a lease token, or None
+    when all slots are in use. Leases expire after ``timeout`` seconds so a
+    killed worker cannot hold a slot forever.
+    """
+    conn = connect('throttle', SLOTS_SCHEMA)
+    now = time.time()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        conn.execute('DELETE FROM slots WHERE expires_at < ?', (now,))
+        in_use = conn.execute('SELECT COUNT(*) FROM slots WHERE key = ?', (key,)).fetchone()[0]
+        if in_use >= limit:
+            conn.execute('COMMIT')
+            return None
+        token = uuid.uuid4().hex
+        conn.execute(
+            'INSERT INTO slots (token, key, expires_at) VALUES (?, ?, ?)',
+            (token, key, now + timeout)
+        )
+        conn.execute('COMMIT')
+        return token
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+
+def release_slot(token):
+    """Give back a slot taken with acquire_slot."""
+    conn = connect('throttle', SLOTS_SCHEMA)
+    conn.execute('DELETE FROM slots WHERE token = ?', (token,))
+
+
+class ConcurrencyThrottle(BaseThrottle):
+    """
+    Limit the number of requests a user may have in flight for the view's
+    ``throttle_scope``, using the limits in settings.THROTTLE_CONCURRENCY.
+    Views using it must also use ConcurrencyLimitMixin to release the slot.
+    """
+
+    def __init__(self):
+        self.retry_after = None
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        limit = settings.THROTTLE_CONCURRENCY.get(scope)
+        if not limit or not request.user.is_authenticated:
+            return True
+
+        token = acquire_slot(f'{scope}:{request.user.pk}', limit, settings.THROTTLE_SLOT_TIMEOUT)
+        if token is None:
+            self.retry_after = settings.THROTTLE_CONCURRENCY_RETRY_AFTER
+            return False
+
+        request._concurrency_tokens = getattr(request, '_concurrency_tokens', []) + [token]
+        return True
+
+    def wait(self):
+        return self.retry_after
+
+
+class ConcurrencyLimitMixin:
+    """Release ConcurrencyThrottle slots once the view has produced its response."""
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        try:
+            return super().finalize_response(request, response, *args, **kwargs)
+        finally:
+            for token in getattr(request, '_concurrency_tokens', []):
+                release_slot(token)
+            request._concurrency_tokens = []
@@ -0,0 +1,187 @@
+"""
+Chunk storage for resumable uploads (UploadSession).
+
+Each session has a directory under UPLOAD_SESSION_DIR holding one
+``<index>.chunk`` file per received chunk. Chunks are written to a temporary
+name and renamed into place, so a retried or duplicated PUT never leaves a
+half-written chunk behind. On completion the chunks are read back in order
+as a single stream, without assembling a copy of the file.
+"""
+import io
+import shutil
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import UploadSession
+
+
+# Bytes copied per read while streaming a chunk to disk
+COPY_BUFFER = 1024 * 1024
+
+
+class ChunkError(ValueError):
+    """A chunk is out of range or did not arrive complete."""
+
+
+def session_dir(session):
+    return Path(settings.UPLOAD_SESSION_DIR) / str(session.id)
+
+
+def chunk_path(session, index):
+    return session_dir(session) / f'{index}.chunk'
+
+
+def received_chunks(session):
+    """Sorted indexes of the chunks stored for ``session``."""
+    directory = session_dir(session)
+    if not directory.is_dir():
+        return []
+    return sorted(int(path.stem) for path in directory.glob('*.chunk'))
+
+
+def missing_chunks(session):
+    received = set(received_chunks(session))
+    return [index for index in range(session.chunk_count) if index not in received]
+
+
+def write_chunk(session, index, stream, length):
+    """
+    Copy chunk ``index`` of ``length`` bytes from ``stream`` to disk. Raises
+    ChunkError if the index or length is wrong or the body was cut short.
+    """
+    if not 0 <= index < session.chunk_count:
+        raise ChunkError(f'Chunk index must be between 0 and {session.chunk_count - 1}')
+    expected = session.chunk_length(index)
+    if length != expected:
+        raise ChunkError(f'Chunk {index} must be {expected} bytes, got {length}')
+
+    directory = session_dir(session)
+    directory.mkdir(parents=True, exist_ok=True)
+    temp_path = directory / f'{index}.{uuid.uuid4().hex[:8]}.tmp'
+    written = 0
+    try:
+        with open(temp_path, 'wb') as f:
+            while written < expected:
+                data = stream.read(min(COPY_BUFFER, expected - written))
+                if not data:
+                    break
+                f.write(data)
+                written += len(data)
+        if written != expected:
+            raise ChunkError(f'Chunk {index} was cut short: received {written} of {expected} bytes')
+        temp_path.replace(chunk_path(session, index))
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+class ChunkReader(io.RawIOBase):
+    """Read-only stream over a session's chunks in order, as if they were one file."""
+
+    def __init__(self, session):
+        self.paths = [chunk_path(session, index) for index in range(session.chunk_count)]
+        self.current = None
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while True:
+            if self.current is None:
+                if not self.paths:
+                    return 0
+                self.current = open(self.paths.pop(0), 'rb')
+            count = self.current.readinto(buffer)
+            if count:
+                return count
+            self.current.close()
+            self.current = None
+
+    def close(self):
+        if self.current is not None:
+            self.current.close()
+            self.current = None
+        super().close()
+
+
+def open_upload(session):
+    """Buffered stream of the uploaded file, for the CSV parser."""
+    return io.BufferedReader(ChunkReader(session), buffer_size=COPY_BUFFER)
+
+
+def quota_error(user, size):
+    """
+    Why ``user`` may not start another upload of ``size`` bytes, or None if
+    it fits within UPLOAD_SESSION_USER_MAX_OPEN and UPLOAD_SESSION_USER_MAX_BYTES.
+    """
+    unfinished = UploadSession.objects.filter(user=user).exclude(status=UploadSession.STATUS_COMPLETE)
+    usage = unfinished.aggregate(count=Count('id'), size=Sum('size'))
+    if usage['count'] >= settings.UPLOAD_SESSION_USER_MAX_OPEN:
+        return (f"You already have {usage['count']} unfinished upload(s); "
+                f"complete or delete one first (limit {settings.UPLOAD_SESSION_USER_MAX_OPEN})")
+    if (usage['size'] or 0) + size > settings.UPLOAD_SESSION_USER_MAX_BYTES:
+        return (f"Unfinished uploads would total {(usage['size'] or 0) + size:,} bytes "
+                f"(limit {settings.UPLOAD_SESSION_USER_MAX_BYTES:,}); complete or delete one first")
+    return None
+
+
+def _stale_claim_cutoff():
+    return timezone.now() - timedelta(seconds=settings.UPLOAD_PROCESSING_TIMEOUT)
+
+
+def _stale_claim():
+    """Sessions whose processing claim has outlived UPLOAD_PROCESSING_TIMEOUT."""
+    return Q(status=UploadSession.STATUS_PROCESSING) & (
+        Q(processing_started_at__isnull=True) | Q(processing_started_at__lt=_stale_claim_cutoff())
+    )
+
+
+def touch(session):
+    """Record activity on ``session``, which keeps purge_expired_sessions away from it."""
+    UploadSession.objects.filter(pk=session.pk).update(last_activity_at=timezone.now())
+
+
+def claim_is_stale(session):
+    """Whether a processing session's claim has outlived UPLOAD_PROCESSING_TIMEOUT (its worker died)."""
+    return session.status == UploadSession.STATUS_PROCESSING and (
+        session.processing_started_at is None or session.processing_started_at < _stale_claim_cutoff()
+    )
+
+
+def claim_for_processing(session):
+    """
+    Mark ``session`` as being processed by this request. Open sessions and
+    stale claims can be taken; returns False if another request is still
+    processing it. Atomic, so only one request wins whichever worker it is on.
+    """
+    now = timezone.now()
+    claimable = Q(status=UploadSession.STATUS_OPEN) | _stale_claim()
+    return bool(UploadSession.objects.filter(claimable, pk=session.pk).update(
+        status=UploadSession.STATUS_PROCESSING, processing_started_at=now, last_activity_at=now, error=''
+    ))
+
+
+def discard_chunks(session):
+    shutil.rmtree(session_dir(session), ignore_errors=True)
+
+
+def purge_expired_sessions():
+    """
+    Delete sessions idle for UPLOAD_SESSION_TTL along with their chunks.
+    Sessions being processed are kept unless their claim is stale.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.UPLOAD_SESSION_TTL)
+    expired = Q(last_activity_at__lt=cutoff) & (~Q(status=UploadSession.STATUS_PROCESSING) | _stale_claim())
+    purged = 0
+    for session in UploadSession.objects.filter(expired):
+        # Deleted one by one with the same conditions, so a session claimed or
+        # sent a chunk since it was listed stays, chunks included
+        deleted, _ = UploadSession.objects.filter(expired, pk=session.pk).delete()
+        if deleted:
+            discard_chunks(session)
+            purged += 1
+    return purged
@@ -1,10 +1,29 @@
+from django.conf import settings
 from django.urls import path
-from .views import CSVUploadView, DashboardStatsView, PDFReportView, EquipmentListView, HistoryView
+from .views import (
+    CSVUploadView, MultiCSVUploadView, UploadSessionListView, UploadSessionDetailView,
+    UploadChunkView, UploadSessionCompleteView,
+    EventStreamView, DashboardStatsView, PDFReportView, EquipmentListView, HistoryView,
+    RequestTimingsView, ProfileListView, ProfileDetailView, ProfileDownloadView
+)
 
 urlpatterns = [
     path('upload/', CSVUploadView.as_view(), name='csv-upload'),
+    path('upload/multi/', MultiCSVUploadView.as_view(), name='csv-upload-multi'),
+    path('upload/sessions/', UploadSessionListView.as_view(), name='upload-session-list'),
+    path('upload/sessions/<uuid:session_id>/', UploadSessionDetailView.as_view(), name='upload-session-detail'),
+    path('upload/sessions/<uuid:session_id>/chunks/<int:index>/', UploadChunkView.as_view(), name='upload-chunk'),
+    path('upload/sessions/<uuid:session_id>/complete/', UploadSessionCompleteView.as_view(), name='upload-session-complete'),
     path('dashboard/', DashboardStatsView.as_view(), name='dashboard-stats'),
     path('report/pdf/', PDFReportView.as_view(), name='pdf-report'),
     path('equipment/', EquipmentListView.as_view(), name='equipment-list'),
     path('history/', HistoryView.as_view(), name='history'),
+    path('ops/timings/', RequestTimingsView.as_view(), name='request-timings'),
+    path('ops/profiles/', ProfileListView.as_view(), name='profile-list'),
+    path('ops/profiles/<str:profile_id>/', ProfileDetailView.as_view(), name='profile-detail'),
+    path('ops/profiles/<str:profile_id>/download/', ProfileDownloadView.as_view(), name='profile-download'),
 ]
+
+# Left out (404) unless EVENT_STREAM_ENABLED: see settings
+if settings.EVENT_STREAM_ENABLED:
+    urlpatterns.append(path('events/', EventStreamView.as_view(), name='event-stream'))
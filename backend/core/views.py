@@ -1,33 +1,58 @@
+import hmac
 import io
-import pandas as pd
-from django.http import HttpResponse
+import json
+import os
+import time
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.db import connections
 from django.db.models import Avg, Count
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.throttling import ScopedRateThrottle
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 
-from .models import EquipmentBatch, EquipmentData
+from . import events, metrics, uploads
+from .authentication import QueryTokenAuthentication
+from .ingest import (
+    IngestError, create_batches, error_message, ingest_file, parse_many, publish_failure, publish_progress,
+    upload_sources
+)
+from .instrumentation import timings
+from . import profiling
+from .models import EquipmentBatch, EquipmentData, UploadSession
+from .ranges import ranged_response
+from .routers import ReplicaReadMixin
+from .throttles import ConcurrencyThrottle, ConcurrencyLimitMixin
 from .serializers import (
     EquipmentDataSerializer, 
     EquipmentBatchSerializer,
     BatchHistorySerializer,
     CSVUploadSerializer,
+    MultiCSVUploadSerializer,
+    UploadSessionCreateSerializer,
+    UploadSessionSerializer,
     DashboardStatsSerializer,
     UserRegistrationSerializer
 )
 
 
-class CSVUploadView(APIView):
+class CSVUploadView(ConcurrencyLimitMixin, APIView):
     """API view to handle CSV file uploads."""
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
+    throttle_classes = [ScopedRateThrottle, ConcurrencyThrottle]
+    throttle_scope = 'upload'
     
     def post(self, request):
         serializer = CSVUploadSerializer(data=request.data)
@@ -37,53 +62,262 @@ class CSVUploadView(APIView):
         csv_file = serializer.validated_data['file']
         
         try:
-            # Read CSV with pandas
-            df = pd.read_csv(csv_file)
-            
-            # Validate required columns
-            required_columns = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            
-            if missing_columns:
-                return Response(
-                    {'error': f'Missing required columns: {", ".join(missing_columns)}'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+            started = time.perf_counter()
             
-            # Create a new batch
-            batch = EquipmentBatch.objects.create(
-                user=request.user,
-                filename=csv_file.name
+            # Parse with pandas (clients may gzip large files), then store the
+            # batch and its rows in one transaction
+            batch, records_created = ingest_file(
+                request.user, csv_file.name.removesuffix('.gz'), csv_file,
+                compressed=csv_file.name.endswith('.gz')
             )
-            
-            # Save each row as EquipmentData
-            equipment_data_list = []
-            for _, row in df.iterrows():
-                equipment_data_list.append(EquipmentData(
-                    equipment_name=row['Equipment Name'],
-                    type=row['Type'],
-                    flowrate=float(row['Flowrate']),
-                    pressure=float(row['Pressure']),
-                    temperature=float(row['Temperature']),
-                    batch=batch
-                ))
-            
-            EquipmentData.objects.bulk_create(equipment_data_list)
+            metrics.observe_ingest(records_created, time.perf_counter() - started)
             
             return Response({
                 'message': 'CSV uploaded successfully',
                 'batch_id': batch.id,
-                'records_created': len(equipment_data_list)
+                'records_created': records_created
             }, status=status.HTTP_201_CREATED)
-            
+        
         except Exception as e:
-            return Response(
-                {'error': f'Error processing CSV: {str(e)}'},
-                status=status.HTTP_400_BAD_REQUEST
+            return Response({'error': error_message(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class MultiCSVUploadView(ConcurrencyLimitMixin, APIView):
+    """
+    API view to upload many CSV files (or zip archives of them) in one request.
+    Files are parsed in parallel and stored as separate batches in a single
+    transaction, so either every file is stored or none is.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+    throttle_classes = [ScopedRateThrottle, ConcurrencyThrottle]
+    throttle_scope = 'upload'
+    
+    def post(self, request):
+        serializer = MultiCSVUploadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            sources = upload_sources(serializer.validated_data['files'])
+        except IngestError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        started = time.perf_counter()
+        # Batch names, which progress events refer to
+        names = [os.path.basename(filename).removesuffix('.gz') for filename, source, compressed in sources]
+        for name in names:
+            publish_progress(request.user, name, 'parsing')
+        parsed = parse_many(sources)
+        failed = [
+            {'filename': filename, 'error': error}
+            for filename, columns, seconds, error in parsed if error
+        ]
+        if failed:
+            for name, (filename, columns, seconds, error) in zip(names, parsed):
+                publish_failure(request.user, name, error or 'Not stored: another file in the upload failed')
+            return Response({
+                'error': f'{len(failed)} of {len(parsed)} file(s) could not be processed; nothing was stored',
+                'files': failed
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            write_started = time.perf_counter()
+            created, removed = create_batches(request.user, [
+                (name, columns) for name, (filename, columns, seconds, error) in zip(names, parsed)
+            ])
+            write_seconds = time.perf_counter() - write_started
+        except Exception as e:
+            message = f'Error storing CSV files: {str(e)}'
+            for name in names:
+                publish_failure(request.user, name, message)
+            return Response({'error': message}, status=status.HTTP_400_BAD_REQUEST)
+        
+        total_rows = sum(rows for batch, rows in created)
+        files = []
+        for (filename, columns, parse_seconds, error), (batch, rows) in zip(parsed, created):
+            # Share the write time out by rows so per-batch ingest metrics stay comparable
+            metrics.observe_ingest(rows, parse_seconds + write_seconds * rows / max(total_rows, 1))
+            files.append({
+                'filename': filename,
+                'batch_id': batch.id,
+                'records_created': rows,
+                'retained': batch.id not in removed
+            })
+        
+        return Response({
+            'message': f'{len(files)} CSV file(s) uploaded successfully',
+            'records_created': total_rows,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+            'files': files
+        }, status=status.HTTP_201_CREATED)
+
+
+def upload_session_payload(session):
+    """Session state plus the chunks received so far, so clients know what to (re)send."""
+    return {**UploadSessionSerializer(session).data, 'received': uploads.received_chunks(session)}
+
+
+class UploadSessionListView(APIView):
+    """
+    API view to start a resumable upload. The client then PUTs numbered
+    chunks (in any order, retried or in parallel) and POSTs to complete.
+    Unfinished sessions count against a per-user quota, since their chunks
+    take disk space.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        serializer = UploadSessionCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        uploads.purge_expired_sessions()
+        error = uploads.quota_error(request.user, serializer.validated_data['size'])
+        if error:
+            return Response({'error': error}, status=status.HTTP_409_CONFLICT)
+        session = UploadSession.objects.create(user=request.user, **serializer.validated_data)
+        return Response(upload_session_payload(session), status=status.HTTP_201_CREATED)
+
+
+class UploadSessionDetailView(APIView):
+    """API view to check on (GET) or abandon (DELETE) a resumable upload."""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, session_id):
+        session = get_object_or_404(UploadSession, pk=session_id, user=request.user)
+        return Response(upload_session_payload(session))
+    
+    def delete(self, request, session_id):
+        session = get_object_or_404(UploadSession, pk=session_id, user=request.user)
+        if session.status == UploadSession.STATUS_PROCESSING and not uploads.claim_is_stale(session):
+            return Response({'error': 'Upload is being processed'}, status=status.HTTP_409_CONFLICT)
+        uploads.discard_chunks(session)
+        session.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadChunkView(ConcurrencyLimitMixin, APIView):
+    """API view to store one chunk of a resumable upload; the raw bytes are the request body."""
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [ScopedRateThrottle, ConcurrencyThrottle]
+    throttle_scope = 'upload-chunk'
+    
+    def put(self, request, session_id, index):
+        session = get_object_or_404(UploadSession, pk=session_id, user=request.user)
+        if session.status != UploadSession.STATUS_OPEN:
+            return Response({'error': f'Upload is {session.status}'}, status=status.HTTP_409_CONFLICT)
+        
+        try:
+            length = int(request.headers.get('Content-Length') or 0)
+            uploads.write_chunk(session, index, request.stream, length)
+        except (ValueError, uploads.ChunkError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        uploads.touch(session)
+        
+        return Response({'index': index, 'received': len(uploads.received_chunks(session))})
+
+
+class UploadSessionCompleteView(ConcurrencyLimitMixin, APIView):
+    """
+    API view to ingest a resumable upload once every chunk has arrived. The
+    chunks are streamed into the parser in order, then discarded. Completing
+    an already completed session returns its result again.
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [ScopedRateThrottle, ConcurrencyThrottle]
+    throttle_scope = 'upload'
+    
+    def post(self, request, session_id):
+        session = get_object_or_404(UploadSession, pk=session_id, user=request.user)
+        if session.status == UploadSession.STATUS_COMPLETE:
+            # A retried completion whose first response was lost
+            return Response({
+                'message': 'CSV uploaded successfully',
+                'batch_id': session.batch_id,
+                'upload_id': session.id
+            })
+        
+        missing = uploads.missing_chunks(session)
+        if missing:
+            return Response({
+                'error': f'{len(missing)} chunk(s) missing',
+                'missing': missing[:100]
+            }, status=status.HTTP_409_CONFLICT)
+        
+        # Only one request may ingest the session, whichever worker it lands on;
+        # a claim left behind by a killed worker is taken over once it is stale
+        if not uploads.claim_for_processing(session):
+            return Response({'error': 'Upload is already being processed'}, status=status.HTTP_409_CONFLICT)
+        
+        try:
+            started = time.perf_counter()
+            with uploads.open_upload(session) as stream:
+                batch, records_created = ingest_file(
+                    request.user, session.filename.removesuffix('.gz'), stream,
+                    compressed=session.filename.endswith('.gz')
+                )
+            metrics.observe_ingest(records_created, time.perf_counter() - started)
+        except Exception as e:
+            # ingest_file has published ingest_failed
+            message = error_message(e)
+            # Back to open: the client may resend chunks and try again, or abandon the upload
+            UploadSession.objects.filter(pk=session.pk).update(
+                status=UploadSession.STATUS_OPEN, error=message, last_activity_at=timezone.now()
             )
+            return Response({'error': message}, status=status.HTTP_400_BAD_REQUEST)
+        
+        UploadSession.objects.filter(pk=session.pk).update(
+            status=UploadSession.STATUS_COMPLETE, batch=batch, last_activity_at=timezone.now()
+        )
+        uploads.discard_chunks(session)
+        
+        return Response({
+            'message': 'CSV uploaded successfully',
+            'batch_id': batch.id,
+            'records_created': records_created,
+            'upload_id': session.id
+        }, status=status.HTTP_201_CREATED)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets content negotiation accept EventSource's ``Accept: text/event-stream``."""
+    media_type = 'text/event-stream'
+    format = 'sse'
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Only error responses are rendered; the stream itself bypasses renderers
+        return json.dumps(data).encode()
 
 
-class DashboardStatsView(APIView):
+class EventStreamView(APIView):
+    """
+    Server-Sent Events stream of the user's ingest_progress, batch_created
+    and retention events. Browsers' EventSource cannot send headers, so the
+    token may also be given as ?token=.
+    """
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [QueryTokenAuthentication, *APIView.authentication_classes]
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+    
+    def get(self, request):
+        last_id = request.headers.get('Last-Event-ID') or request.query_params.get('last_event_id')
+        try:
+            last_id = int(last_id) if last_id else None
+        except ValueError:
+            last_id = None
+        # The stream only reads the event store; don't hold a database connection for its lifetime
+        connections.close_all()
+        response = StreamingHttpResponse(
+            events.stream(request.user.pk, last_id), content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class DashboardStatsView(ReplicaReadMixin, APIView):
     """API view to return dashboard statistics."""
     permission_classes = [IsAuthenticated]
     
@@ -143,7 +377,7 @@ class DashboardStatsView(APIView):
         })
 
 
-class HistoryView(APIView):
+class HistoryView(ReplicaReadMixin, APIView):
     """API view to list upload history with summaries."""
     permission_classes = [IsAuthenticated]
     
@@ -161,9 +395,11 @@ class HistoryView(APIView):
 
 
 
-class PDFReportView(APIView):
+class PDFReportView(ReplicaReadMixin, ConcurrencyLimitMixin, APIView):
     """API view to generate PDF report for the latest batch."""
     permission_classes = [IsAuthenticated]
+    throttle_classes = [ScopedRateThrottle, ConcurrencyThrottle]
+    throttle_scope = 'pdf-report'
     
     def get(self, request):
         # Get the latest batch FOR THIS USER
@@ -189,7 +425,9 @@ class PDFReportView(APIView):
         
         # Create PDF
         buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
+        # invariant: no timestamp or random ID, so re-rendering the same batch
+        # gives identical bytes and interrupted downloads can resume by Range
+        doc = SimpleDocTemplate(buffer, pagesize=letter, invariant=1)
         elements = []
         styles = getSampleStyleSheet()
         
@@ -280,17 +518,17 @@ class PDFReportView(APIView):
         elements.append(data_table)
         
         # Build PDF
-        doc.build(elements)
+        with metrics.PDF_RENDER_DURATION.time():
+            doc.build(elements)
         
-        # Return response
-        buffer.seek(0)
-        response = HttpResponse(buffer, content_type='application/pdf')
+        # Return response (whole report, or the byte range a resuming client asked for)
+        response = ranged_response(request, buffer.getvalue(), 'application/pdf')
         response['Content-Disposition'] = f'attachment; filename="equipment_report_batch_{latest_batch.id}.pdf"'
         
         return response
 
 
-class EquipmentListView(APIView):
+class EquipmentListView(ReplicaReadMixin, APIView):
     """API view to list all equipment data from the latest batch."""
     permission_classes = [IsAuthenticated]
     
@@ -325,3 +563,62 @@ class RegisterView(APIView):
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+
+class RequestTimingsView(APIView):
+    """Staff-only view of the per-endpoint timings recorded by this worker."""
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        return Response({'endpoints': timings.snapshot()})
+    
+    def delete(self, request):
+        timings.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ProfileListView(APIView):
+    """Staff-only list of captured request profiles."""
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        return Response({'profiles': profiling.list_profiles()})
+
+
+class ProfileDetailView(APIView):
+    """Staff-only metadata and captured SQL for one profile."""
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request, profile_id):
+        metadata = profiling.load_metadata(profile_id)
+        if metadata is None:
+            return Response({'error': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(metadata)
+
+
+class ProfileDownloadView(APIView):
+    """Staff-only download of the raw profile file."""
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request, profile_id):
+        path = profiling.profile_file(profile_id)
+        if path is None:
+            return Response({'error': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=path.name)
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. Scrapers authenticate with
+    ``Authorization: Bearer <METRICS_TOKEN>``; staff signed in to the admin
+    may also read it. Everyone else gets 401, even when no token is set.
+    """
+    header = request.headers.get('Authorization', '')
+    token_ok = bool(settings.METRICS_TOKEN) and hmac.compare_digest(
+        header.encode(), f'Bearer {settings.METRICS_TOKEN}'.encode()
+    )
+    if not token_ok and not request.user.is_staff:
+        response = HttpResponse(status=status.HTTP_401_UNAUTHORIZED)
+        response['WWW-Authenticate'] = 'Bearer'
+        return response
+    body, content_type = metrics.render_latest()
+    return HttpResponse(body, content_type=content_type)
@@ -0,0 +1,28 @@
+"""
+Gunicorn configuration, loaded automatically when gunicorn starts in this
+directory. Sets up Prometheus multiprocess mode so /metrics reports totals
+across all workers.
+"""
+import os
+import shutil
+from pathlib import Path
+
+
+# Must be set before any worker imports prometheus_client
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', str(Path(__file__).resolve().parent / 'var' / 'prometheus'))
+
+# Ingesting a large upload takes longer than gunicorn's default 30 s; a worker
+# killed mid-ingest leaves its upload session claimed until UPLOAD_PROCESSING_TIMEOUT
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '300'))
+
+
+def on_starting(server):
+    # Samples left by a previous run would be added to the new totals
+    directory = Path(os.environ['PROMETHEUS_MULTIPROC_DIR'])
+    shutil.rmtree(directory, ignore_errors=True)
+    directory.mkdir(parents=True, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,530 @@
+"""
+HTTP client for the Chemical Equipment API, shared by the desktop app
+(main.py) and the headless command-line client (cli.py). Has no Qt
+dependency, so it can be imported by scripts and scheduled jobs.
+"""
+
+import os
+import json
+import time
+import logging
+import gzip
+import uuid
+import tempfile
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+
+load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000/api")
+# CSV uploads at least this large are gzip-compressed before sending
+UPLOAD_GZIP_MIN_BYTES = int(os.getenv("UPLOAD_GZIP_MIN_BYTES", str(256 * 1024)))
+TRANSFER_CHUNK_SIZE = 64 * 1024
+# Files at least this large go through a resumable upload session in chunks
+UPLOAD_RESUMABLE_MIN_BYTES = int(os.getenv("UPLOAD_RESUMABLE_MIN_BYTES", str(64 * 1024 ** 2)))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(8 * 1024 ** 2)))
+# Seconds to keep waiting for a session the server is still ingesting after our completion request gave up
+UPLOAD_PROCESSING_WAIT = float(os.getenv("UPLOAD_PROCESSING_WAIT", "900"))
+# HTTP transport: timeouts in seconds, retries for idempotent requests, gzip responses
+API_CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", "5"))
+API_READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", "30"))
+# Uploads and PDF generation can legitimately take minutes on large batches
+API_TRANSFER_TIMEOUT = float(os.getenv("API_TRANSFER_TIMEOUT", "300"))
+API_RETRIES = int(os.getenv("API_RETRIES", "3"))
+# The event stream sends a keep-alive every 15 s; silence for longer means the connection is gone
+API_EVENT_READ_TIMEOUT = float(os.getenv("API_EVENT_READ_TIMEOUT", "45"))
+API_COMPRESSION = os.getenv("API_COMPRESSION", "1") == "1"
+
+
+class EventStreamUnavailable(Exception):
+    """The server does not offer /api/events/ (it is only enabled under ASGI by default)."""
+
+
+def error_message(error):
+    """The API's error text for a failed request, falling back to the exception text."""
+    response = getattr(error, 'response', None)
+    if response is None:
+        return str(error)
+    try:
+        data = response.json()
+    except ValueError:
+        return str(error)
+    if isinstance(data, dict):
+        return str(data.get('error') or data.get('detail') or data)
+    return str(data)
+
+
+class APISession(requests.Session):
+    """
+    Pooled keep-alive session used for every API call. Requests without an
+    explicit timeout get (API_CONNECT_TIMEOUT, API_READ_TIMEOUT), so a dead
+    server cannot hang the client. GET/HEAD are retried with exponential
+    backoff on connection errors and 502/503/504 (read timeouts once);
+    other methods are only retried when the connection was never established.
+    """
+    
+    def __init__(self, pool_size=8, retries=API_RETRIES, compression=API_COMPRESSION):
+        super().__init__()
+        retry = Retry(
+            total=retries,
+            # A server that did not answer within the read timeout rarely answers a second time
+            read=min(retries, 1),
+            backoff_factor=0.5,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({'GET', 'HEAD'}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        # One pool per host, sized for the executor's concurrent requests
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=retry)
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
+        self.headers['Accept-Encoding'] = 'gzip, deflate' if compression else 'identity'
+        self.headers['Connection'] = 'keep-alive'
+    
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', (API_CONNECT_TIMEOUT, API_READ_TIMEOUT))
+        return super().request(method, url, **kwargs)
+
+
+class TransferCancelled(Exception):
+    """Raised inside a streaming upload or download when it is cancelled."""
+
+
+class MultipartStream:
+    """
+    multipart/form-data body for one file, read from disk in chunks as
+    requests sends it. The length is known up front, so the request carries
+    a Content-Length (Django cannot read chunked request bodies).
+    """
+    
+    def __init__(self, field, filename, fileobj, size, content_type, progress=None, cancel_event=None):
+        self.boundary = uuid.uuid4().hex
+        self.fileobj = fileobj
+        self.size = size
+        self.progress = progress
+        self.cancel_event = cancel_event
+        self.head = (
+            f'--{self.boundary}\r\n'
+            f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'
+        ).encode()
+        self.tail = f'\r\n--{self.boundary}--\r\n'.encode()
+    
+    @property
+    def content_type(self):
+        return f'multipart/form-data; boundary={self.boundary}'
+    
+    def __len__(self):
+        return len(self.head) + self.size + len(self.tail)
+    
+    def __iter__(self):
+        yield self.head
+        sent = 0
+        while True:
+            if self.cancel_event is not None and self.cancel_event.is_set():
+                raise TransferCancelled()
+            chunk = self.fileobj.read(TRANSFER_CHUNK_SIZE)
+            if not chunk:
+                break
+            sent += len(chunk)
+            if self.progress:
+                self.progress(sent, self.size)
+            yield chunk
+        yield self.tail
+
+
+def gzip_to_tempfile(file_path, cancel_event=None):
+    """Compress file_path chunk by chunk into an anonymous temp file, rewound."""
+    compressed = tempfile.TemporaryFile()
+    with open(file_path, 'rb') as source, gzip.GzipFile(fileobj=compressed, mode='wb', compresslevel=6) as target:
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                compressed.close()
+                raise TransferCancelled()
+            chunk = source.read(TRANSFER_CHUNK_SIZE)
+            if not chunk:
+                break
+            target.write(chunk)
+    compressed.seek(0)
+    return compressed
+
+
+class APIClient:
+    """Handle all API communications."""
+    
+    def __init__(self, cache=None, base_url=None):
+        self.base_url = (base_url or API_BASE_URL).rstrip('/')
+        self.token = None
+        self.username = None
+        self.session = APISession()
+        self.cache = cache
+        # True while the backend is unreachable and cached payloads are served
+        self.offline = False
+        self._offline_password = None
+        # endpoint -> (etag, payload) of the payload last handed out
+        self._payloads = {}
+    
+    def set_token(self, token):
+        self.token = token
+        self.session.headers.update({'Authorization': f'Token {token}'})
+    
+    def login(self, username, password):
+        try:
+            # No stale Authorization header: an invalid token would be rejected
+            response = self.session.post(
+                f"{self.base_url}/auth/token/",
+                json={'username': username, 'password': password},
+                headers={'Authorization': None}
+            )
+            response.raise_for_status()
+            data = response.json()
+            self.set_token(data['token'])
+            self.username = username
+            self.offline = False
+            self._offline_password = None
+            if self.cache:
+                self.cache.remember_login(self.base_url, username, password)
+            return True, data['token']
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            # Backend unreachable: allow read-only access to this user's cached data
+            if self.cache and self.cache.verify_login(self.base_url, username, password):
+                self.username = username
+                self.offline = True
+                self._offline_password = password
+                return True, None
+            return False, str(e)
+        except requests.exceptions.RequestException as e:
+            return False, str(e)
+    
+    def reconnect(self):
+        """Sign in again after an offline login, once the backend is back."""
+        if self.token:
+            return True, self.token
+        if self._offline_password is None:
+            return False, 'Not signed in'
+        return self.login(self.username, self._offline_password)
+    
+    def cached_payload(self, endpoint):
+        """Last stored payload for endpoint ('dashboard' or 'history'), or None."""
+        if endpoint in self._payloads:
+            return self._payloads[endpoint][1]
+        if not self.cache or not self.username:
+            return None
+        entry = self.cache.load(self.base_url, self.username, endpoint)
+        if entry is None:
+            return None
+        self._payloads[endpoint] = (entry[0], entry[1])
+        return entry[1]
+    
+    def _cached_get(self, endpoint, path):
+        """
+        GET path, revalidating the cached payload with If-None-Match. A 304
+        returns the identical cached object, so callers can skip re-rendering.
+        When the backend is unreachable, the cached payload is served instead.
+        """
+        cached = self.cached_payload(endpoint)
+        headers = {}
+        if cached is not None and self._payloads[endpoint][0]:
+            headers['If-None-Match'] = self._payloads[endpoint][0]
+        try:
+            response = self.session.get(f"{self.base_url}{path}", headers=headers)
+            if response.status_code == 304 and cached is not None:
+                self.offline = False
+                if self.cache:
+                    self.cache.touch(self.base_url, self.username, endpoint)
+                return True, cached
+            response.raise_for_status()
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if cached is None:
+                return False, str(e)
+            self.offline = True
+            return True, cached
+        except requests.exceptions.RequestException as e:
+            return False, str(e)
+        
+        self.offline = False
+        payload = response.json()
+        etag = response.headers.get('ETag')
+        self._payloads[endpoint] = (etag, payload)
+        if self.cache and self.username:
+            self.cache.store(self.base_url, self.username, endpoint, etag, payload)
+        return True, payload
+    
+    def get_dashboard_stats(self):
+        return self._cached_get('dashboard', '/dashboard/')
+    
+    def upload_csv(self, file_path, compress=False, progress=None, cancel_event=None):
+        """
+        Stream the CSV as a multipart body without loading it into memory,
+        optionally gzip-compressed. progress(sent, total) is called per chunk
+        of the (possibly compressed) file; setting cancel_event aborts.
+        A 429 (rate or concurrency limit) is retried after its Retry-After.
+        Files of UPLOAD_RESUMABLE_MIN_BYTES or more are sent in resumable chunks.
+        """
+        if os.path.getsize(file_path) >= UPLOAD_RESUMABLE_MIN_BYTES:
+            return self.upload_csv_resumable(file_path, compress, progress, cancel_event)
+        filename = os.path.basename(file_path)
+        try:
+            if compress:
+                f = gzip_to_tempfile(file_path, cancel_event)
+                filename += '.gz'
+                content_type = 'application/gzip'
+            else:
+                f = open(file_path, 'rb')
+                content_type = 'text/csv'
+            with f:
+                size = os.fstat(f.fileno()).st_size
+                for attempt in range(API_RETRIES + 1):
+                    f.seek(0)
+                    body = MultipartStream('file', filename, f, size, content_type, progress, cancel_event)
+                    response = self.session.post(
+                        f"{self.base_url}/upload/",
+                        data=body,
+                        headers={'Content-Type': body.content_type},
+                        timeout=(API_CONNECT_TIMEOUT, API_TRANSFER_TIMEOUT)
+                    )
+                    if response.status_code != 429 or attempt == API_RETRIES:
+                        break
+                    # Throttled before the file was processed, so sending it again is safe
+                    time.sleep(float(response.headers.get('Retry-After', 1)))
+            response.raise_for_status()
+            return True, response.json()
+        except TransferCancelled:
+            return False, 'Cancelled'
+        except requests.exceptions.RequestException as e:
+            return False, error_message(e)
+    
+    def _send_with_retries(self, send, attempts=API_RETRIES + 1):
+        """
+        Call send() until it gets an answer, retrying network errors and
+        429/502/503/504 with backoff (or the server's Retry-After).
+        Returns the last response.
+        """
+        for attempt in range(attempts):
+            try:
+                response = send()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == attempts - 1:
+                    raise
+                time.sleep(min(2 ** attempt, 10))
+                continue
+            if response.status_code not in (429, 502, 503, 504) or attempt == attempts - 1:
+                return response
+            time.sleep(float(response.headers.get('Retry-After', min(2 ** attempt, 10))))
+        return response
+    
+    def upload_csv_resumable(self, file_path, compress=False, progress=None, cancel_event=None):
+        """
+        Upload through an upload session: the file goes up in UPLOAD_CHUNK_SIZE
+        chunks, each retried on its own after a network error, so a dropped
+        connection costs one chunk rather than the whole file. Returns the
+        same result as upload_csv.
+        """
+        filename = os.path.basename(file_path)
+        upload_url = None
+        try:
+            if compress:
+                f = gzip_to_tempfile(file_path, cancel_event)
+                filename += '.gz'
+            else:
+                f = open(file_path, 'rb')
+            with f:
+                size = os.fstat(f.fileno()).st_size
+                response = self._send_with_retries(lambda: self.session.post(
+                    f"{self.base_url}/upload/sessions/",
+                    json={'filename': filename, 'size': size, 'chunk_size': UPLOAD_CHUNK_SIZE}
+                ))
+                response.raise_for_status()
+                upload = response.json()
+                upload_url = f"{self.base_url}/upload/sessions/{upload['id']}/"
+                
+                sent = 0
+                for index in range(upload['chunk_count']):
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise TransferCancelled()
+                    f.seek(index * upload['chunk_size'])
+                    chunk = f.read(upload['chunk_size'])
+                    response = self._send_with_retries(lambda: self.session.put(
+                        f"{upload_url}chunks/{index}/",
+                        data=chunk,
+                        headers={'Content-Type': 'application/octet-stream'},
+                        timeout=(API_CONNECT_TIMEOUT, API_TRANSFER_TIMEOUT)
+                    ))
+                    response.raise_for_status()
+                    sent += len(chunk)
+                    if progress:
+                        progress(sent, size)
+            
+            # Completing twice is safe: the server answers a finished session with its result
+            response = self._send_with_retries(lambda: self.session.post(
+                f"{upload_url}complete/", timeout=(API_CONNECT_TIMEOUT, API_TRANSFER_TIMEOUT)
+            ))
+            deadline = time.monotonic() + UPLOAD_PROCESSING_WAIT
+            while response.status_code == 409 and 'being processed' in response.text:
+                # An earlier attempt timed out on our side but is still being ingested
+                if time.monotonic() >= deadline:
+                    return False, (f"The server was still processing the upload after "
+                                   f"{UPLOAD_PROCESSING_WAIT:.0f}s; check the history later")
+                time.sleep(2)
+                state_response = self._send_with_retries(lambda: self.session.get(upload_url))
+                state = state_response.json() if state_response.ok else {}
+                if state.get('status') == 'complete':
+                    return True, {'message': 'CSV uploaded successfully', 'batch_id': state['batch_id']}
+                if state.get('status') != 'processing':
+                    # Failed and reopened, or purged: nothing will finish it now
+                    if state_response.status_code == 404:
+                        return False, 'The upload session expired on the server'
+                    return False, state.get('error') or 'Upload failed'
+            response.raise_for_status()
+            return True, response.json()
+        except TransferCancelled:
+            if upload_url:
+                try:
+                    self.session.delete(upload_url)
+                except requests.exceptions.RequestException:
+                    pass
+            return False, 'Cancelled'
+        except requests.exceptions.RequestException as e:
+            return False, error_message(e)
+    
+    def get_history(self):
+        """Fetch upload history."""
+        if not self.token and not self.offline:
+            return False, []
+        
+        success, result = self._cached_get('history', '/history/')
+        if not success:
+            logger.warning("History request failed: %s", result)
+            return False, []
+        return True, result
+    
+    def get_equipment(self):
+        """Rows of the latest batch, as {'batch_id', 'equipment_data'}."""
+        try:
+            response = self.session.get(f"{self.base_url}/equipment/")
+            response.raise_for_status()
+            return True, response.json()
+        except requests.exceptions.RequestException as e:
+            return False, str(e)
+    
+    def download_pdf(self, file_path, progress=None, cancel_event=None, retries=3):
+        """
+        Stream the PDF report to a temp file next to file_path, then rename it
+        into place. Interrupted transfers are retried, resuming with a Range
+        request guarded by If-Range. Returns (True, file_path) on success.
+        """
+        # Same directory, so the final rename is atomic; a regular open() keeps
+        # the usual umask-based permissions (mkstemp would make it owner-only)
+        part_path = f"{os.path.abspath(file_path)}.{uuid.uuid4().hex[:8]}.part"
+        open(part_path, 'wb').close()
+        etag = None
+        attempt = 0
+        try:
+            while True:
+                received = os.path.getsize(part_path)
+                # Byte offsets must refer to the raw PDF, not a compressed body
+                headers = {'Accept-Encoding': 'identity'}
+                if received and etag:
+                    headers.update({'Range': f'bytes={received}-', 'If-Range': etag})
+                try:
+                    with self.session.get(
+                        f"{self.base_url}/report/pdf/", headers=headers, stream=True,
+                        timeout=(API_CONNECT_TIMEOUT, API_TRANSFER_TIMEOUT)
+                    ) as response:
+                        response.raise_for_status()
+                        etag = response.headers.get('ETag')
+                        if response.status_code != 206:
+                            # Full body: the server ignored or rejected the range
+                            received = 0
+                        total = received + int(response.headers.get('Content-Length', 0))
+                        with open(part_path, 'ab' if received else 'wb') as f:
+                            for chunk in response.iter_content(TRANSFER_CHUNK_SIZE):
+                                if cancel_event is not None and cancel_event.is_set():
+                                    raise TransferCancelled()
+                                f.write(chunk)
+                                received += len(chunk)
+                                if progress:
+                                    progress(received, total)
+                    os.replace(part_path, file_path)
+                    return True, file_path
+                except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError,
+                        requests.exceptions.Timeout) as e:
+                    attempt += 1
+                    if attempt > retries:
+                        return False, str(e)
+                    time.sleep(min(2 ** attempt, 10))
+        except TransferCancelled:
+            return False, 'Cancelled'
+        except requests.exceptions.RequestException as e:
+            return False, str(e)
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+    
+    def iter_events(self, last_event_id=None):
+        """
+        Yield (id, type, data) from the server's event stream until the
+        server closes it. Connection errors and timeouts are raised; the
+        caller reconnects, passing the last id to resume where it stopped.
+        Raises EventStreamUnavailable if the server has no event stream.
+        """
+        headers = {'Accept': 'text/event-stream', 'Accept-Encoding': 'identity'}
+        if last_event_id is not None:
+            headers['Last-Event-ID'] = str(last_event_id)
+        with self.session.get(
+            f"{self.base_url}/events/", headers=headers, stream=True,
+            timeout=(API_CONNECT_TIMEOUT, API_EVENT_READ_TIMEOUT)
+        ) as response:
+            if response.status_code == 404:
+                raise EventStreamUnavailable()
+            response.raise_for_status()
+            event_id, event_type, data = None, 'message', []
+            # chunk_size=1: larger reads would wait for the buffer to fill before yielding events
+            for line in response.iter_lines(chunk_size=1, decode_unicode=True):
+                if line:
+                    field, _, value = line.partition(':')
+                    value = value[1:] if value.startswith(' ') else value
+                    if field == 'id':
+                        event_id = int(value)
+                    elif field == 'event':
+                        event_type = value
+                    elif field == 'data':
+                        data.append(value)
+                    continue
+                # A blank line ends the event (comments and retry: lines carry no data)
+                if data:
+                    yield event_id, event_type, json.loads('\n'.join(data))
+                event_type, data = 'message', []
+    
+    def register(self, username, password, password_confirm):
+        try:
+            response = self.session.post(
+                f"{self.base_url}/auth/register/",
+                json={
+                    'username': username,
+                    'password': password,
+                    'password_confirm': password_confirm
+                },
+                headers={'Authorization': None}
+            )
+            if response.status_code == 201:
+                return True, response.json()
+            else:
+                # Parse validation errors
+                errors = response.json()
+                error_messages = []
+                for field, msgs in errors.items():
+                    if isinstance(msgs, list):
+                        error_messages.extend(msgs)
+                    else:
+                        error_messages.append(str(msgs))
+                return False, ' '.join(error_messages) if error_messages else 'Registration failed'
+        except requests.exceptions.RequestException as e:
+            return False, str(e)
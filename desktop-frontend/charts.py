@@ -0,0 +1,229 @@
+"""
+Matplotlib charts for the desktop client (bar + scatter).
+
+Kept out of main.py so matplotlib and its Qt backend are only imported when
+the Visualizations tab is first opened, not at startup.
+"""
+
+import numpy as np
+from PyQt5.QtWidgets import QSizePolicy
+
+import matplotlib
+matplotlib.use('Qt5Agg')
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.figure import Figure
+
+
+# Above this many points the scatter chart switches to a hexbin density plot
+DENSITY_THRESHOLD = 20000
+
+
+def padded_limits(values, pad=0.05):
+    """Axis limits around values, rounded outward so small data changes keep the same limits."""
+    low, high = float(np.min(values)), float(np.max(values))
+    span = (high - low) or abs(high) or 1.0
+    step = 10 ** np.floor(np.log10(span)) / 2
+    return (np.floor((low - span * pad) / step) * step,
+            np.ceil((high + span * pad) / step) * step)
+
+
+class ChartCanvas(FigureCanvas):
+    """
+    Base for the dark-themed charts. Data artists are animated: a full draw
+    caches the static background (axes, grid, labels), and later updates
+    only repaint the data artists over it (blitting).
+    """
+    
+    def __init__(self, parent=None):
+        self.fig = Figure(figsize=(8, 5), dpi=100, facecolor='#1e1b4b')
+        self.axes = self.fig.add_subplot(111)
+        super().__init__(self.fig)
+        self.setParent(parent)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setup_style()
+        self.fingerprint = None
+        self.background = None
+        self.animated_artists = []
+        self.mpl_connect('draw_event', self.on_draw)
+    
+    def setup_style(self):
+        self.axes.set_facecolor('#0f172a')
+        self.axes.tick_params(colors='#94a3b8', labelsize=10)
+        self.axes.spines['bottom'].set_color('#334155')
+        self.axes.spines['top'].set_visible(False)
+        self.axes.spines['left'].set_color('#334155')
+        self.axes.spines['right'].set_visible(False)
+        self.axes.xaxis.label.set_color('#e2e8f0')
+        self.axes.yaxis.label.set_color('#e2e8f0')
+        self.axes.title.set_color('#ffffff')
+    
+    def reset_axes(self):
+        self.axes.clear()
+        self.setup_style()
+        self.animated_artists = []
+    
+    def show_empty(self):
+        self.reset_axes()
+        self.axes.text(0.5, 0.5, 'No data available', 
+                      ha='center', va='center', color='#64748b', fontsize=14,
+                      transform=self.axes.transAxes)
+        self.axes.set_xticks([])
+        self.axes.set_yticks([])
+        self.draw_idle()
+    
+    def on_draw(self, event):
+        # A full draw skips animated artists: cache the background, then add them
+        self.background = self.copy_from_bbox(self.fig.bbox)
+        for artist in self.animated_artists:
+            self.axes.draw_artist(artist)
+    
+    def blit_update(self):
+        """Repaint only the data artists over the cached background."""
+        if self.background is None:
+            self.draw_idle()
+            return
+        self.restore_region(self.background)
+        for artist in self.animated_artists:
+            self.axes.draw_artist(artist)
+        self.blit(self.fig.bbox)
+    
+    def set_limits(self, xlim=None, ylim=None):
+        """Apply axis limits; returns True when they changed (ticks need a full redraw)."""
+        changed = False
+        if xlim is not None and tuple(self.axes.get_xlim()) != tuple(xlim):
+            self.axes.set_xlim(*xlim)
+            changed = True
+        if ylim is not None and tuple(self.axes.get_ylim()) != tuple(ylim):
+            self.axes.set_ylim(*ylim)
+            changed = True
+        return changed
+
+
+class BarChartCanvas(ChartCanvas):
+    """Bar chart canvas for type distribution."""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.bars = []
+        self.labels = []
+    
+    def plot(self, type_distribution):
+        fingerprint = tuple(type_distribution.items())
+        if fingerprint == self.fingerprint:
+            return
+        previous_types = [name for name, _ in self.fingerprint or ()]
+        self.fingerprint = fingerprint
+        
+        if not type_distribution:
+            self.bars, self.labels = [], []
+            self.show_empty()
+            return
+        
+        types = list(type_distribution.keys())
+        counts = list(type_distribution.values())
+        ylim = (0, padded_limits([0] + counts, pad=0.15)[1])
+        
+        # Same categories: move the existing bars and labels
+        if types == previous_types and self.bars:
+            for bar, label, count in zip(self.bars, self.labels, counts):
+                bar.set_height(count)
+                label.xy = (bar.get_x() + bar.get_width() / 2, count)
+                label.set_text(f'{count}')
+            if self.set_limits(ylim=ylim):
+                self.draw_idle()
+            else:
+                self.blit_update()
+            return
+        
+        self.reset_axes()
+        colors = ['#8b5cf6', '#3b82f6', '#10b981', '#f97316', '#ec4899', '#eab308', '#06b6d4', '#f43f5e']
+        
+        x_pos = range(len(types))
+        self.bars = list(self.axes.bar(x_pos, counts, color=colors[:len(types)], 
+                                       edgecolor='none', width=0.6, animated=True))
+        
+        self.axes.set_xticks(x_pos)
+        self.axes.set_xticklabels(types, fontsize=9, rotation=15, ha='right')
+        self.axes.set_ylabel('Count', fontsize=11, fontweight='500')
+        self.axes.set_title('Equipment Type Distribution', fontsize=15, fontweight='700', 
+                           pad=15, color='#ffffff')
+        
+        # Add value labels on bars
+        self.labels = []
+        for bar, count in zip(self.bars, counts):
+            height = bar.get_height()
+            self.labels.append(self.axes.annotate(f'{count}',
+                              xy=(bar.get_x() + bar.get_width() / 2, height),
+                              xytext=(0, 5),
+                              textcoords="offset points",
+                              ha='center', va='bottom', 
+                              color='#ffffff', fontsize=12, fontweight='600',
+                              animated=True))
+        self.animated_artists = self.bars + self.labels
+        
+        self.axes.set_ylim(*ylim)
+        self.axes.yaxis.grid(True, linestyle='--', alpha=0.15, color='#475569')
+        self.axes.set_axisbelow(True)
+        
+        self.fig.tight_layout(pad=1.5)
+        self.draw_idle()
+
+
+class ScatterChartCanvas(ChartCanvas):
+    """Scatter chart canvas for Temperature vs Pressure (hexbin density for large batches)."""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.points = None
+    
+    def plot(self, columns):
+        temps = columns['temperature']
+        pressures = columns['pressure']
+        fingerprint = (len(temps), hash(temps.tobytes()), hash(pressures.tobytes()))
+        if fingerprint == self.fingerprint:
+            return
+        self.fingerprint = fingerprint
+        
+        if len(temps) == 0:
+            self.points = None
+            self.show_empty()
+            return
+        
+        xlim = padded_limits(temps)
+        ylim = padded_limits(pressures)
+        dense = len(temps) > DENSITY_THRESHOLD
+        
+        # Scatter already on screen: move the points
+        if not dense and self.points is not None:
+            self.points.set_offsets(np.column_stack([temps, pressures]))
+            if self.set_limits(xlim, ylim):
+                self.draw_idle()
+            else:
+                self.blit_update()
+            return
+        
+        self.reset_axes()
+        if dense:
+            self.points = None
+            self.axes.hexbin(temps, pressures, gridsize=60, mincnt=1,
+                             cmap='Purples', linewidths=0, extent=(*xlim, *ylim))
+        else:
+            self.points = self.axes.scatter(temps, pressures, 
+                                           c='#6366f1', s=120, alpha=0.8,
+                                           edgecolors='#a5b4fc', linewidths=2,
+                                           animated=True)
+            self.animated_artists = [self.points]
+        
+        self.axes.set_xlim(*xlim)
+        self.axes.set_ylim(*ylim)
+        self.axes.set_xlabel('Temperature (°C)', fontsize=11, fontweight='500')
+        self.axes.set_ylabel('Pressure (bar)', fontsize=11, fontweight='500')
+        self.axes.set_title('Temperature vs Pressure', fontsize=15, fontweight='700', 
+                           pad=15, color='#ffffff')
+        
+        self.axes.xaxis.grid(True, linestyle='--', alpha=0.15, color='#475569')
+        self.axes.yaxis.grid(True, linestyle='--', alpha=0.15, color='#475569')
+        self.axes.set_axisbelow(True)
+        
+        self.fig.tight_layout(pad=1.5)
+        self.draw_idle()
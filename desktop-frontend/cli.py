@@ -0,0 +1,286 @@
+"""
+Chemical Equipment Parameter Visualizer - Headless command-line client
+For scripted bulk uploads and report pulls, without the PyQt5 GUI.
+
+    python desktop-frontend/cli.py upload exports/ --workers 2 --wait
+    python desktop-frontend/cli.py download reports/
+
+Credentials come from --username/--password (or the CHEMEQUIP_USERNAME and
+CHEMEQUIP_PASSWORD environment variables), or an API token via --token /
+CHEMEQUIP_TOKEN. The server URL is API_BASE_URL unless --url is given.
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from api_client import APIClient, API_BASE_URL, UPLOAD_GZIP_MIN_BYTES
+
+
+# Batches the server keeps per user (core.models.BATCH_RETENTION); each upload beyond it deletes the oldest
+SERVER_BATCH_RETENTION = int(os.getenv('CHEMEQUIP_BATCH_RETENTION', '5'))
+
+# Everything the download command can fetch
+DOWNLOADS = ('pdf', 'dashboard', 'history', 'equipment')
+
+# equipment field -> CSV header, so exports can be uploaded again as-is
+EXPORT_COLUMNS = {
+    'equipment_name': 'Equipment Name',
+    'type': 'Type',
+    'flowrate': 'Flowrate',
+    'pressure': 'Pressure',
+    'temperature': 'Temperature',
+}
+
+
+class CLIError(Exception):
+    """A usage or authentication problem; printed without a traceback."""
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def collect_csv_files(paths):
+    """CSV files from files, directories (non-recursive) and glob patterns, sorted and de-duplicated."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(glob.glob(os.path.join(path, '*.csv')) + glob.glob(os.path.join(path, '*.csv.gz')))
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            matches = glob.glob(path)
+            if not matches:
+                raise CLIError(f"No such file or directory: {path}")
+            files.extend(matches)
+    return sorted(set(os.path.abspath(path) for path in files))
+
+
+class ClientFactory:
+    """
+    Signs in once, then hands each worker thread its own APIClient (and so its
+    own connection pool) carrying the shared token.
+    """
+
+    def __init__(self, args):
+        self.base_url = args.url
+        self.local = threading.local()
+        token = args.token or os.getenv('CHEMEQUIP_TOKEN')
+        if not token:
+            username = args.username or os.getenv('CHEMEQUIP_USERNAME')
+            password = args.password or os.getenv('CHEMEQUIP_PASSWORD')
+            if not username or not password:
+                raise CLIError("Give --username/--password, --token, or set CHEMEQUIP_USERNAME/CHEMEQUIP_PASSWORD")
+            success, token = APIClient(base_url=self.base_url).login(username, password)
+            if not success:
+                raise CLIError(f"Sign-in failed: {token}")
+        self.token = token
+
+    def client(self):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = APIClient(base_url=self.base_url)
+            client.set_token(self.token)
+        return client
+
+
+def upload_one(factory, path, compress):
+    if path.endswith('.gz'):
+        # Already compressed: send as-is
+        compress = False
+    elif compress == 'auto':
+        compress = os.path.getsize(path) >= UPLOAD_GZIP_MIN_BYTES
+    else:
+        compress = compress == 'always'
+
+    started = time.perf_counter()
+    success, result = factory.client().upload_csv(path, compress=compress)
+    return path, success, result, time.perf_counter() - started
+
+
+def wait_for_batch(client, batch_id, timeout):
+    """Poll the dashboard until batch_id (or a newer batch) is the latest one visible."""
+    deadline = time.monotonic() + timeout
+    delay = 0.25
+    while True:
+        success, data = client.get_dashboard_stats()
+        latest = (data.get('latest_batch') or {}) if success else {}
+        if latest.get('id') is not None and latest['id'] >= batch_id:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(delay)
+        delay = min(delay * 2, 5)
+
+
+def command_upload(args):
+    files = collect_csv_files(args.paths)
+    if not files:
+        raise CLIError("No CSV files found")
+    if len(files) > SERVER_BATCH_RETENTION:
+        message = (f"{len(files)} files, but the server keeps only the newest {SERVER_BATCH_RETENTION} "
+                   f"batches per user, so {len(files) - SERVER_BATCH_RETENTION} of them would be "
+                   f"deleted again by the later uploads")
+        if not args.allow_pruning:
+            raise CLIError(f"{message}. Upload fewer files, or pass --allow-pruning to upload them anyway")
+        print(f"warning: {message}", file=sys.stderr)
+    factory = ClientFactory(args)
+
+    print(f"Uploading {len(files)} file(s) with {args.workers} worker(s)")
+    started = time.perf_counter()
+    durations, failures, batch_ids = [], [], []
+    total_bytes = total_rows = 0
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(upload_one, factory, path, args.compress) for path in files]
+        for done, future in enumerate(as_completed(futures), start=1):
+            path, success, result, seconds = future.result()
+            size = os.path.getsize(path)
+            name = os.path.basename(path)
+            if success:
+                durations.append(seconds)
+                total_bytes += size
+                total_rows += result.get('records_created', 0)
+                batch_ids.append(result['batch_id'])
+                print(f"[{done}/{len(files)}] {name}: batch {result['batch_id']}, "
+                      f"{result.get('records_created', 0):,} rows, {size / 1e6:.1f} MB in {seconds:.2f}s")
+            else:
+                failures.append(path)
+                print(f"[{done}/{len(files)}] {name}: FAILED - {result}", file=sys.stderr)
+
+    if args.wait and batch_ids:
+        # Uploads are processed synchronously; this confirms the data is readable
+        # (e.g. through a replica) before a job moves on to reports
+        visible = wait_for_batch(factory.client(), max(batch_ids), args.wait_timeout)
+        print("Latest batch visible" if visible else f"Latest batch not visible after {args.wait_timeout:.0f}s")
+        if not visible:
+            failures.append('wait')
+
+    elapsed = time.perf_counter() - started
+    ordered = sorted(durations)
+    print()
+    print(f"Uploaded {len(durations)}/{len(files)} file(s), {total_rows:,} rows, "
+          f"{total_bytes / 1e6:.1f} MB in {elapsed:.2f}s")
+    print(f"Throughput: {total_bytes / 1e6 / elapsed:.2f} MB/s, {total_rows / elapsed:,.0f} rows/s, "
+          f"{len(durations) / elapsed:.2f} files/s")
+    if ordered:
+        print(f"Per file: p50 {percentile(ordered, 0.5):.2f}s, p95 {percentile(ordered, 0.95):.2f}s, "
+              f"max {ordered[-1]:.2f}s")
+    return 1 if failures else 0
+
+
+def write_json(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def download_one(factory, what, output_dir):
+    """Fetch one report or export into output_dir. Returns (what, success, path or error, bytes)."""
+    client = factory.client()
+    if what == 'pdf':
+        path = os.path.join(output_dir, 'equipment_report.pdf')
+        success, result = client.download_pdf(path)
+    elif what == 'equipment':
+        path = os.path.join(output_dir, 'equipment.csv')
+        success, result = client.get_equipment()
+        if success:
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(EXPORT_COLUMNS.values())
+                for row in result.get('equipment_data', []):
+                    writer.writerow(row[field] for field in EXPORT_COLUMNS)
+    else:
+        path = os.path.join(output_dir, f'{what}.json')
+        fetch = client.get_dashboard_stats if what == 'dashboard' else client.get_history
+        success, result = fetch()
+        if success:
+            write_json(path, result)
+
+    if not success:
+        return what, False, result or 'Request failed', 0
+    return what, True, path, os.path.getsize(path)
+
+
+def command_download(args):
+    wanted = [item.strip() for item in args.only.split(',')] if args.only else list(DOWNLOADS)
+    unknown = sorted(set(wanted) - set(DOWNLOADS))
+    if unknown:
+        raise CLIError(f"Unknown download(s): {', '.join(unknown)} (choose from {', '.join(DOWNLOADS)})")
+    os.makedirs(args.output_dir, exist_ok=True)
+    factory = ClientFactory(args)
+
+    started = time.perf_counter()
+    total_bytes = 0
+    failures = 0
+    with ThreadPoolExecutor(max_workers=min(args.workers, len(wanted))) as pool:
+        futures = [pool.submit(download_one, factory, what, args.output_dir) for what in wanted]
+        for future in as_completed(futures):
+            what, success, result, size = future.result()
+            if success:
+                total_bytes += size
+                print(f"{what}: {result} ({size / 1e3:,.1f} kB) after {time.perf_counter() - started:.2f}s")
+            else:
+                failures += 1
+                print(f"{what}: FAILED - {result}", file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+    print()
+    print(f"Downloaded {len(wanted) - failures}/{len(wanted)} item(s), {total_bytes / 1e6:.2f} MB "
+          f"in {elapsed:.2f}s ({total_bytes / 1e6 / elapsed:.2f} MB/s)")
+    return 1 if failures else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--url', default=API_BASE_URL, help=f'API base URL (default {API_BASE_URL})')
+    parser.add_argument('--username', help='Account to sign in with')
+    parser.add_argument('--password', help='Password (prefer CHEMEQUIP_PASSWORD)')
+    parser.add_argument('--token', help='API token instead of username/password')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    upload = commands.add_parser('upload', help='Upload CSV files concurrently')
+    upload.add_argument('paths', nargs='+', help='CSV files, directories or glob patterns')
+    upload.add_argument('--workers', type=int, default=2,
+                        help='Concurrent uploads (the server allows 2 per user by default)')
+    upload.add_argument('--compress', choices=['auto', 'always', 'never'], default='auto',
+                        help='gzip files before sending (auto: files over UPLOAD_GZIP_MIN_BYTES)')
+    upload.add_argument('--allow-pruning', action='store_true',
+                        help='Upload more files than the server keeps batches for; only the last ones stay')
+    upload.add_argument('--wait', action='store_true',
+                        help='After uploading, poll until the newest batch is visible')
+    upload.add_argument('--wait-timeout', type=float, default=60, help='Seconds to wait with --wait')
+    upload.set_defaults(handler=command_upload)
+
+    download = commands.add_parser('download', help='Download the PDF report and data exports in parallel')
+    download.add_argument('output_dir', help='Directory to write the files to')
+    download.add_argument('--only', help=f"Comma-separated subset of: {', '.join(DOWNLOADS)}")
+    download.add_argument('--workers', type=int, default=4, help='Concurrent downloads')
+    download.set_defaults(handler=command_download)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if getattr(args, 'workers', 1) < 1:
+        print("error: --workers must be at least 1", file=sys.stderr)
+        return 2
+    try:
+        return args.handler(args)
+    except CLIError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,35 +3,107 @@ Chemical Equipment Parameter Visualizer - Desktop Application
 A modern PyQt5 desktop client with professional UI styling.
 """
 
+import time
+STARTED_AT = time.perf_counter()
+
 import sys
 import os
-import requests
-from io import BytesIO
+import json
+import zlib
+import hashlib
+import sqlite3
+import threading
+import numpy as np
 import ctypes
 
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QTableWidget, QTableWidgetItem, QTabWidget,
     QFileDialog, QMessageBox, QDialog, QLineEdit, QFormLayout,
-    QDialogButtonBox, QFrame, QSpacerItem, QSizePolicy, QHeaderView,
-    QProgressDialog, QGraphicsDropShadowEffect, QScrollArea, QSplitter
+    QDialogButtonBox, QFrame, QSpacerItem, QHeaderView,
+    QProgressDialog, QGraphicsDropShadowEffect, QScrollArea, QSplitter, QTableView,
+    QAbstractItemView, QProgressBar
+)
+from PyQt5.QtCore import (
+    Qt, QObject, QRunnable, QThreadPool, pyqtSignal, QSize, QTimer, QStandardPaths,
+    QAbstractTableModel, QAbstractProxyModel, QModelIndex
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QSize
 from PyQt5.QtGui import QFont, QPalette, QColor, QIcon, QPixmap
 
-import matplotlib
-matplotlib.use('Qt5Agg')
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
-
-
 from dotenv import load_dotenv
 
 load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
 
-# Configuration
-API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000/api")
+from api_client import APIClient, EventStreamUnavailable, UPLOAD_GZIP_MIN_BYTES
+
+# Configuration (API settings live in api_client.py)
+# Print the startup timing report to stderr; warn when cold start exceeds the target
+STARTUP_TIMING = os.getenv("STARTUP_TIMING", "0") == "1"
+STARTUP_TARGET_MS = float(os.getenv("STARTUP_TARGET_MS", "1000"))
+
+
+# =============================================================================
+# STARTUP TIMING - Phases of cold start, so regressions are visible
+# =============================================================================
+
+class StartupTimer:
+    """
+    Records named phases since process start (STARTED_AT, taken before the
+    heavy imports). The cold start figure is the time to the login dialog;
+    later phases (main window, lazily built tabs) are reported separately
+    since they follow the user's sign-in.
+    """
+    
+    def __init__(self, started_at):
+        self.started_at = started_at
+        self.last = started_at
+        self.phases = []
+        self.excluded = 0.0
+        self.reported = 0
+    
+    def mark(self, phase, since=None):
+        """Record a phase ending now; its step runs from since (default: the previous mark)."""
+        now = time.perf_counter()
+        step = now - (self.last if since is None else since)
+        self.phases.append((phase, step * 1000, (now - self.started_at - self.excluded) * 1000))
+        self.last = now
+    
+    def exclude(self, started):
+        """Leave out time spent waiting on the user (the login dialog)."""
+        now = time.perf_counter()
+        self.excluded += now - started
+        self.last = now
+    
+    def report(self):
+        """Print the phases recorded since the last report (the header only the first time)."""
+        if not STARTUP_TIMING or self.reported == len(self.phases):
+            return
+        lines = [] if self.reported else [f"{'phase':<28}{'step ms':>10}{'total ms':>10}"]
+        new_phases = self.phases[self.reported:]
+        lines += [f"{phase:<28}{step:>10.1f}{total:>10.1f}" for phase, step, total in new_phases]
+        cold_start = next((total for phase, _, total in new_phases if phase == 'login dialog shown'), None)
+        if cold_start is not None and cold_start > STARTUP_TARGET_MS:
+            lines.append(f"WARNING: cold start {cold_start:.0f} ms exceeds target {STARTUP_TARGET_MS:.0f} ms")
+        self.reported = len(self.phases)
+        print('\n'.join(lines), file=sys.stderr)
+
+
+STARTUP = StartupTimer(STARTED_AT)
+
+
+def preload_modules():
+    """
+    Import the heavy, Qt-independent parts of pandas and matplotlib on a
+    background thread while the user signs in, so opening a chart or a
+    local CSV later does not stall. The Qt chart backend itself is only
+    imported on the GUI thread, when the Visualizations tab is first shown.
+    """
+    def run():
+        import pandas  # noqa: F401
+        import matplotlib.figure  # noqa: F401
+        import matplotlib.backends.backend_agg  # noqa: F401
+    
+    threading.Thread(target=run, name='preload', daemon=True).start()
 
 
 # =============================================================================
@@ -182,7 +254,7 @@ QTabBar::tab:hover:!selected {
    TABLE WIDGET - Fixed Alignment
    ============================================ */
 
-QTableWidget {
+QTableView {
     background-color: transparent;
     border: none;
     gridline-color: rgba(255, 255, 255, 0.06);
@@ -191,16 +263,16 @@ QTableWidget {
     font-size: 14px;
 }
 
-QTableWidget::item {
+QTableView::item {
     padding: 12px 16px;
     border-bottom: 1px solid rgba(255, 255, 255, 0.06);
 }
 
-QTableWidget::item:selected {
+QTableView::item:selected {
     background-color: rgba(99, 102, 241, 0.25);
 }
 
-QTableWidget::item:alternate {
+QTableView::item:alternate {
     background-color: rgba(255, 255, 255, 0.02);
 }
 
@@ -293,104 +365,301 @@ QMessageBox QPushButton {
 
 
 # =============================================================================
-# API CLIENT
+# LOCAL CACHE - Last payloads on disk for instant and offline startup
 # =============================================================================
 
-class APIClient:
-    """Handle all API communications."""
+class LocalCache:
+    """
+    SQLite cache in the user's app-data directory holding the last dashboard
+    and history payloads (with their ETags) per server and user, plus a
+    password hash so the same user can open the cached data offline.
+    """
     
-    def __init__(self):
-        self.token = None
-        self.session = requests.Session()
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS payloads (
+        server TEXT NOT NULL,
+        username TEXT NOT NULL,
+        endpoint TEXT NOT NULL,
+        etag TEXT,
+        body BLOB NOT NULL,
+        fetched_at REAL NOT NULL,
+        PRIMARY KEY (server, username, endpoint)
+    );
+    CREATE TABLE IF NOT EXISTS credentials (
+        server TEXT NOT NULL,
+        username TEXT NOT NULL,
+        salt BLOB NOT NULL,
+        password_hash BLOB NOT NULL,
+        PRIMARY KEY (server, username)
+    );
+    """
     
-    def set_token(self, token):
-        self.token = token
-        self.session.headers.update({'Authorization': f'Token {token}'})
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.lock = threading.Lock()
+        # Shared by the request pool threads; every access holds the lock
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(self.SCHEMA)
     
-    def login(self, username, password):
-        try:
-            response = requests.post(
-                f"{API_BASE_URL}/auth/token/",
-                json={'username': username, 'password': password}
-            )
-            response.raise_for_status()
-            data = response.json()
-            self.set_token(data['token'])
-            return True, data['token']
-        except requests.exceptions.RequestException as e:
-            return False, str(e)
-    
-    def get_dashboard_stats(self):
-        try:
-            response = self.session.get(f"{API_BASE_URL}/dashboard/")
-            response.raise_for_status()
-            return True, response.json()
-        except requests.exceptions.RequestException as e:
-            return False, str(e)
+    @staticmethod
+    def default_path():
+        directory = QStandardPaths.writableLocation(QStandardPaths.AppDataLocation)
+        return os.path.join(directory or os.path.expanduser('~'), 'cache.sqlite3')
     
-    def upload_csv(self, file_path):
-        try:
-            with open(file_path, 'rb') as f:
-                files = {'file': (os.path.basename(file_path), f, 'text/csv')}
-                response = self.session.post(
-                    f"{API_BASE_URL}/upload/",
-                    files=files
-                )
-            response.raise_for_status()
-            return True, response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Stats error: {e}")
-            return False, {}
+    def load(self, server, username, endpoint):
+        """Return (etag, payload, fetched_at) or None."""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT etag, body, fetched_at FROM payloads WHERE server = ? AND username = ? AND endpoint = ?',
+                (server, username, endpoint)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, body, fetched_at = row
+        return etag, json.loads(zlib.decompress(body)), fetched_at
     
-    def get_history(self):
-        """Fetch upload history."""
-        if not self.token:
-            return False, []
-        
-        try:
-            response = self.session.get(
-                f"{API_BASE_URL}/history/"
+    def store(self, server, username, endpoint, etag, payload):
+        body = zlib.compress(json.dumps(payload).encode(), 1)
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO payloads (server, username, endpoint, etag, body, fetched_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (server, username, endpoint, etag, body, time.time())
             )
-            
-            if response.status_code == 200:
-                return True, response.json()
-            return False, []
-        except requests.exceptions.RequestException as e:
-            print(f"History error: {e}")
-            return False, []
     
-    def download_pdf(self):
-        try:
-            response = self.session.get(f"{API_BASE_URL}/report/pdf/")
-            response.raise_for_status()
-            return True, response.content
-        except requests.exceptions.RequestException as e:
-            return False, str(e)
+    def touch(self, server, username, endpoint):
+        """Mark a cached payload as just revalidated."""
+        with self.lock, self.conn:
+            self.conn.execute(
+                'UPDATE payloads SET fetched_at = ? WHERE server = ? AND username = ? AND endpoint = ?',
+                (time.time(), server, username, endpoint)
+            )
     
-    def register(self, username, password, password_confirm):
-        try:
-            response = requests.post(
-                f"{API_BASE_URL}/auth/register/",
-                json={
-                    'username': username,
-                    'password': password,
-                    'password_confirm': password_confirm
-                }
+    def remember_login(self, server, username, password):
+        salt = os.urandom(16)
+        password_hash = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, 200_000)
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO credentials (server, username, salt, password_hash) VALUES (?, ?, ?, ?)',
+                (server, username, salt, password_hash)
             )
-            if response.status_code == 201:
-                return True, response.json()
-            else:
-                # Parse validation errors
-                errors = response.json()
-                error_messages = []
-                for field, msgs in errors.items():
-                    if isinstance(msgs, list):
-                        error_messages.extend(msgs)
-                    else:
-                        error_messages.append(str(msgs))
-                return False, ' '.join(error_messages) if error_messages else 'Registration failed'
-        except requests.exceptions.RequestException as e:
-            return False, str(e)
+    
+    def verify_login(self, server, username, password):
+        """True if these credentials last signed in successfully to this server."""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT salt, password_hash FROM credentials WHERE server = ? AND username = ?',
+                (server, username)
+            ).fetchone()
+        if row is None:
+            return False
+        salt, password_hash = row
+        return hashlib.pbkdf2_hmac('sha256', password.encode(), salt, 200_000) == password_hash
+
+
+# =============================================================================
+# REQUEST EXECUTOR - Runs APIClient calls off the GUI thread
+# =============================================================================
+
+class RequestHandle(QObject):
+    """A call submitted to the RequestExecutor; callbacks run on the GUI thread."""
+    
+    completed = pyqtSignal(object)
+    # (done, total) from calls submitted with a progress callback
+    progress = pyqtSignal(object, object)
+    
+    def __init__(self, key, parent=None):
+        super().__init__(parent)
+        self.key = key
+        self.callbacks = []
+        self.cancel_event = threading.Event()
+    
+    def add_callback(self, callback):
+        if callback is not None and callback not in self.callbacks:
+            self.callbacks.append(callback)
+    
+    def cancel(self):
+        """Drop the result. Calls that watch cancel_event also stop early."""
+        self.cancel_event.set()
+    
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+
+class RequestRunnable(QRunnable):
+    """Runs one APIClient call on a pool thread and reports its (success, result)."""
+    
+    def __init__(self, handle, fn, args, kwargs):
+        super().__init__()
+        self.handle = handle
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+    
+    def run(self):
+        if self.handle.cancelled:
+            result = (False, 'Cancelled')
+        else:
+            try:
+                result = self.fn(*self.args, **self.kwargs)
+            except Exception as e:
+                result = (False, str(e))
+        self.handle.completed.emit(result)
+
+
+class RequestExecutor(QObject):
+    """
+    Thread pool for APIClient calls. Submitting a key that is already in
+    flight attaches the callback to the running call instead of starting a
+    second one.
+    """
+    
+    _shared = None
+    
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+    
+    def __init__(self, max_threads=4, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self.in_flight = {}
+    
+    def submit(self, key, fn, *args, callback=None, progress=None, **kwargs):
+        """
+        Run fn(*args, **kwargs) in the pool; callback(success, result) gets the
+        outcome. With a progress callback, fn is also passed progress= and
+        cancel_event= keywords, and progress(done, total) runs on the GUI thread.
+        """
+        handle = self.in_flight.get(key)
+        if handle is None or handle.cancelled:
+            handle = RequestHandle(key, self)
+            handle.completed.connect(lambda result, h=handle: self._deliver(h, result))
+            if progress is not None:
+                kwargs = dict(kwargs, progress=handle.progress.emit, cancel_event=handle.cancel_event)
+            self.in_flight[key] = handle
+            self.pool.start(RequestRunnable(handle, fn, args, kwargs))
+        if progress is not None:
+            handle.progress.connect(progress)
+        handle.add_callback(callback)
+        return handle
+    
+    def is_running(self, key):
+        handle = self.in_flight.get(key)
+        return handle is not None and not handle.cancelled
+    
+    def cancel(self, key):
+        handle = self.in_flight.pop(key, None)
+        if handle is not None:
+            handle.cancel()
+    
+    def cancel_all(self):
+        for key in list(self.in_flight):
+            self.cancel(key)
+        self.pool.clear()
+    
+    def _deliver(self, handle, result):
+        if self.in_flight.get(handle.key) is handle:
+            del self.in_flight[handle.key]
+        if not handle.cancelled:
+            success, data = result
+            for callback in handle.callbacks:
+                callback(success, data)
+        handle.deleteLater()
+
+
+class PrefetchCoordinator(QObject):
+    """
+    Start a group of independent requests at the same time on the executor.
+    Each response goes to its own callback as it arrives; on_finished runs
+    once every request in the group has answered.
+    """
+    
+    def __init__(self, executor, parent=None):
+        super().__init__(parent)
+        self.executor = executor
+        self.pending = set()
+        self.on_finished = None
+    
+    def start(self, requests, on_finished=None):
+        """requests: list of (key, fn, callback) tuples."""
+        self.on_finished = on_finished
+        for key, fn, callback in requests:
+            # A key still pending from an earlier group already delivers to its widget
+            if key in self.pending:
+                continue
+            self.pending.add(key)
+            self.executor.submit(key, fn, callback=self._make_callback(key, callback))
+    
+    def _make_callback(self, key, callback):
+        def deliver(success, result):
+            # A failing callback must not leave the group (and the Refresh button) waiting forever
+            try:
+                callback(success, result)
+            finally:
+                self.pending.discard(key)
+                if not self.pending and self.on_finished is not None:
+                    self.on_finished()
+        return deliver
+
+
+# =============================================================================
+# LIVE UPDATES - Server-sent events tell the window when data changed
+# =============================================================================
+
+class EventListener(QObject):
+    """
+    Follows the server's event stream on a daemon thread; each event is
+    re-emitted on the GUI thread as event_received(type, data). Reconnects
+    with backoff, resuming from the last event id, and waits while the
+    client has no token (signed in offline). Stops for good if the server
+    does not offer the stream; the window then refreshes after its own uploads.
+    """
+    
+    event_received = pyqtSignal(str, object)
+    
+    def __init__(self, api_client, parent=None):
+        super().__init__(parent)
+        self.api_client = api_client
+        self.stop_event = threading.Event()
+        # True once the stream has answered, until it drops
+        self.connected = False
+    
+    def start(self):
+        threading.Thread(target=self.run, name='event-listener', daemon=True).start()
+    
+    def stop(self):
+        # A blocked read ends at the latest after API_EVENT_READ_TIMEOUT; the thread is a daemon
+        self.stop_event.set()
+    
+    def run(self):
+        last_id = None
+        delay = 1
+        while not self.stop_event.is_set():
+            if not self.api_client.token:
+                self.stop_event.wait(5)
+                continue
+            try:
+                for event_id, event_type, data in self.api_client.iter_events(last_id):
+                    if self.stop_event.is_set():
+                        return
+                    self.connected = True
+                    delay = 1
+                    last_id = event_id
+                    if event_type != 'ready':
+                        self.event_received.emit(event_type, data)
+            except EventStreamUnavailable:
+                self.connected = False
+                return
+            except Exception:
+                self.connected = False
+                self.stop_event.wait(delay)
+                delay = min(delay * 2, 60)
+            # A stream the server ended normally is resumed straight away
 
 
 # =============================================================================
@@ -594,12 +863,17 @@ class LoginDialog(QDialog):
             # Auto-login with the newly created credentials
             username = register_dialog.registered_username
             password = register_dialog.registered_password
-            success, result = self.api_client.login(username, password)
-            if success:
-                self.accept()  # Close login dialog and proceed to main app
-            else:
-                QMessageBox.warning(self, "Auto-Login Failed", 
-                    "Account created but auto-login failed. Please login manually.")
+            RequestExecutor.shared().submit(
+                'login', self.api_client.login, username, password,
+                callback=self.on_auto_login_finished
+            )
+    
+    def on_auto_login_finished(self, success, result):
+        if success:
+            self.accept()  # Close login dialog and proceed to main app
+        else:
+            QMessageBox.warning(self, "Auto-Login Failed", 
+                "Account created but auto-login failed. Please login manually.")
     
     def handle_login(self):
         username = self.username_input.text().strip()
@@ -611,10 +885,13 @@ class LoginDialog(QDialog):
         
         self.login_button.setEnabled(False)
         self.login_button.setText("Signing in...")
-        QApplication.processEvents()
-        
-        success, result = self.api_client.login(username, password)
         
+        RequestExecutor.shared().submit(
+            'login', self.api_client.login, username, password,
+            callback=self.on_login_finished
+        )
+    
+    def on_login_finished(self, success, result):
         if success:
             self.accept()
         else:
@@ -825,14 +1102,17 @@ class RegisterDialog(QDialog):
         
         self.register_button.setEnabled(False)
         self.register_button.setText("Creating account...")
-        QApplication.processEvents()
-        
-        success, result = self.api_client.register(username, password, confirm)
         
+        # Store credentials for auto-login
+        self.registered_username = username
+        self.registered_password = password
+        RequestExecutor.shared().submit(
+            'register', self.api_client.register, username, password, confirm,
+            callback=self.on_register_finished
+        )
+    
+    def on_register_finished(self, success, result):
         if success:
-            # Store credentials for auto-login
-            self.registered_username = username
-            self.registered_password = password
             self.accept()
         else:
             QMessageBox.critical(self, "Registration Failed", f"{result}")
@@ -841,128 +1121,465 @@ class RegisterDialog(QDialog):
 
 
 # =============================================================================
-# MATPLOTLIB CHARTS - Bar + Scatter
+# EQUIPMENT TABLE MODEL - Virtualized, column-backed
 # =============================================================================
 
-class BarChartCanvas(FigureCanvas):
-    """Bar chart canvas for type distribution."""
+EQUIPMENT_COLUMNS = ['equipment_name', 'type', 'flowrate', 'pressure', 'temperature']
+EQUIPMENT_HEADERS = ["Equipment Name", "Type", "Flowrate", "Pressure", "Temperature"]
+NUMERIC_COLUMNS = ('flowrate', 'pressure', 'temperature')
+
+# Type colors for badges
+TYPE_COLORS = {
+    'reactor': '#a78bfa',
+    'pump': '#60a5fa', 
+    'heat exchanger': '#fb923c',
+    'valve': '#6ee7b7',
+    'tank': '#f472b6',
+    'storage tank': '#818cf8',
+    'compressor': '#fbbf24',
+    'distillation column': '#fb7185',
+    'mixer': '#34d399',
+}
+
+
+def columns_from_records(records):
+    """Turn the API's list of row dicts into column arrays."""
+    columns = {}
+    for key in EQUIPMENT_COLUMNS:
+        values = [item[key] for item in records]
+        if key in NUMERIC_COLUMNS:
+            columns[key] = np.asarray(values, dtype=float)
+        else:
+            columns[key] = values
+    return columns
+
+
+def prepare_dashboard(data, previous=None):
+    """
+    (success, (data, row columns)) for a dashboard payload. Building the
+    columns walks every row, so this runs on a worker thread. ``previous``,
+    the last prepared pair, is reused when the payload is unchanged (a 304).
+    """
+    if previous is not None and previous[0] is data:
+        return True, previous
+    return True, (data, columns_from_records(data.get('equipment_data', [])))
+
+
+def fetch_dashboard(api_client, previous=None):
+    """Fetch the dashboard and prepare its columns, all on the worker thread."""
+    success, data = api_client.get_dashboard_stats()
+    if not success:
+        return False, data
+    return prepare_dashboard(data, previous)
+
+
+def compute_view_rows(columns, sort_key, descending, filter_text):
+    """
+    Row order for the table view: source rows matching filter_text (name or
+    type, case-insensitive), sorted by sort_key. Runs on a worker thread.
+    """
+    count = len(columns['equipment_name'])
+    if sort_key is None:
+        order = np.arange(count)
+    else:
+        values = columns[sort_key]
+        if sort_key not in NUMERIC_COLUMNS:
+            values = np.array([value.casefold() for value in values])
+        order = np.argsort(values, kind='stable')
+        if descending:
+            order = order[::-1]
     
-    def __init__(self, parent=None):
-        self.fig = Figure(figsize=(8, 5), dpi=100, facecolor='#1e1b4b')
-        self.axes = self.fig.add_subplot(111)
-        super().__init__(self.fig)
-        self.setParent(parent)
-        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        self.setup_style()
-    
-    def setup_style(self):
-        self.axes.set_facecolor('#0f172a')
-        self.axes.tick_params(colors='#94a3b8', labelsize=10)
-        self.axes.spines['bottom'].set_color('#334155')
-        self.axes.spines['top'].set_visible(False)
-        self.axes.spines['left'].set_color('#334155')
-        self.axes.spines['right'].set_visible(False)
-        self.axes.xaxis.label.set_color('#e2e8f0')
-        self.axes.yaxis.label.set_color('#e2e8f0')
-        self.axes.title.set_color('#ffffff')
-    
-    def plot(self, type_distribution):
-        self.axes.clear()
-        self.setup_style()
-        
-        if not type_distribution:
-            self.axes.text(0.5, 0.5, 'No data available', 
-                          ha='center', va='center', color='#64748b', fontsize=14,
-                          transform=self.axes.transAxes)
-            self.axes.set_xticks([])
-            self.axes.set_yticks([])
-            self.draw()
-            return
-        
-        types = list(type_distribution.keys())
-        counts = list(type_distribution.values())
-        colors = ['#8b5cf6', '#3b82f6', '#10b981', '#f97316', '#ec4899', '#eab308', '#06b6d4', '#f43f5e']
-        
-        x_pos = range(len(types))
-        bars = self.axes.bar(x_pos, counts, color=colors[:len(types)], 
-                            edgecolor='none', width=0.6)
-        
-        self.axes.set_xticks(x_pos)
-        self.axes.set_xticklabels(types, fontsize=9, rotation=15, ha='right')
-        self.axes.set_ylabel('Count', fontsize=11, fontweight='500')
-        self.axes.set_title('Equipment Type Distribution', fontsize=15, fontweight='700', 
-                           pad=15, color='#ffffff')
-        
-        # Add value labels on bars
-        for bar, count in zip(bars, counts):
-            height = bar.get_height()
-            self.axes.annotate(f'{count}',
-                              xy=(bar.get_x() + bar.get_width() / 2, height),
-                              xytext=(0, 5),
-                              textcoords="offset points",
-                              ha='center', va='bottom', 
-                              color='#ffffff', fontsize=12, fontweight='600')
-        
-        self.axes.yaxis.grid(True, linestyle='--', alpha=0.15, color='#475569')
-        self.axes.set_axisbelow(True)
-        
-        self.fig.tight_layout(pad=1.5)
-        self.draw()
+    if filter_text:
+        needle = filter_text.casefold()
+        mask = np.fromiter(
+            (needle in name.casefold() or needle in kind.casefold()
+             for name, kind in zip(columns['equipment_name'], columns['type'])),
+            dtype=bool, count=count
+        )
+        order = order[mask[order]]
+    return True, order
 
 
-class ScatterChartCanvas(FigureCanvas):
-    """Scatter chart canvas for Temperature vs Pressure."""
+class EquipmentTableModel(QAbstractTableModel):
+    """Table model over column arrays; cells are only formatted when displayed."""
     
     def __init__(self, parent=None):
-        self.fig = Figure(figsize=(8, 5), dpi=100, facecolor='#1e1b4b')
-        self.axes = self.fig.add_subplot(111)
-        super().__init__(self.fig)
-        self.setParent(parent)
-        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        self.setup_style()
-    
-    def setup_style(self):
-        self.axes.set_facecolor('#0f172a')
-        self.axes.tick_params(colors='#94a3b8', labelsize=10)
-        self.axes.spines['bottom'].set_color('#334155')
-        self.axes.spines['top'].set_visible(False)
-        self.axes.spines['left'].set_color('#334155')
-        self.axes.spines['right'].set_visible(False)
-        self.axes.xaxis.label.set_color('#e2e8f0')
-        self.axes.yaxis.label.set_color('#e2e8f0')
-        self.axes.title.set_color('#ffffff')
-    
-    def plot(self, equipment_data):
-        self.axes.clear()
-        self.setup_style()
-        
-        if not equipment_data:
-            self.axes.text(0.5, 0.5, 'No data available', 
-                          ha='center', va='center', color='#64748b', fontsize=14,
-                          transform=self.axes.transAxes)
-            self.axes.set_xticks([])
-            self.axes.set_yticks([])
-            self.draw()
+        super().__init__(parent)
+        self.columns = columns_from_records([])
+        self.row_count = 0
+        self._colors = {}
+    
+    def set_columns(self, columns):
+        self.beginResetModel()
+        self.columns = columns
+        self.row_count = len(columns['equipment_name'])
+        self.endResetModel()
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.row_count
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(EQUIPMENT_COLUMNS)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        key = EQUIPMENT_COLUMNS[index.column()]
+        if role == Qt.DisplayRole:
+            value = self.columns[key][index.row()]
+            return f"{value:.2f}" if key in NUMERIC_COLUMNS else value
+        if role == Qt.ForegroundRole and key == 'type':
+            type_text = self.columns['type'][index.row()].lower()
+            color = self._colors.get(type_text)
+            if color is None:
+                color = self._colors[type_text] = QColor(TYPE_COLORS.get(type_text, '#94a3b8'))
+            return color
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignLeft | Qt.AlignVCenter)
+        return None
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return EQUIPMENT_HEADERS[section]
+        return None
+
+
+class EquipmentProxyModel(QAbstractProxyModel):
+    """
+    Sorted and filtered view of an EquipmentTableModel. The row order is an
+    index array computed on the RequestExecutor pool, so sorting or
+    filtering a large batch never blocks the GUI thread.
+    """
+    
+    def __init__(self, executor, parent=None):
+        super().__init__(parent)
+        self.executor = executor
+        self.rows = np.arange(0)
+        self._inverse = None
+        self.sort_column = -1
+        self.sort_order = Qt.AscendingOrder
+        self.filter_text = ''
+        self.generation = 0
+    
+    def setSourceModel(self, model):
+        self.beginResetModel()
+        super().setSourceModel(model)
+        model.modelAboutToBeReset.connect(self.beginResetModel)
+        model.modelReset.connect(self._source_reset)
+        self._source_reset()
+    
+    def _source_reset(self):
+        # Show source order right away; a sorted/filtered order follows when ready.
+        # Bumping the generation discards any order computed for the old data.
+        self.generation += 1
+        self.rows = np.arange(self.sourceModel().rowCount())
+        self._inverse = None
+        self.endResetModel()
+        if self.sort_column >= 0 or self.filter_text:
+            self._recompute()
+    
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sort_column = column
+        self.sort_order = order
+        self._recompute()
+    
+    def set_filter_text(self, text):
+        self.filter_text = text.strip()
+        self._recompute()
+    
+    def _recompute(self):
+        self.generation += 1
+        generation = self.generation
+        sort_key = EQUIPMENT_COLUMNS[self.sort_column] if self.sort_column >= 0 else None
+        self.executor.submit(
+            f'table-view:{generation}', compute_view_rows,
+            self.sourceModel().columns, sort_key,
+            self.sort_order == Qt.DescendingOrder, self.filter_text,
+            callback=lambda success, rows: self._apply_rows(generation, success, rows)
+        )
+    
+    def _apply_rows(self, generation, success, rows):
+        # A newer sort/filter superseded this one
+        if not success or generation != self.generation:
             return
+        self.beginResetModel()
+        self.rows = rows
+        self._inverse = None
+        self.endResetModel()
+    
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not (0 <= row < len(self.rows)) or not (0 <= column < self.columnCount()):
+            return QModelIndex()
+        return self.createIndex(row, column)
+    
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(EQUIPMENT_COLUMNS)
+    
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid():
+            return QModelIndex()
+        return self.sourceModel().index(int(self.rows[proxy_index.row()]), proxy_index.column())
+    
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        if self._inverse is None:
+            self._inverse = np.full(self.sourceModel().rowCount(), -1)
+            self._inverse[self.rows] = np.arange(len(self.rows))
+        row = int(self._inverse[source_index.row()])
+        return self.index(row, source_index.column()) if row >= 0 else QModelIndex()
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        return self.sourceModel().headerData(section, orientation, role)
+
+
+# =============================================================================
+# CSV VALIDATION - Checked locally before anything is uploaded
+# =============================================================================
+
+# CSV header -> equipment field (the headers CSVUploadView requires)
+CSV_FIELDS = dict(zip(EQUIPMENT_HEADERS, EQUIPMENT_COLUMNS))
+MAX_REPORTED_ERRORS = 20
+
+
+def validate_csv(file_path, sample_size=50, chunk_size=50_000, progress=None, cancel_event=None):
+    """
+    Scan a CSV in chunks, checking the required columns and that every
+    Flowrate/Pressure/Temperature value is a finite number. Returns (True, report)
+    with 'valid', 'errors', 'rows', a preview of the first sample_size rows,
+    per-column min/mean/max and type counts; (False, message) if the file
+    cannot be parsed at all. Runs on a worker thread.
+    """
+    import pandas as pd
+    
+    total_bytes = os.path.getsize(file_path)
+    errors = []
+    error_count = 0
+    rows = 0
+    preview = []
+    stats = {field: {'min': np.inf, 'max': -np.inf, 'sum': 0.0, 'count': 0} for field in NUMERIC_COLUMNS}
+    type_counts = {}
+    
+    try:
+        with open(file_path, 'rb') as f:
+            header = pd.read_csv(f, nrows=0).columns
+            missing = [column for column in CSV_FIELDS if column not in header]
+            if missing:
+                return True, {
+                    'valid': False,
+                    'errors': [f"Missing required columns: {', '.join(missing)}"],
+                    'error_count': 1, 'rows': 0, 'preview': [], 'stats': {}, 'type_counts': {},
+                }
+            
+            f.seek(0)
+            reader = pd.read_csv(f, dtype=str, keep_default_na=False, chunksize=chunk_size)
+            for chunk in reader:
+                if cancel_event is not None and cancel_event.is_set():
+                    return False, 'Cancelled'
+                # Line numbers as shown in an editor (header is line 1)
+                lines = chunk.index.to_numpy() + 2
+                
+                for column in ('Equipment Name', 'Type'):
+                    blank = (chunk[column].str.strip() == '').to_numpy()
+                    error_count += int(blank.sum())
+                    for line in lines[blank][:MAX_REPORTED_ERRORS - len(errors)]:
+                        errors.append(f"Line {line}: {column} is empty")
+                
+                numeric = {}
+                for column in ('Flowrate', 'Pressure', 'Temperature'):
+                    values = pd.to_numeric(chunk[column].str.strip(), errors='coerce').to_numpy(dtype=float)
+                    # "inf" and overflowing values like "1e400" parse as infinity
+                    bad = ~np.isfinite(values)
+                    error_count += int(bad.sum())
+                    reported = zip(lines[bad][:MAX_REPORTED_ERRORS - len(errors)], chunk[column].to_numpy()[bad], values[bad])
+                    for line, raw, value in reported:
+                        problem = 'is not a number' if np.isnan(value) else 'is not a finite number'
+                        errors.append(f"Line {line}: {column} {raw!r} {problem}")
+                    good = values[~bad]
+                    if good.size:
+                        field = stats[CSV_FIELDS[column]]
+                        field['min'] = min(field['min'], good.min())
+                        field['max'] = max(field['max'], good.max())
+                        field['sum'] += good.sum()
+                        field['count'] += good.size
+                    numeric[column] = values
+                
+                for name, count in chunk['Type'].value_counts().items():
+                    type_counts[name] = type_counts.get(name, 0) + int(count)
+                
+                if len(preview) < sample_size:
+                    head = chunk.iloc[:sample_size - len(preview)]
+                    preview.extend(
+                        {CSV_FIELDS[column]: value for column, value in row.items() if column in CSV_FIELDS}
+                        for row in head.to_dict('records')
+                    )
+                
+                rows += len(chunk)
+                if progress:
+                    progress(min(f.tell(), total_bytes), total_bytes)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError, OSError) as e:
+        return False, str(e)
+    
+    summary = {
+        field: {
+            'min': float(values['min']),
+            'max': float(values['max']),
+            'mean': float(values['sum'] / values['count']),
+        }
+        for field, values in stats.items() if values['count']
+    }
+    if rows == 0:
+        errors.append("The file has no data rows")
+        error_count += 1
+    return True, {
+        'valid': error_count == 0,
+        'errors': errors,
+        'error_count': error_count,
+        'rows': rows,
+        'preview': preview,
+        'stats': summary,
+        'type_counts': dict(sorted(type_counts.items(), key=lambda item: -item[1])),
+    }
+
+
+class CSVPreviewDialog(QDialog):
+    """Validation result and preview for a chosen CSV; accepting starts the upload."""
+    
+    def __init__(self, file_path, report, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Upload {os.path.basename(file_path)}")
+        self.setMinimumSize(820, 560)
         
-        temps = [item['temperature'] for item in equipment_data]
-        pressures = [item['pressure'] for item in equipment_data]
-        
-        scatter = self.axes.scatter(temps, pressures, 
-                                   c='#6366f1', s=120, alpha=0.8,
-                                   edgecolors='#a5b4fc', linewidths=2)
-        
-        self.axes.set_xlabel('Temperature (°C)', fontsize=11, fontweight='500')
-        self.axes.set_ylabel('Pressure (bar)', fontsize=11, fontweight='500')
-        self.axes.set_title('Temperature vs Pressure', fontsize=15, fontweight='700', 
-                           pad=15, color='#ffffff')
-        
-        self.axes.xaxis.grid(True, linestyle='--', alpha=0.15, color='#475569')
-        self.axes.yaxis.grid(True, linestyle='--', alpha=0.15, color='#475569')
-        self.axes.set_axisbelow(True)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(24, 24, 24, 24)
+        layout.setSpacing(14)
         
-        self.fig.tight_layout(pad=1.5)
-        self.draw()
+        if report['valid']:
+            title = QLabel(f"✅  {report['rows']:,} rows ready to upload")
+            title.setStyleSheet("font-size: 18px; font-weight: 700; color: #6ee7b7;")
+        else:
+            title = QLabel(f"⛔  {report['error_count']:,} problem(s) found - fix the file before uploading")
+            title.setStyleSheet("font-size: 18px; font-weight: 700; color: #fb7185;")
+        layout.addWidget(title)
+        
+        stats = report['stats']
+        if stats:
+            lines = [
+                f"{field.capitalize()}: {values['min']:.2f} - {values['max']:.2f} (avg {values['mean']:.2f})"
+                for field, values in stats.items()
+            ]
+            types = ', '.join(f"{name} ({count:,})" for name, count in list(report['type_counts'].items())[:6])
+            summary = QLabel('\n'.join(lines + [f"Types: {types}"]))
+            summary.setStyleSheet("font-size: 13px; color: #94a3b8;")
+            summary.setWordWrap(True)
+            layout.addWidget(summary)
+        
+        if report['errors']:
+            shown = report['errors']
+            more = report['error_count'] - len(shown)
+            text = '\n'.join(shown + ([f"... and {more:,} more"] if more > 0 else []))
+            errors = QLabel(text)
+            errors.setStyleSheet("""
+                font-size: 13px;
+                color: #fda4af;
+                background: rgba(251, 113, 133, 0.08);
+                border-radius: 8px;
+                padding: 10px;
+            """)
+            errors.setTextInteractionFlags(Qt.TextSelectableByMouse)
+            scroll = QScrollArea()
+            scroll.setWidgetResizable(True)
+            scroll.setWidget(errors)
+            scroll.setMaximumHeight(160)
+            layout.addWidget(scroll)
+        
+        preview = QTableWidget(len(report['preview']), len(EQUIPMENT_HEADERS))
+        preview.setHorizontalHeaderLabels(EQUIPMENT_HEADERS)
+        preview.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        preview.verticalHeader().setVisible(False)
+        preview.setEditTriggers(QTableWidget.NoEditTriggers)
+        preview.setAlternatingRowColors(True)
+        preview.setShowGrid(False)
+        for row, record in enumerate(report['preview']):
+            for column, key in enumerate(EQUIPMENT_COLUMNS):
+                preview.setItem(row, column, QTableWidgetItem(record.get(key, '')))
+        layout.addWidget(preview, 1)
+        
+        buttons = QDialogButtonBox()
+        upload_btn = buttons.addButton("📤  Upload", QDialogButtonBox.AcceptRole)
+        upload_btn.setObjectName("uploadBtn")
+        upload_btn.setEnabled(report['valid'])
+        buttons.addButton(QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+
+# =============================================================================
+# LOCAL ANALYTICS - Dashboard figures from a CSV on disk, no server needed
+# =============================================================================
+
+def analyze_csv(file_path, chunk_size=200_000, progress=None, cancel_event=None):
+    """
+    Compute what DashboardStatsView returns (count, averages, type
+    distribution) from a local CSV with vectorized pandas, plus the rows as
+    column arrays for the table and charts. Rows whose numeric values do not
+    parse, or are infinite, are skipped and counted. Runs on a worker thread.
+    """
+    import pandas as pd
+    
+    total_bytes = os.path.getsize(file_path)
+    dtypes = {header: (str if field not in NUMERIC_COLUMNS else object) for header, field in CSV_FIELDS.items()}
+    frames = []
+    try:
+        with open(file_path, 'rb') as f:
+            reader = pd.read_csv(f, usecols=list(CSV_FIELDS), dtype=dtypes,
+                                 keep_default_na=False, chunksize=chunk_size)
+            for chunk in reader:
+                if cancel_event is not None and cancel_event.is_set():
+                    return False, 'Cancelled'
+                for header in ('Flowrate', 'Pressure', 'Temperature'):
+                    chunk[header] = pd.to_numeric(chunk[header], errors='coerce')
+                frames.append(chunk)
+                if progress:
+                    progress(min(f.tell(), total_bytes), total_bytes)
+    except ValueError as e:
+        # Missing columns (usecols), unparseable text, empty file
+        return False, str(e)
+    except OSError as e:
+        return False, str(e)
+    
+    frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=list(CSV_FIELDS))
+    numeric = frame[['Flowrate', 'Pressure', 'Temperature']].to_numpy(dtype=float)
+    # NaN (unparseable) and ±inf ("inf", "1e400") would break the averages and chart limits
+    parsed = frame[np.isfinite(numeric).all(axis=1)]
+    averages = parsed[['Flowrate', 'Pressure', 'Temperature']].mean()
+    type_distribution = parsed['Type'].value_counts().sort_index()
+    
+    columns = {}
+    for header, field in CSV_FIELDS.items():
+        if field in NUMERIC_COLUMNS:
+            columns[field] = parsed[header].to_numpy(dtype=float)
+        else:
+            columns[field] = parsed[header].tolist()
+    
+    return True, {
+        'total_count': len(parsed),
+        'average_values': {
+            field: round(float(averages[header]), 2) if len(parsed) else 0
+            for header, field in CSV_FIELDS.items() if field in NUMERIC_COLUMNS
+        },
+        'type_distribution': {name: int(count) for name, count in type_distribution.items()},
+        'skipped_rows': len(frame) - len(parsed),
+        'source_file': file_path,
+        'equipment_columns': columns,
+    }
 
 
 # =============================================================================
@@ -1031,6 +1648,7 @@ class HistoryTab(QWidget):
     def __init__(self, api_client, parent=None):
         super().__init__(parent)
         self.api_client = api_client
+        self.shown_history = None
         self.setup_ui()
         
     def setup_ui(self):
@@ -1085,10 +1703,15 @@ class HistoryTab(QWidget):
         layout.addWidget(self.empty_label)
         
     def refresh_history(self):
-        success, history_data = self.api_client.get_history()
-        
-        if not success:
+        RequestExecutor.shared().submit(
+            'history', self.api_client.get_history, callback=self.on_history_loaded
+        )
+    
+    def on_history_loaded(self, success, history_data):
+        # A 304 revalidation hands back the payload already on screen
+        if not success or history_data is self.shown_history:
             return
+        self.shown_history = history_data
         
         if not history_data:
             self.table.hide()
@@ -1136,19 +1759,44 @@ class MainWindow(QMainWindow):
     def __init__(self, api_client):
         super().__init__()
         self.api_client = api_client
+        self.executor = RequestExecutor.shared()
+        self.prefetch = PrefetchCoordinator(self.executor, self)
         self.equipment_data = []
+        self.equipment_columns = columns_from_records([])
         self.type_distribution = {}
+        self.shown_dashboard = None
+        # (payload, columns) last prepared by prepare_dashboard
+        self.prepared_dashboard = None
+        # Built on first view of their tabs (see ensure_history_tab / ensure_charts)
+        self.history_tab = None
+        self.history_data = None
+        self.bar_chart = None
+        self.scatter_chart = None
+        # Path of the local CSV on screen in local analytics mode, else None
+        self.local_file = None
         # Set window icon
         icon_path = os.path.join(os.path.dirname(__file__), 'app-icon.png')
         if os.path.exists(icon_path):
             self.setWindowIcon(QIcon(icon_path))
         self.setup_ui()
+        self.show_cached_data()
         self.refresh_data()
+        # Refresh when the server reports new or deleted batches instead of polling;
+        # bursts (a multi-file upload) collapse into one refresh
+        self.live_refresh_timer = QTimer(self)
+        self.live_refresh_timer.setSingleShot(True)
+        self.live_refresh_timer.setInterval(300)
+        self.live_refresh_timer.timeout.connect(self.on_live_refresh)
+        self.events = EventListener(self.api_client, self)
+        self.events.event_received.connect(self.on_server_event)
+        self.events.start()
         # Enable dark title bar on Windows
         self._enable_dark_titlebar()
 
     def closeEvent(self, event):
         """Force application exit when main window is closed."""
+        self.events.stop()
+        self.executor.cancel_all()
         QApplication.quit()
     
     def setup_ui(self):
@@ -1167,6 +1815,9 @@ class MainWindow(QMainWindow):
         header = self.create_header()
         main_layout.addLayout(header)
         
+        # Upload and download progress, shown only while a transfer runs
+        main_layout.addWidget(self.create_transfer_bar())
+        
         # Stats cards
         stats_layout = self.create_stats_cards()
         main_layout.addLayout(stats_layout)
@@ -1179,6 +1830,18 @@ class MainWindow(QMainWindow):
         data_tab = QWidget()
         data_layout = QVBoxLayout(data_tab)
         data_layout.setContentsMargins(16, 20, 16, 16)
+        
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("🔍  Filter by name or type")
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(200)
+        self.filter_timer.timeout.connect(
+            lambda: self.table_proxy.set_filter_text(self.filter_input.text())
+        )
+        self.filter_input.textChanged.connect(self.filter_timer.start)
+        data_layout.addWidget(self.filter_input)
+        
         self.table = self.create_data_table()
         data_layout.addWidget(self.table)
         
@@ -1199,11 +1862,50 @@ class MainWindow(QMainWindow):
         data_layout.addWidget(self.data_empty_label)
         self.tabs.addTab(data_tab, "📊  Data Table")
         
-        # History tab
+        # History and visuals tabs are placeholders, filled in when first shown
+        self.history_page = QWidget()
+        QVBoxLayout(self.history_page).setContentsMargins(0, 0, 0, 0)
+        self.tabs.addTab(self.history_page, "📜  History")
+        
+        self.visuals_page = QWidget()
+        QVBoxLayout(self.visuals_page).setContentsMargins(0, 0, 0, 0)
+        self.tabs.addTab(self.visuals_page, "📈  Visualizations")
+        
+        self.tabs.currentChanged.connect(self.on_tab_changed)
+    
+    def on_tab_changed(self, index):
+        page = self.tabs.widget(index)
+        if page is self.history_page:
+            self.ensure_history_tab()
+        elif page is self.visuals_page:
+            self.ensure_charts()
+    
+    def ensure_history_tab(self):
+        if self.history_tab is not None:
+            return
+        started = time.perf_counter()
         self.history_tab = HistoryTab(self.api_client)
-        self.tabs.addTab(self.history_tab, "📜  History")
+        self.history_page.layout().addWidget(self.history_tab)
+        if self.history_data is not None:
+            self.history_tab.on_history_loaded(True, self.history_data)
+        STARTUP.mark('history tab built', since=started)
+        STARTUP.report()
+    
+    def on_history_loaded(self, success, history_data):
+        if not success:
+            return
+        self.history_data = history_data
+        if self.history_tab is not None:
+            self.history_tab.on_history_loaded(True, history_data)
+    
+    def ensure_charts(self):
+        """Import matplotlib and build both charts the first time they are shown."""
+        if self.bar_chart is not None:
+            return
+        started = time.perf_counter()
+        from charts import BarChartCanvas, ScatterChartCanvas
+        STARTUP.mark('matplotlib imported', since=started)
         
-        # Visuals tab - Now with TWO charts
         visuals_tab = QWidget()
         visuals_layout = QHBoxLayout(visuals_tab)
         visuals_layout.setContentsMargins(16, 20, 16, 16)
@@ -1239,7 +1941,11 @@ class MainWindow(QMainWindow):
         scatter_layout.addWidget(self.scatter_chart)
         visuals_layout.addWidget(scatter_container)
         
-        self.tabs.addTab(visuals_tab, "📈  Visualizations")
+        self.visuals_page.layout().addWidget(visuals_tab)
+        self.bar_chart.plot(self.type_distribution)
+        self.scatter_chart.plot(self.equipment_columns)
+        STARTUP.mark('charts built')
+        STARTUP.report()
     
     def create_header(self):
         header = QHBoxLayout()
@@ -1270,6 +1976,42 @@ class MainWindow(QMainWindow):
         header.addLayout(title_section)
         header.addStretch()
         
+        # Shown while serving cached data because the backend is unreachable
+        self.offline_label = QLabel("⚠  Offline - showing cached data")
+        self.offline_label.setStyleSheet("""
+            font-size: 13px;
+            font-weight: 600;
+            color: #fbbf24;
+            background: rgba(251, 191, 36, 0.1);
+            border: 1px solid rgba(251, 191, 36, 0.3);
+            border-radius: 8px;
+            padding: 6px 12px;
+        """)
+        self.offline_label.hide()
+        header.addWidget(self.offline_label)
+        
+        # Shown while the dashboard shows a local CSV instead of server data
+        self.local_label = QLabel()
+        self.local_label.setStyleSheet("""
+            font-size: 13px;
+            font-weight: 600;
+            color: #60a5fa;
+            background: rgba(96, 165, 250, 0.1);
+            border: 1px solid rgba(96, 165, 250, 0.3);
+            border-radius: 8px;
+            padding: 6px 12px;
+        """)
+        self.local_label.hide()
+        header.addWidget(self.local_label)
+        
+        self.local_btn = QPushButton("📂  Open Local CSV")
+        self.local_btn.setObjectName("refreshBtn")
+        self.local_btn.setCursor(Qt.PointingHandCursor)
+        self.local_btn.setMinimumWidth(160)
+        self.local_btn.setToolTip("Analyze a CSV on this computer without uploading it")
+        self.local_btn.clicked.connect(self.open_local_csv)
+        header.addWidget(self.local_btn)
+        
         # Buttons
         self.upload_btn = QPushButton("📤  Upload CSV")
         self.upload_btn.setObjectName("uploadBtn")
@@ -1294,6 +2036,65 @@ class MainWindow(QMainWindow):
         
         return header
     
+    def create_transfer_bar(self):
+        self.transfer_bar = QWidget()
+        layout = QHBoxLayout(self.transfer_bar)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(12)
+        
+        self.transfer_label = QLabel()
+        self.transfer_label.setStyleSheet("font-size: 13px; color: #94a3b8;")
+        layout.addWidget(self.transfer_label)
+        
+        self.transfer_progress = QProgressBar()
+        self.transfer_progress.setTextVisible(False)
+        self.transfer_progress.setFixedHeight(8)
+        self.transfer_progress.setStyleSheet("""
+            QProgressBar {
+                background: rgba(255, 255, 255, 0.06);
+                border: none;
+                border-radius: 4px;
+            }
+            QProgressBar::chunk {
+                background: #6366f1;
+                border-radius: 4px;
+            }
+        """)
+        layout.addWidget(self.transfer_progress, 1)
+        
+        self.transfer_cancel_btn = QPushButton("Cancel")
+        self.transfer_cancel_btn.setCursor(Qt.PointingHandCursor)
+        self.transfer_cancel_btn.clicked.connect(self.cancel_transfer)
+        layout.addWidget(self.transfer_cancel_btn)
+        
+        self.transfer_bar.hide()
+        self.transfer_key = None
+        self.transfer_done = None
+        return self.transfer_bar
+    
+    def start_transfer(self, key, text, on_done):
+        """Show the bar for an upload or download; on_done(success, result) is its callback."""
+        self.transfer_key = key
+        self.transfer_done = on_done
+        self.transfer_label.setText(text)
+        self.transfer_progress.setRange(0, 0)  # busy until the first progress report
+        self.transfer_bar.show()
+    
+    def on_transfer_progress(self, done, total):
+        if total:
+            # Scale to per-mille so files over 2 GB fit the int range
+            self.transfer_progress.setRange(0, 1000)
+            self.transfer_progress.setValue(int(done * 1000 / total))
+    
+    def finish_transfer(self):
+        self.transfer_key = None
+        self.transfer_bar.hide()
+    
+    def cancel_transfer(self):
+        if self.transfer_key is not None:
+            self.executor.cancel(self.transfer_key)
+            self.transfer_done(False, 'Cancelled')
+    
     def create_stats_cards(self):
         stats_layout = QHBoxLayout()
         stats_layout.setSpacing(20)
@@ -1311,45 +2112,146 @@ class MainWindow(QMainWindow):
         return stats_layout
     
     def create_data_table(self):
-        table = QTableWidget()
-        table.setColumnCount(5)
-        table.setHorizontalHeaderLabels([
-            "Equipment Name", "Type", "Flowrate", "Pressure", "Temperature"
-        ])
+        self.table_model = EquipmentTableModel(self)
+        self.table_proxy = EquipmentProxyModel(self.executor, self)
+        self.table_proxy.setSourceModel(self.table_model)
+        
+        table = QTableView()
+        table.setModel(self.table_proxy)
         
         # Fixed: Uniform column sizing
         header = table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.Stretch)
         header.setDefaultAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+        header.setSortIndicator(-1, Qt.AscendingOrder)
+        table.setSortingEnabled(True)
         
         table.setAlternatingRowColors(True)
         table.setShowGrid(False)
-        table.setSelectionBehavior(QTableWidget.SelectRows)
-        table.setSelectionMode(QTableWidget.SingleSelection)
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        table.setSelectionMode(QAbstractItemView.SingleSelection)
         table.verticalHeader().setVisible(False)
-        table.setVerticalScrollMode(QTableWidget.ScrollPerPixel)
-        table.setHorizontalScrollMode(QTableWidget.ScrollPerPixel)
+        table.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        table.setHorizontalScrollMode(QAbstractItemView.ScrollPerPixel)
         
-        # Set consistent row height
+        # Set consistent row height (fixed, so large batches need no per-row measuring)
+        table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         table.verticalHeader().setDefaultSectionSize(52)
         
         return table
     
+    def show_cached_data(self):
+        """Render the last cached payloads immediately, before the network answers."""
+        dashboard = self.api_client.cached_payload('dashboard')
+        if dashboard is not None:
+            self.show_cached_dashboard(dashboard)
+        history = self.api_client.cached_payload('history')
+        if history is not None:
+            self.on_history_loaded(True, history)
+        self.update_offline_state()
+    
+    def update_offline_state(self):
+        """Cached data is read-only: uploads and reports need the backend."""
+        offline = self.api_client.offline
+        self.offline_label.setVisible(offline)
+        self.upload_btn.setEnabled(not offline)
+        # The PDF report covers the latest uploaded batch, not a local file
+        self.pdf_btn.setEnabled(not offline and self.local_file is None)
+    
     def refresh_data(self):
         self.refresh_btn.setEnabled(False)
         self.refresh_btn.setText("Loading...")
-        QApplication.processEvents()
         
-        success, data = self.api_client.get_dashboard_stats()
+        # Refreshing leaves local analytics mode and goes back to server data
+        if self.local_file is not None:
+            self.local_file = None
+            self.shown_dashboard = None
+            self.local_label.hide()
+            cached = self.api_client.cached_payload('dashboard')
+            if cached is not None:
+                self.show_cached_dashboard(cached)
+        
+        if not self.api_client.token:
+            # Signed in offline: get a token first, then refresh as usual
+            self.executor.submit('login', self.api_client.reconnect, callback=self.on_reconnected)
+            return
         
+        # Dashboard and history are independent, so fetch them in parallel
+        self.prefetch.start([
+            ('dashboard', lambda: fetch_dashboard(self.api_client, self.prepared_dashboard),
+             self.on_dashboard_loaded),
+            ('history', self.api_client.get_history, self.on_history_loaded),
+        ], on_finished=self.on_refresh_finished)
+    
+    def on_server_event(self, event_type, data):
+        if event_type in ('batch_created', 'retention'):
+            self.live_refresh_timer.start()
+        elif event_type == 'ingest_progress':
+            self.show_ingest_progress(data)
+    
+    def on_live_refresh(self):
+        # Server data does not replace a local CSV on screen; Refresh returns to it
+        if self.local_file is None and not self.api_client.offline:
+            self.refresh_data()
+    
+    def show_ingest_progress(self, data):
+        """After our upload's bytes are sent, follow the server parsing and inserting it."""
+        if not (self.transfer_key or '').startswith('upload:'):
+            return
+        if os.path.basename(self.transfer_key[len('upload:'):]) != data.get('filename'):
+            return
+        if data['stage'] == 'parsing':
+            self.transfer_label.setText(f"Server is reading {data['filename']}")
+            self.transfer_progress.setRange(0, 0)
+        else:
+            self.transfer_label.setText(
+                f"Server is saving {data['filename']}: "
+                f"{data['rows_inserted']:,} of {data['rows_parsed']:,} rows"
+            )
+            self.on_transfer_progress(data['rows_inserted'], data['rows_parsed'])
+    
+    def on_reconnected(self, success, result):
+        if success and self.api_client.token:
+            self.refresh_data()
+            return
+        self.on_refresh_finished()
+    
+    def on_refresh_finished(self):
         self.refresh_btn.setEnabled(True)
         self.refresh_btn.setText("🔄  Refresh")
-        
+        self.update_offline_state()
+    
+    def show_cached_dashboard(self, dashboard):
+        """Show a cached payload once its columns are built off the GUI thread."""
+        self.executor.submit(
+            'dashboard-cache', prepare_dashboard, dashboard, self.prepared_dashboard,
+            callback=self.on_cached_dashboard_prepared
+        )
+    
+    def on_cached_dashboard_prepared(self, success, result):
+        # The network answer may have been shown first; it is newer than the cache
+        if success and self.shown_dashboard is None:
+            self.on_dashboard_loaded(True, result)
+    
+    def on_dashboard_loaded(self, success, result):
         if not success:
             QMessageBox.critical(self, "Connection Error", 
                 f"Failed to fetch data from server.\n\nPlease ensure the backend is running.")
             return
         
+        self.prepared_dashboard = result
+        data, columns = result
+        # A 304 revalidation hands back the payload already on screen; server
+        # data does not replace a local CSV the user opened meanwhile
+        if data is self.shown_dashboard or self.local_file is not None:
+            return
+        self.shown_dashboard = data
+        
+        self.equipment_data = data.get('equipment_data', [])
+        self.show_dashboard(data, columns)
+    
+    def show_dashboard(self, data, columns):
+        """Fill the stat cards, table and charts from dashboard figures and row columns."""
         # Update stats
         self.total_card.update_value(data.get('total_count', 0))
         avg_values = data.get('average_values', {})
@@ -1358,61 +2260,68 @@ class MainWindow(QMainWindow):
         self.temp_card.update_value(round(avg_values.get('temperature', 0), 1))
         
         # Update table
-        self.equipment_data = data.get('equipment_data', [])
+        self.equipment_columns = columns
         self.update_table()
         
-        # Update charts (both bar and scatter)
+        # Update charts (both bar and scatter) once built; unchanged data is not redrawn
         self.type_distribution = data.get('type_distribution', {})
-        self.bar_chart.plot(self.type_distribution)
-        self.bar_chart.plot(self.type_distribution)
-        self.scatter_chart.plot(self.equipment_data)
+        if self.bar_chart is not None:
+            self.bar_chart.plot(self.type_distribution)
+            self.scatter_chart.plot(self.equipment_columns)
+    
+    def open_local_csv(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Open Local CSV",
+            "",
+            "CSV Files (*.csv);;All Files (*)"
+        )
         
-        # Refresh history
-        self.history_tab.refresh_history()
+        if not file_path:
+            return
+        
+        self.local_btn.setEnabled(False)
+        key = f'analyze:{file_path}'
+        self.start_transfer(key, f"Analyzing {os.path.basename(file_path)}", self.on_local_analyzed)
+        self.executor.submit(
+            key, analyze_csv, file_path,
+            callback=self.on_local_analyzed, progress=self.on_transfer_progress
+        )
+    
+    def on_local_analyzed(self, success, result):
+        self.finish_transfer()
+        self.local_btn.setEnabled(True)
+        
+        if result == 'Cancelled':
+            return
+        if not success:
+            QMessageBox.critical(self, "Cannot Analyze File", f"Could not read the CSV:\n\n{result}")
+            return
+        
+        self.local_file = result['source_file']
+        self.local_label.setText(f"📂  Local: {os.path.basename(self.local_file)}")
+        self.local_label.setToolTip(self.local_file)
+        self.local_label.show()
+        self.update_offline_state()
+        self.show_dashboard(result, result['equipment_columns'])
+        
+        if result['skipped_rows']:
+            QMessageBox.warning(self, "Rows Skipped",
+                f"{result['skipped_rows']:,} row(s) with non-numeric or infinite values were left out.")
     
     def update_table(self):
-        if not self.equipment_data:
+        if not len(self.equipment_columns['equipment_name']):
+            self.table_model.set_columns(self.equipment_columns)
             self.table.hide()
+            self.filter_input.hide()
             self.data_empty_label.show()
             return
             
         self.table.show()
+        self.filter_input.show()
         self.data_empty_label.hide()
         
-        self.table.setRowCount(len(self.equipment_data))
-        
-        # Type colors for badges
-        type_colors = {
-            'reactor': '#a78bfa',
-            'pump': '#60a5fa', 
-            'heat exchanger': '#fb923c',
-            'valve': '#6ee7b7',
-            'tank': '#f472b6',
-            'storage tank': '#818cf8',
-            'compressor': '#fbbf24',
-            'distillation column': '#fb7185',
-            'mixer': '#34d399',
-        }
-        
-        for row, item in enumerate(self.equipment_data):
-            # Equipment Name
-            name_item = QTableWidgetItem(item['equipment_name'])
-            name_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-            self.table.setItem(row, 0, name_item)
-            
-            # Type (with color)
-            type_text = item['type']
-            type_item = QTableWidgetItem(type_text)
-            type_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-            color = type_colors.get(type_text.lower(), '#94a3b8')
-            type_item.setForeground(QColor(color))
-            self.table.setItem(row, 1, type_item)
-            
-            # Numeric values
-            for col, key in [(2, 'flowrate'), (3, 'pressure'), (4, 'temperature')]:
-                value_item = QTableWidgetItem(f"{item[key]:.2f}")
-                value_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-                self.table.setItem(row, col, value_item)
+        self.table_model.set_columns(self.equipment_columns)
     
     def upload_csv(self):
         file_path, _ = QFileDialog.getOpenFileName(
@@ -1425,22 +2334,53 @@ class MainWindow(QMainWindow):
         if not file_path:
             return
         
+        # Check the file locally first, so bad files never reach the network
         self.upload_btn.setEnabled(False)
-        self.upload_btn.setText("Uploading...")
-        QApplication.processEvents()
+        self.upload_btn.setText("Checking...")
+        
+        key = f'validate:{file_path}'
+        self.start_transfer(key, f"Checking {os.path.basename(file_path)}", self.on_upload_finished)
+        self.executor.submit(
+            key, validate_csv, file_path,
+            callback=lambda success, result: self.on_csv_validated(file_path, success, result),
+            progress=self.on_transfer_progress
+        )
+    
+    def on_csv_validated(self, file_path, success, report):
+        self.finish_transfer()
+        if not success:
+            self.on_upload_finished(False, report)
+            return
         
-        success, result = self.api_client.upload_csv(file_path)
+        if CSVPreviewDialog(file_path, report, self).exec_() != QDialog.Accepted:
+            self.on_upload_finished(False, 'Cancelled')
+            return
         
+        self.upload_btn.setText("Uploading...")
+        key = f'upload:{file_path}'
+        compress = os.path.getsize(file_path) >= UPLOAD_GZIP_MIN_BYTES
+        self.start_transfer(key, f"Uploading {os.path.basename(file_path)}", self.on_upload_finished)
+        self.executor.submit(
+            key, self.api_client.upload_csv, file_path, compress=compress,
+            callback=self.on_upload_finished, progress=self.on_transfer_progress
+        )
+    
+    def on_upload_finished(self, success, result):
+        self.finish_transfer()
         self.upload_btn.setEnabled(True)
         self.upload_btn.setText("📤  Upload CSV")
         
+        if result == 'Cancelled':
+            return
         if success:
             QMessageBox.information(
                 self, 
                 "Upload Successful", 
                 f"✅ Successfully uploaded {result.get('records_created', 0)} equipment records!"
             )
-            self.refresh_data()
+            # With the event stream up, its batch_created event triggers the refresh
+            if not self.events.connected:
+                self.refresh_data()
         else:
             QMessageBox.critical(self, "Upload Failed", f"Error uploading file:\n\n{result}")
     
@@ -1462,18 +2402,23 @@ class MainWindow(QMainWindow):
         
         self.pdf_btn.setEnabled(False)
         self.pdf_btn.setText("Generating...")
-        QApplication.processEvents()
-        
-        success, result = self.api_client.download_pdf()
         
+        self.start_transfer('pdf', "Downloading report", self.on_pdf_downloaded)
+        self.executor.submit(
+            'pdf', self.api_client.download_pdf, file_path,
+            callback=self.on_pdf_downloaded, progress=self.on_transfer_progress
+        )
+    
+    def on_pdf_downloaded(self, success, result):
+        self.finish_transfer()
         self.pdf_btn.setEnabled(True)
         self.pdf_btn.setText("📄  Download PDF")
         
+        if result == 'Cancelled':
+            return
         if success:
-            with open(file_path, 'wb') as f:
-                f.write(result)
             QMessageBox.information(self, "Report Generated", 
-                f"✅ PDF report saved successfully!\n\n{file_path}")
+                f"✅ PDF report saved successfully!\n\n{result}")
         else:
             QMessageBox.critical(self, "Generation Failed", f"Failed to generate PDF:\n\n{result}")
     
@@ -1501,7 +2446,11 @@ def main():
     QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
     QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
     
+    STARTUP.mark('imports')
     app = QApplication(sys.argv)
+    STARTUP.mark('QApplication')
+    app.setOrganizationName("ChemEquip")
+    app.setApplicationName("ChemicalEquipmentVisualizer")
     # app.setQuitOnLastWindowClosed(False)  # Removed to ensure app quits on close
     
     # Set global font
@@ -1541,17 +2490,26 @@ def main():
         except Exception:
             pass
     
-    # Create API client
-    api_client = APIClient()
+    # Create API client (with the on-disk cache for instant and offline startup)
+    api_client = APIClient(cache=LocalCache(LocalCache.default_path()))
     
     # Show login dialog
     login_dialog = LoginDialog(api_client)
+    STARTUP.mark('login dialog built')
+    login_dialog.show()
+    app.processEvents()
+    STARTUP.mark('login dialog shown')
+    preload_modules()
+    waiting_since = time.perf_counter()
     if login_dialog.exec_() != QDialog.Accepted:
         sys.exit(0)
+    STARTUP.exclude(waiting_since)
     
     # Show main window
     main_window = MainWindow(api_client)
+    STARTUP.mark('main window built')
     main_window.show()
+    QTimer.singleShot(0, lambda: (STARTUP.mark('main window shown'), STARTUP.report()))
     
     sys.exit(app.exec_())
 
@@ -1,7 +1,7 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext';
-import { getDashboardStats, downloadPDF } from '../services/api';
+import { getDashboardStats, downloadPDF, subscribeToEvents } from '../services/api';
 import Upload from './Upload';
 import EquipmentChart from './EquipmentChart';
 import History from './History';
@@ -17,6 +17,10 @@ const Dashboard = () => {
     const [downloadingPDF, setDownloadingPDF] = useState(false);
 
     const [refreshHistory, setRefreshHistory] = useState(0);
+    // Latest ingest_progress event, shown while the server processes an upload
+    const [ingest, setIngest] = useState(null);
+    // True while the event stream is connected, so refreshes follow server events
+    const live = useRef(false);
 
     const fetchStats = async () => {
         try {
@@ -36,6 +40,36 @@ const Dashboard = () => {
         fetchStats();
     }, []);
 
+    // Refresh when the server reports new or deleted batches instead of polling;
+    // bursts (a multi-file upload) collapse into one refresh
+    useEffect(() => {
+        let refreshTimer;
+        const refresh = () => {
+            clearTimeout(refreshTimer);
+            refreshTimer = setTimeout(() => {
+                fetchStats();
+                setRefreshHistory(prev => prev + 1);
+            }, 300);
+        };
+        const unsubscribe = subscribeToEvents({
+            ready: () => { live.current = true; },
+            ingest_progress: setIngest,
+            // The file was not stored; its upload reports the error itself
+            ingest_failed: (data) => {
+                setIngest(current => (current?.filename === data.filename ? null : current));
+            },
+            batch_created: () => {
+                setIngest(null);
+                refresh();
+            },
+            retention: refresh,
+        }, () => { live.current = false; });
+        return () => {
+            clearTimeout(refreshTimer);
+            unsubscribe();
+        };
+    }, []);
+
     const handleLogout = () => {
         logout();
         navigate('/');
@@ -43,8 +77,16 @@ const Dashboard = () => {
 
     const handleUploadSuccess = () => {
         setShowUpload(false);
-        fetchStats();
-        setRefreshHistory(prev => prev + 1);
+        // With the event stream up, its batch_created event triggers the refresh
+        if (!live.current) {
+            fetchStats();
+            setRefreshHistory(prev => prev + 1);
+        }
+    };
+
+    const handleUploadError = () => {
+        // The server may not have sent ingest_failed (the request never reached it)
+        setIngest(null);
     };
 
     const handleDownloadPDF = async () => {
@@ -140,7 +182,7 @@ const Dashboard = () => {
                                 </svg>
                             </button>
                         </div>
-                        <Upload onUploadSuccess={handleUploadSuccess} />
+                        <Upload onUploadSuccess={handleUploadSuccess} onUploadError={handleUploadError} />
                     </div>
                 </div>
             )}
@@ -158,6 +200,15 @@ const Dashboard = () => {
                     </div>
                 )}
 
+                {ingest && (
+                    <div className="ingest-banner">
+                        <span className="btn-spinner"></span>
+                        {ingest.stage === 'parsing'
+                            ? `Processing ${ingest.filename}...`
+                            : `Saving ${ingest.filename}: ${ingest.rows_inserted.toLocaleString()} of ${ingest.rows_parsed.toLocaleString()} rows`}
+                    </div>
+                )}
+
                 {/* Summary Cards */}
                 <section className="summary-cards">
                     <div className="stat-card purple">
@@ -2,7 +2,7 @@ import { useState, useCallback } from 'react';
 import { uploadCSV } from '../services/api';
 import './Upload.css';
 
-const Upload = ({ onUploadSuccess }) => {
+const Upload = ({ onUploadSuccess, onUploadError }) => {
     const [isDragging, setIsDragging] = useState(false);
     const [isUploading, setIsUploading] = useState(false);
     const [uploadStatus, setUploadStatus] = useState(null);
@@ -73,6 +73,9 @@ const Upload = ({ onUploadSuccess }) => {
                 type: 'error',
                 message: error.response?.data?.error || 'Upload failed'
             });
+            if (onUploadError) {
+                onUploadError(error);
+            }
         } finally {
             setIsUploading(false);
         }
@@ -73,4 +73,23 @@ export const downloadPDF = async () => {
   return response.data;
 };
 
+// Live updates (Server-Sent Events). EventSource cannot send an Authorization
+// header, so the token goes in the query string. handlers maps event types
+// (ready, ingest_progress, ingest_failed, batch_created, retention) to callbacks taking the
+// parsed data; onError runs when the connection drops (the browser retries).
+// A server without the stream (the default under WSGI) answers 404: the browser
+// gives up after one onError, and callers keep refreshing after their own uploads.
+// Returns a function that closes the stream.
+export const subscribeToEvents = (handlers, onError) => {
+  const token = localStorage.getItem('authToken');
+  const source = new EventSource(`${API_BASE_URL}/events/?token=${encodeURIComponent(token)}`);
+  Object.entries(handlers).forEach(([type, handler]) => {
+    source.addEventListener(type, (event) => handler(JSON.parse(event.data)));
+  });
+  if (onError) {
+    source.onerror = onError;
+  }
+  return () => source.close();
+};
+
 export default api;